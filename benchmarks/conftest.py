@@ -0,0 +1,210 @@
+"""
+Нагрузочные тесты этапов анализа.
+
+Запуск: pytest benchmarks/ (нужен pytest-benchmark). Время каждого этапа
+измеряется через pytest-benchmark, пиковая память — через tracemalloc.
+Результаты сравниваются с baseline.json: тест падает, если медиана
+времени или пиковая память выросли больше порога --bench-threshold.
+Время сравнивается только с замерами той же машины: если эталон записан
+на другой, рост времени выводится предупреждением. С флагом --bench-save
+результаты записываются в baseline.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+
+from financial_analyzer.synthetic import generate_statement
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # Без плагина нагрузочные тесты не собираются
+    collect_ignore_glob = ['test_*.py']
+
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+DEFAULT_THRESHOLD = 0.5
+# Прирост памяти меньше этого порога не считается регрессией
+MEMORY_SLACK_MB = 1.0
+# Примерная длительность замера одного этапа, по ней подбирается число повторов
+TARGET_SECONDS = 0.5
+MIN_ROUNDS = 3
+MAX_ROUNDS = 30
+# Этапы короче секунды повторяются не меньше MIN_SHORT_ROUNDS раз, чтобы медиана была устойчивой
+SHORT_STAGE_SECONDS = 1.0
+MIN_SHORT_ROUNDS = 10
+
+# Размеры данных: годы при фиксированном числе показателей, затем показатели
+# при фиксированном числе лет; отдельно — число компаний
+SWEEPS = {
+    'quick': {'years': [5, 20], 'indicators': [50, 500], 'companies': [1, 10]},
+    'full': {'years': [5, 10, 20, 50], 'indicators': [50, 500, 5000], 'companies': [1, 10, 100]},
+}
+BASE_YEARS = 10
+BASE_INDICATORS = 200
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('project-alpha', 'нагрузочные тесты Project Alpha')
+    group.addoption('--bench-baseline', default=str(DEFAULT_BASELINE),
+                    help='JSON с эталонными результатами')
+    group.addoption('--bench-save', action='store_true',
+                    help='записать результаты прогона в baseline вместо сравнения')
+    group.addoption('--bench-threshold', type=float,
+                    default=float(os.environ.get('BENCH_THRESHOLD', DEFAULT_THRESHOLD)),
+                    help='допустимый относительный рост времени и памяти (0.5 — на 50%%)')
+    group.addoption('--bench-files', default=os.environ.get('BENCH_FILES'),
+                    help='каталог с эталонными Excel-файлами для сравнения движков чтения')
+    group.addoption('--bench-scale', choices=['quick', 'full'], default=os.environ.get('BENCH_SCALE', 'quick'),
+                    help='quick — малые размеры, full — полная сетка размеров')
+
+
+def machine_fingerprint():
+    """Короткий идентификатор машины и интерпретатора, на которых сделан замер"""
+    parts = [platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+             platform.python_implementation(), platform.python_version()]
+    return hashlib.sha256('/'.join(parts).encode()).hexdigest()[:12]
+
+
+class BaselineRecorder:
+    """Сравнение результатов с эталоном и накопление новых результатов"""
+
+    def __init__(self, path, threshold, save):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.save = save
+        self.baseline = json.loads(self.path.read_text(encoding='utf-8')) if self.path.exists() else {}
+        self.results = {}
+        self.machine = machine_fingerprint()
+
+    def check(self, name, result):
+        """
+        Запоминает результат и возвращает описание регрессий относительно
+        эталона. Рост времени относительно эталона с другой машины не
+        считается регрессией и возвращается отдельным списком предупреждений.
+        """
+        self.results[name] = {**result, 'machine': self.machine}
+        reference = self.baseline.get(name)
+        if self.save or reference is None:
+            return [], []
+
+        problems, notes = [], []
+        limit = 1 + self.threshold
+        if result['median_s'] > reference['median_s'] * limit:
+            message = f"время {result['median_s']:.4f} с > {reference['median_s']:.4f} с × {limit:.2f}"
+            if reference.get('machine') == self.machine:
+                problems.append(message)
+            else:
+                notes.append(message + " (эталон записан на другой машине)")
+        if result['peak_mb'] > max(reference['peak_mb'] * limit, reference['peak_mb'] + MEMORY_SLACK_MB):
+            problems.append(f"память {result['peak_mb']:.1f} МБ > {reference['peak_mb']:.1f} МБ × {limit:.2f}")
+        return problems, notes
+
+    def write(self):
+        merged = {**self.baseline, **self.results}
+        self.path.write_text(json.dumps(dict(sorted(merged.items())), ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+
+def pytest_configure(config):
+    config._bench_recorder = BaselineRecorder(
+        config.getoption('--bench-baseline'),
+        config.getoption('--bench-threshold'),
+        config.getoption('--bench-save'),
+    )
+
+
+def pytest_generate_tests(metafunc):
+    sweep = SWEEPS[metafunc.config.getoption('--bench-scale')]
+    if 'size' in metafunc.fixturenames:
+        sizes = [(years, BASE_INDICATORS) for years in sweep['years']]
+        sizes += [(BASE_YEARS, count) for count in sweep['indicators'] if (BASE_YEARS, count) not in sizes]
+        metafunc.parametrize('size', sizes, ids=[f'y{years}-i{count}' for years, count in sizes])
+    if 'reference' in metafunc.fixturenames:
+        directory = metafunc.config.getoption('--bench-files')
+        files = sorted(Path(directory).glob('*.xls*')) if directory else []
+        metafunc.parametrize('reference', files, ids=[path.name for path in files])
+    if 'companies' in metafunc.fixturenames:
+        metafunc.parametrize('companies', sweep['companies'], ids=[f'c{count}' for count in sweep['companies']])
+
+
+def pytest_sessionfinish(session):
+    recorder = session.config._bench_recorder
+    if recorder.save and recorder.results:
+        recorder.write()
+
+
+def peak_memory_mb(func, setup=None):
+    """Пиковый объем памяти, выделенной за один вызов, в мегабайтах"""
+    args, kwargs = setup() if setup else ((), {})
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+@pytest.fixture(scope='session')
+def workbooks(tmp_path_factory):
+    """Excel-файлы синтетической отчетности, создаются один раз на размер"""
+    directory = tmp_path_factory.mktemp('workbooks')
+    paths = {}
+
+    def get(years, indicators):
+        if (years, indicators) not in paths:
+            path = directory / f'statement_y{years}_i{indicators}.xlsx'
+            generate_statement(years, indicators).to_excel(path, index=False)
+            paths[years, indicators] = path
+        return paths[years, indicators]
+
+    return get
+
+
+@pytest.fixture
+def stage(benchmark, request):
+    """
+    Замер этапа: stage(func, setup=None). setup возвращает (args, kwargs)
+    для каждого повтора, чтобы подготовка данных не входила в замер.
+    """
+    recorder = request.config._bench_recorder
+
+    def run(func, setup=None):
+        if benchmark.disabled:
+            # --benchmark-disable: этап выполняется один раз без замеров
+            return benchmark.pedantic(func, setup=setup, rounds=1, iterations=1)
+
+        peak_mb = peak_memory_mb(func, setup)
+
+        # Пробный вызов: прогрев и оценка числа повторов
+        args, kwargs = setup() if setup else ((), {})
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        single = time.perf_counter() - started
+        min_rounds = MIN_SHORT_ROUNDS if single < SHORT_STAGE_SECONDS else MIN_ROUNDS
+        rounds = max(min_rounds, min(MAX_ROUNDS, int(TARGET_SECONDS / max(single, 1e-6))))
+
+        result = benchmark.pedantic(func, setup=setup, rounds=rounds, iterations=1)
+
+        stats = benchmark.stats.stats
+        benchmark.extra_info['peak_mb'] = round(peak_mb, 3)
+        problems, notes = recorder.check(request.node.name, {
+            'median_s': stats.median,
+            'min_s': stats.min,
+            'rounds': stats.rounds,
+            'peak_mb': round(peak_mb, 3),
+        })
+        for note in notes:
+            warnings.warn(f"Этап {request.node.name}: {note}")
+        if problems:
+            pytest.fail(f"Регрессия этапа {request.node.name}: " + '; '.join(problems))
+        return result
+
+    return run
@@ -0,0 +1,40 @@
+"""
+Сравнение движков чтения Excel: pd.read_excel, openpyxl read-only и calamine.
+
+Синтетические файлы строятся по сетке размеров; эталонные файлы из
+каталога --bench-files (или BENCH_FILES) замеряются как есть.
+"""
+
+import pandas as pd
+import pytest
+
+from financial_analyzer import analysis, readers
+
+ENGINES = ['pandas', *readers.ENGINES]
+
+
+def read(path, engine):
+    if engine == 'pandas':
+        return pd.read_excel(path)
+    return readers.read_table(path, engine=engine, usecols=analysis.STATEMENT_COLUMNS,
+                              start=readers.header_start(['Показатель']))
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    if request.param != 'pandas' and not readers.engine_available(request.param):
+        pytest.skip(f"Движок {request.param} не установлен")
+    return request.param
+
+
+def test_read_engine(stage, size, engine, workbooks):
+    """Чтение синтетического файла"""
+    path = workbooks(*size)
+    df = stage(lambda: read(path, engine))
+    assert len(df) == size[0] * size[1]
+
+
+def test_read_reference(stage, reference, engine):
+    """Чтение эталонного файла"""
+    df = stage(lambda: read(reference, engine))
+    assert not df.empty
@@ -0,0 +1,182 @@
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from financial_analyzer import analysis, charts
+from financial_analyzer.anomalies import anomaly_masks
+from financial_analyzer.batch import analyze_frame
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.normalize import normalize_wide
+from financial_analyzer.portfolio import PortfolioCube
+from financial_analyzer.rules import INDICATOR_ALIASES, RULE_REGISTRY, RuleSet
+from financial_analyzer.store import StatementStore
+from financial_analyzer.synthetic import generate_portfolio, generate_statement, generate_wide_export
+
+
+@lru_cache(maxsize=None)
+def raw_statement(years, indicators):
+    return generate_statement(years, indicators)
+
+
+@lru_cache(maxsize=None)
+def statement(years, indicators):
+    return analysis.preprocess_data(raw_statement(years, indicators).copy())
+
+
+@lru_cache(maxsize=None)
+def portfolio(companies):
+    return generate_portfolio(companies, 10, 200)
+
+
+def test_load_data(stage, size, workbooks):
+    """Чтение Excel-файла"""
+    path = workbooks(*size)
+    df = stage(lambda: analysis.load_data(path))
+    assert len(df) == size[0] * size[1]
+
+
+def test_normalize_wide(stage, size):
+    """Широкая выгрузка в длинную таблицу"""
+    raw = generate_wide_export(*size)
+    df = stage(lambda: normalize_wide(raw))
+    assert len(df) == size[0] * size[1]
+
+
+def test_preprocess_data(stage, size):
+    """Очистка и компактное представление таблицы"""
+    raw = raw_statement(*size)
+    stage(analysis.preprocess_data, setup=lambda: ((raw.copy(),), {}))
+
+
+def test_build_cube(stage, size):
+    """Построение матрицы показатель × год"""
+    df = statement(*size)
+    cube = stage(lambda: StatementCube.from_frame(df))
+    assert cube.shape == (size[1], size[0])
+
+
+def test_calculate_financial_ratios(stage, size):
+    df = statement(*size)
+    ratios = stage(lambda: analysis.calculate_financial_ratios(df))
+    assert ratios
+
+
+def test_perform_horizontal_analysis(stage, size):
+    df = statement(*size)
+    stage(lambda: analysis.perform_horizontal_analysis(df))
+
+
+def test_perform_vertical_analysis(stage, size):
+    df = statement(*size)
+    stage(lambda: analysis.perform_vertical_analysis(df))
+
+
+def test_detect_anomalies(stage, size):
+    df = statement(*size)
+    stage(lambda: analysis.detect_anomalies(df))
+
+
+def test_build_figures(stage, size):
+    """Графики обзора и аномалий вместе с сериализацией в JSON"""
+    cube = analysis.as_cube(statement(*size))
+    anomalies = analysis.detect_anomalies(cube)
+    payload = stage(lambda: [
+        charts.key_indicators_trend(cube).to_json(),
+        charts.anomaly_visualization(cube, anomalies).to_json(),
+    ])
+    assert all(payload)
+
+
+def test_generate_pdf_report(stage, size):
+    """PDF-отчет; нужны шрифты с кириллицей (см. PROJECT_ALPHA_FONT_DIR), без них тест пропускается"""
+    from fpdf.errors import FPDFException
+    from financial_analyzer.core import generate_pdf_report
+
+    df = statement(*size)
+    ratios = analysis.calculate_financial_ratios(df)
+    horizontal = analysis.perform_horizontal_analysis(df)
+    assets, liabilities = analysis.perform_vertical_analysis(df)
+    anomalies = analysis.detect_anomalies(df)
+    report = lambda: generate_pdf_report(df, ratios, horizontal, assets, liabilities, anomalies)
+    try:
+        report()
+    except (FPDFException, FileNotFoundError) as e:
+        pytest.skip(f"PDF-отчет недоступен: {e}")
+    stage(report)
+
+
+def test_analyze_companies(stage, companies):
+    """Полный анализ каждой компании по отдельности"""
+    frames = portfolio(companies)
+    results = stage(lambda: [analyze_frame(df.copy(), name) for name, df in frames.items()])
+    assert all(result.ok for result in results)
+
+
+def test_anomaly_masks_over_companies(stage, companies):
+    """Проверки аномалий одним проходом по массиву компания × показатель × год"""
+    cubes = [StatementCube.from_frame(df) for df in portfolio(companies).values()]
+    stacked = np.stack([cube.values for cube in cubes])
+    masks = stage(lambda: anomaly_masks(stacked, cubes[0].indicator_index))
+    assert masks['statistical'].shape[0] == companies
+
+
+@lru_cache(maxsize=None)
+def house_rules(count):
+    """Набор из count синтетических правил над парами показателей"""
+    names = list(INDICATOR_ALIASES)
+    registry = dict(RULE_REGISTRY)
+    for k in range(count):
+        a, b = names[k % len(names)], names[(k * 7 + 1) % len(names)]
+        registry[f'house_{k}'] = {
+            'when': f"growth({a}) > growth({b}) * {1 + k / 100:.2f} and {a} / {b} > {k / count:.3f}",
+            'indicator': a, 'value': a, 'severity': 'medium', 'description': 'Правило {year}',
+        }
+    return RuleSet(registry)
+
+
+@pytest.mark.parametrize('rules', [0, 300])
+def test_rule_engine(stage, companies, rules):
+    """Встроенные правила и 300 дополнительных одним проходом по массиву компаний"""
+    cubes = [StatementCube.from_frame(df) for df in portfolio(companies).values()]
+    stacked = np.stack([cube.values for cube in cubes])
+    rule_set = house_rules(rules)
+    masks = stage(lambda: anomaly_masks(stacked, cubes[0].indicator_index, rule_set))
+    assert masks['rules'][1]['masks'].shape[:2] == (companies, len(rule_set))
+
+
+@pytest.mark.parametrize('detector', ['z_score', 'rolling', 'mad', 'log_growth'])
+def test_statistical_detectors(stage, companies, detector):
+    """Один статистический детектор по всем ключевым показателям массива компаний"""
+    cubes = [StatementCube.from_frame(df) for df in portfolio(companies).values()]
+    stacked = np.stack([cube.values for cube in cubes])
+    masks = stage(lambda: anomaly_masks(stacked, cubes[0].indicator_index, detectors=[detector]))
+    assert list(masks['detectors']) == [detector]
+
+
+def test_portfolio_comparison(stage, companies):
+    """Рейтинги, перцентили и счетчики аномалий по массиву компания × показатель × год"""
+    cubes = {name: StatementCube.from_frame(df) for name, df in portfolio(companies).items()}
+
+    def compare():
+        stacked = PortfolioCube.from_cubes(cubes)
+        year = stacked.years[-1]
+        return stacked.rankings(year), stacked.percentiles(year), stacked.anomaly_counts()
+
+    rankings, _, counts = stage(compare)
+    assert len(rankings) == len(counts) == companies
+
+
+def test_store_screening(stage, companies, tmp_path):
+    """Рейтинги, перцентили и счетчики аномалий по хранилищу, открытому через np.memmap"""
+    frames = portfolio(companies)
+    cube = StatementCube.from_frame(next(iter(frames.values())))
+    StatementStore.create(tmp_path, cube.years, cube.indicators).write(frames)
+
+    def screen():
+        store = StatementStore(tmp_path)
+        year = store.years[-1]
+        return store.rankings(year), store.percentiles(year), store.anomaly_counts()
+
+    rankings, _, counts = stage(screen)
+    assert len(rankings) == len(counts) == companies
@@ -0,0 +1,3 @@
+"""Аналитическое ядро финансового анализатора Project Alpha"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,309 @@
+"""
+Функции анализа отчетности без зависимости от Streamlit.
+
+Предупреждения не выводятся на экран, а добавляются в список messages,
+если он передан: интерфейс показывает их через st.warning, пакетный
+режим сохраняет в результат анализа.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.ratios import RATIO_REGISTRY, evaluate_ratios, missing_indicators
+from financial_analyzer import ratios as ratio_engine
+from financial_analyzer import anomalies as anomaly_engine
+from financial_analyzer.statement_cache import read_bytes
+from financial_analyzer.normalize import find_header_row, normalize_wide
+from financial_analyzer.readers import header_start, read_table
+
+# Текстовые столбцы длинной таблицы, которые хранятся как категории
+CATEGORY_COLUMNS = ['Показатель', 'Код', 'Ед.изм.']
+# Столбцы длинной таблицы, которые читаются из файла
+STATEMENT_COLUMNS = CATEGORY_COLUMNS + ['Год', 'Значение']
+
+# Показатели горизонтального анализа
+HORIZONTAL_INDICATORS = [
+    'Выручка',
+    'Себестоимость продаж',
+    'Чистая прибыль (убыток)',
+    'БАЛАНС (актив)',
+    'Итого по разделу III - Капитал и резервы',
+    'Итого по разделу V - Краткосрочные обязательства'
+]
+
+# Структура актива баланса
+ASSET_ITEMS = [
+    'Нематериальные активы',
+    'Основные средства',
+    'Запасы',
+    'Дебиторская задолженность',
+    'Денежные средства и денежные эквиваленты',
+    'Прочие внеоборотные активы',
+    'Прочие оборотные активы'
+]
+
+# Структура пассива баланса
+LIABILITY_ITEMS = [
+    'Уставный капитал (складочный капитал, уставный фонд, вклады товарищей)',
+    'Нераспределенная прибыль (непокрытый убыток)',
+    'Заемные средства',
+    'Кредиторская задолженность',
+    'Отложенные налоговые обязательства'
+]
+
+
+def _report(messages, text):
+    """Добавляет сообщение в список, если он передан"""
+    if messages is not None:
+        messages.append(text)
+
+
+def load_data(file, messages=None):
+    """
+    Загружает данные из Excel файла: только столбцы длинной таблицы,
+    строки до заголовка с «Показатель» пропускаются. Широкая выгрузка
+    (по столбцу на год) приводится к длинной таблице.
+    """
+    try:
+        df = read_table(file, usecols=STATEMENT_COLUMNS, start=header_start(['Показатель']))
+        if 'Значение' not in df.columns:
+            raw = read_table(file, header=False)
+            if find_header_row(raw) is not None:
+                df = normalize_wide(raw)
+        return df
+    except Exception as e:
+        _report(messages, f"Ошибка при загрузке файла: {e}")
+        return None
+
+
+def preprocess_data(df, messages=None):
+    """Предобрабатывает данные для анализа"""
+    # Очистка данных
+    df['Значение'] = pd.to_numeric(df['Значение'], errors='coerce')
+
+    # Проверка на пустые значения
+    if df['Значение'].isnull().any():
+        _report(messages, "В данных обнаружены пустые значения. Они будут заменены на 0.")
+        df['Значение'] = df['Значение'].fillna(0)
+
+    return compact_frame(df)
+
+
+def compact_frame(df):
+    """
+    Компактное представление длинной таблицы: текстовые столбцы хранятся
+    как категории (строка с кодом на каждую запись вместо повторяющейся
+    строки), год — как int16, значение — как float64.
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            values = df[column]
+            df[column] = values.where(values.isna(), values.astype(str)).astype('category')
+
+    if 'Год' in df.columns:
+        years = pd.to_numeric(df['Год'], errors='coerce')
+        limits = np.iinfo(np.int16)
+        if years.notna().all() and (years % 1 == 0).all() and years.between(limits.min, limits.max).all():
+            df['Год'] = years.astype(np.int16)
+
+    if 'Значение' in df.columns:
+        df['Значение'] = df['Значение'].astype(np.float64)
+    return df
+
+
+def frame_memory(df):
+    """Объем памяти таблицы в байтах с учетом содержимого строк"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def indicator_mask(df, names):
+    """Маска строк с показателями из names; для категорий сравниваются коды, а не строки"""
+    column = df['Показатель']
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.categories.get_indexer(list(names))
+        return np.isin(column.cat.codes.to_numpy(), codes[codes >= 0])
+    return column.isin(names).to_numpy()
+
+
+def select_indicators(df, names):
+    """Строки с показателями из names без неиспользуемых категорий (их не ждут графики)"""
+    selected = df[indicator_mask(df, names)]
+    for column in CATEGORY_COLUMNS:
+        if column in selected.columns and isinstance(selected[column].dtype, pd.CategoricalDtype):
+            selected = selected.assign(**{column: selected[column].cat.remove_unused_categories()})
+    return selected
+
+
+def load_statement(file, cache=None, messages=None):
+    """
+    Загружает и предобрабатывает отчетность. Если передан StatementCache,
+    повторная загрузка того же файла читает готовую таблицу с диска.
+    """
+    def parse(data, messages):
+        df = load_data(BytesIO(data), messages)
+        return preprocess_data(df, messages) if df is not None else None
+
+    if cache is None:
+        return parse(read_bytes(file), messages)
+    return cache.load(file, parse, messages)
+
+
+def as_cube(data):
+    """Возвращает StatementCube для таблицы или уже построенного куба"""
+    if isinstance(data, StatementCube):
+        return data
+    return StatementCube.from_frame(data)
+
+
+def calculate_financial_ratios(data, messages=None):
+    """Рассчитывает финансовые коэффициенты за последний год"""
+    cube = as_cube(data)
+
+    # Коэффициенты считаются сразу по всем годам, берем последний
+    ratio_table = evaluate_ratios(cube)
+
+    missing = missing_indicators(cube)
+    if missing:
+        _report(messages, f"Не хватает данных для расчета некоторых коэффициентов: {', '.join(missing)}")
+
+    ratios = {}
+    if ratio_table.empty:
+        return ratios
+
+    recent_values = ratio_table.iloc[-1]
+    for ratio_name, value in recent_values.items():
+        ratios[ratio_name] = {
+            'value': value,
+            'norm': get_norm_value(ratio_name),
+            'interpretation': interpret_ratio(ratio_name, value)
+        }
+
+    return ratios
+
+
+def get_norm_value(ratio_name):
+    """Возвращает нормативное значение для коэффициента"""
+    return ratio_engine.get_norm_value(ratio_name)
+
+
+def interpret_ratio(ratio_name, value):
+    """Интерпретирует значение коэффициента"""
+    if pd.isna(value) or value is None:
+        return "Недостаточно данных для интерпретации"
+
+    if ratio_name in RATIO_REGISTRY:
+        if value >= get_norm_value(ratio_name):
+            return "✅ Хорошее значение"
+        elif value >= get_norm_value(ratio_name) * 0.7:
+            return "🟡 Удовлетворительное значение"
+        else:
+            return "❌ Низкое значение"
+
+    return ""
+
+
+def perform_horizontal_analysis(data):
+    """Выполняет горизонтальный анализ (динамика)"""
+    cube = as_cube(data)
+
+    # Сводная таблица с годами в столбцах берется прямо из куба
+    table = cube.to_frame(sorted(HORIZONTAL_INDICATORS))
+    table = table.loc[:, table.notna().any(axis=0)]
+    pivot_df = table.reset_index()
+
+    # Рассчитываем абсолютные и относительные изменения
+    years = list(table.columns)
+    values = table.to_numpy()
+    for i in range(1, len(years)):
+        add_change_columns(pivot_df, years[i-1], years[i], values[:, i-1], values[:, i])
+
+    return pivot_df
+
+
+def add_change_columns(pivot_df, prev_year, curr_year, prev_values, curr_values):
+    """Добавляет столбцы абсолютного и относительного изменения за пару лет"""
+    # Абсолютное изменение
+    pivot_df[f'Δ {prev_year}-{curr_year}'] = curr_values - prev_values
+
+    # Относительное изменение в процентах
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pivot_df[f'Δ% {prev_year}-{curr_year}'] = np.where(
+            prev_values != 0,
+            (curr_values - prev_values) / np.abs(prev_values) * 100,
+            np.nan
+        )
+
+
+def perform_vertical_analysis(data, year=None):
+    """
+    Выполняет вертикальный анализ (структура). Для таблицы строки берутся
+    из нее самой со всеми столбцами и в порядке файла; для куба — только
+    Показатель/Год/Значение, так как Код и Ед.изм. в кубе не хранятся.
+    """
+    if isinstance(data, StatementCube):
+        return _cube_structure(data, year)
+
+    if year is None:
+        year = data['Год'].max()
+
+    # Фильтруем данные за указанный год
+    year_df = data[data['Год'] == year]
+
+    asset_df = _frame_structure(year_df, ASSET_ITEMS, 'БАЛАНС (актив)')
+    liability_df = _frame_structure(year_df, LIABILITY_ITEMS, 'БАЛАНС (пассив)')
+
+    return asset_df, liability_df
+
+
+def _frame_structure(year_df, items, total_name):
+    """Строки items из таблицы за год с долями от итога total_name"""
+    structure_df = year_df[year_df['Показатель'].isin(items)].copy()
+    total = year_df.loc[year_df['Показатель'] == total_name, 'Значение']
+    # Рассчитываем доли в процентах
+    structure_df['Доля, %'] = structure_df['Значение'] / (total.iloc[0] if not total.empty else 1) * 100
+    return structure_df
+
+
+def _cube_structure(cube, year=None):
+    """Вертикальный анализ по кубу; для пустого куба — пустые таблицы"""
+    if year is None:
+        year = cube.years[-1] if cube.years else None
+
+    # Получаем итоговые значения для расчета долей
+    total_assets = cube.get('БАЛАНС (актив)', year, 1) if year is not None else 1
+    total_liabilities = cube.get('БАЛАНС (пассив)', year, 1) if year is not None else 1
+
+    asset_df = _structure_frame(cube, ASSET_ITEMS, year, total_assets)
+    liability_df = _structure_frame(cube, LIABILITY_ITEMS, year, total_liabilities)
+
+    return asset_df, liability_df
+
+
+def _structure_frame(cube, items, year, total):
+    """Собирает таблицу структуры за год с долями от итога"""
+    column = cube.column(year) if year is not None else None
+    rows = []
+    if column is not None:
+        rows = sorted(cube.indicator_index[name] for name in items if name in cube)
+        rows = [i for i in rows if not np.isnan(column[i])]
+    values = column[rows] if rows else np.array([], dtype=np.float64)
+
+    structure_df = pd.DataFrame({
+        'Показатель': [cube.indicators[i] for i in rows],
+        'Год': year,
+        'Значение': values,
+    })
+    # Рассчитываем доли в процентах
+    structure_df['Доля, %'] = structure_df['Значение'] / total * 100
+    return structure_df
+
+
+def detect_anomalies(data, detectors=None):
+    """
+    Обнаруживает аномалии в финансовых данных. detectors — набор
+    статистических детекторов (см. anomalies.resolve_detectors).
+    """
+    return anomaly_engine.detect_anomalies(as_cube(data), detectors=detectors)
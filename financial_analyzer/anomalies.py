@@ -0,0 +1,354 @@
+"""
+Векторный поиск аномалий по матрице показатель × год.
+
+Статистические проверки выполняют детекторы из DETECTOR_REGISTRY: каждый
+считает оценки сразу для всех ключевых показателей и лет, аномалией
+считается оценка, превышающая порог по модулю. Набор детекторов задается
+аргументом detectors или переменной PROJECT_ALPHA_DETECTORS
+(например, "rolling,mad=3"), по умолчанию работает только z_score.
+"""
+
+import os
+
+import numpy as np
+
+from financial_analyzer.rules import active_rules
+
+REVENUE = 'Выручка'
+NET_PROFIT = 'Чистая прибыль (убыток)'
+RECEIVABLES = 'Дебиторская задолженность'
+PAYABLES = 'Кредиторская задолженность'
+CURRENT_ASSETS = 'Итого по разделу II - Оборотные активы'
+SHORT_LIABILITIES = 'Итого по разделу V - Краткосрочные обязательства'
+
+# Показатели, для которых считается Z-score
+Z_SCORE_INDICATORS = [REVENUE, NET_PROFIT, RECEIVABLES, PAYABLES]
+Z_SCORE_THRESHOLD = 3
+Z_SCORE_HIGH = 4
+
+# Скользящее окно: сколько предыдущих лет берется и сколько из них должно быть заполнено
+ROLLING_WINDOW = 5
+ROLLING_MIN_PERIODS = 3
+# Робастные оценки: минимум значений в ряду и множители, приводящие
+# MAD и среднее абсолютное отклонение к стандартному для нормального распределения
+ROBUST_MIN_VALUES = 4
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+
+DETECTORS_VARIABLE = 'PROJECT_ALPHA_DETECTORS'
+DEFAULT_DETECTORS = ['z_score']
+
+
+def key_indicators(rules):
+    """Строки, которые читают все проверки: Z-score, затем показатели бизнес-правил"""
+    return Z_SCORE_INDICATORS + [name for name in rules.indicators if name not in Z_SCORE_INDICATORS]
+
+
+def select_rows(values, indicator_index, indicators):
+    """Строки массива (..., показатели, годы) для списка показателей; отсутствующие — NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    rows = [indicator_index.get(name, -1) for name in indicators]
+    present = np.array([row >= 0 for row in rows], dtype=bool)
+    if values.shape[-2] == 0:
+        return np.full(values.shape[:-2] + (len(rows), values.shape[-1]), np.nan), present
+    selected = values[..., [max(row, 0) for row in rows], :]
+    return np.where(present[:, None], selected, np.nan), present
+
+
+def moments(matrix):
+    """
+    Число значений, среднее и сумма квадратов отклонений по строкам;
+    NaN не учитываются.
+    """
+    present = ~np.isnan(matrix)
+    count = present.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(present, matrix, 0.0).sum(axis=-1) / count
+    m2 = (np.where(present, matrix - mean[..., None], 0.0) ** 2).sum(axis=-1)
+    return count, mean, m2
+
+
+def scores_from_moments(matrix, count, mean, m2):
+    """Z-score значений по готовым моментам строк"""
+    count, mean, m2 = count[..., None], mean[..., None], m2[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 / (count - 1))
+        valid = ~np.isnan(matrix) & (count > 1) & (std > 0)
+        return np.where(valid, (matrix - mean) / np.where(valid, std, 1.0), np.nan)
+
+
+def z_scores(matrix):
+    """
+    Z-score каждого значения относительно среднего и выборочного
+    стандартного отклонения своей строки. Строки, где меньше двух значений
+    или отклонение равно нулю, дают NaN.
+    """
+    return scores_from_moments(matrix, *moments(matrix))
+
+
+def nan_median(matrix):
+    """Медиана по последней оси без учета NaN; пустые строки дают NaN"""
+    if matrix.shape[-1] == 0:
+        return np.full(matrix.shape[:-1], np.nan)
+    # np.sort ставит NaN в конец строки, медиана берется среди первых count значений
+    ordered = np.sort(matrix, axis=-1)
+    count = (~np.isnan(matrix)).sum(axis=-1, keepdims=True)
+    low = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0), axis=-1)
+    high = np.take_along_axis(ordered, count // 2, axis=-1)
+    return np.where(count > 0, (low + high) / 2, np.nan)[..., 0]
+
+
+def rolling_z_scores(matrix, window=ROLLING_WINDOW, min_periods=ROLLING_MIN_PERIODS):
+    """
+    Z-score значения относительно среднего и отклонения предыдущих window
+    лет той же строки. Текущее значение в окно не входит, поэтому выброс
+    не размывает собственную оценку. Окна, где меньше min_periods
+    значений или отклонение равно нулю, дают NaN.
+    """
+    padded = np.concatenate([np.full(matrix.shape[:-1] + (window,), np.nan), matrix], axis=-1)
+    # Окно для года j — значения лет j-window..j-1
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)[..., :matrix.shape[-1], :]
+    present = ~np.isnan(windows)
+    count = present.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(present, windows, 0.0).sum(axis=-1) / count
+        m2 = (np.where(present, windows - mean[..., None], 0.0) ** 2).sum(axis=-1)
+        std = np.sqrt(m2 / (count - 1))
+        valid = ~np.isnan(matrix) & (count >= max(min_periods, 2)) & (std > 0)
+        return np.where(valid, (matrix - mean) / np.where(valid, std, 1.0), np.nan)
+
+
+def robust_z_scores(matrix, min_values=ROBUST_MIN_VALUES):
+    """
+    Робастный Z-score: отклонение от медианы строки в единицах MAD.
+    Если больше половины значений совпадает и MAD равен нулю, вместо него
+    берется среднее абсолютное отклонение от медианы. Строки, где меньше
+    min_values значений или разброса нет, дают NaN.
+    """
+    count = (~np.isnan(matrix)).sum(axis=-1)[..., None]
+    median = nan_median(matrix)[..., None]
+    deviation = np.abs(matrix - median)
+    mad = MAD_SCALE * nan_median(deviation)[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_ad = MEAN_AD_SCALE * np.where(np.isnan(deviation), 0.0, deviation).sum(axis=-1)[..., None] / count
+        scale = np.where(mad > 0, mad, mean_ad)
+        valid = ~np.isnan(matrix) & (count >= min_values) & (scale > 0)
+        return np.where(valid, (matrix - median) / np.where(valid, scale, 1.0), np.nan)
+
+
+def log_growth(matrix):
+    """Логарифм темпа роста к предыдущему году; для неположительных значений — NaN"""
+    previous = np.concatenate([np.full(matrix.shape[:-1] + (1,), np.nan), matrix[..., :-1]], axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((matrix > 0) & (previous > 0), np.log(matrix / previous), np.nan)
+
+
+def log_growth_scores(matrix):
+    """Робастный Z-score логарифмов темпа роста: выбросы среди годовых изменений"""
+    return robust_z_scores(log_growth(matrix))
+
+
+# Статистические детекторы. score — функция (..., показатели, годы) -> оценки той же
+# формы; threshold и high — пороги аномалии и высокой важности, thresholds — пороги
+# для отдельных показателей; description — шаблон с полями direction, score,
+# growth, year и prev_year.
+DETECTOR_REGISTRY = {
+    'z_score': {
+        'score': z_scores,
+        'threshold': Z_SCORE_THRESHOLD,
+        'high': Z_SCORE_HIGH,
+        'type': 'Статистическая',
+        'label': 'Статистические',
+        'description': "Резкое {direction} показателя ({score:.2f} стандартных отклонений от среднего)",
+    },
+    'rolling': {
+        'score': rolling_z_scores,
+        'threshold': 3,
+        'high': 5,
+        'type': 'Скользящая статистическая',
+        'label': 'Скользящее окно',
+        'description': f"Резкое {{direction}} показателя относительно {ROLLING_WINDOW} предыдущих лет "
+                       f"({{score:.2f}} стандартных отклонений)",
+    },
+    'mad': {
+        'score': robust_z_scores,
+        'threshold': 3.5,
+        'high': 5,
+        'type': 'Робастная статистическая',
+        'label': 'Робастные (MAD)',
+        'description': "Резкое {direction} показателя ({score:.2f} робастных отклонений от медианы)",
+    },
+    'log_growth': {
+        'score': log_growth_scores,
+        'threshold': 3.5,
+        'high': 5,
+        'thresholds': {NET_PROFIT: 4},
+        'type': 'Темп роста',
+        'label': 'Темп роста',
+        'description': "Нетипичный темп роста к {prev_year} году: {growth:+.1%} ({score:.2f} робастных отклонений)",
+    },
+}
+
+
+def parse_detectors(text):
+    """Строка вида "rolling,mad=3" -> {детектор: порог или None}"""
+    detectors = {}
+    for item in text.split(','):
+        name, _, threshold = item.strip().partition('=')
+        if not name:
+            continue
+        try:
+            detectors[name.strip()] = float(threshold) if threshold.strip() else None
+        except ValueError:
+            raise ValueError(f"Порог детектора '{name.strip()}' должен быть числом: {threshold}")
+    return detectors
+
+
+def resolve_detectors(detectors=None):
+    """
+    Пороги выбранных детекторов по ключевым показателям.
+
+    detectors — список имен или словарь {детектор: порог}, где порог —
+    None (по умолчанию), число для всех показателей или словарь
+    {показатель: порог}. Если detectors не задан, набор берется из
+    PROJECT_ALPHA_DETECTORS. Возвращает {детектор: столбец порогов}.
+    """
+    if detectors is None:
+        text = os.environ.get(DETECTORS_VARIABLE)
+        detectors = parse_detectors(text) if text else DEFAULT_DETECTORS
+    if not isinstance(detectors, dict):
+        detectors = dict.fromkeys(detectors)
+
+    resolved = {}
+    for name, custom in detectors.items():
+        if name not in DETECTOR_REGISTRY:
+            raise ValueError(f"Неизвестный детектор аномалий: {name}")
+        spec = DETECTOR_REGISTRY[name]
+        thresholds = dict(spec.get('thresholds', {}))
+        if isinstance(custom, dict):
+            thresholds.update(custom)
+        elif custom is not None:
+            thresholds = dict.fromkeys(Z_SCORE_INDICATORS, custom)
+        resolved[name] = np.array(
+            [thresholds.get(indicator, spec['threshold']) for indicator in Z_SCORE_INDICATORS], dtype=np.float64
+        )[:, None]
+    return resolved
+
+
+def detector_scores(rows, detectors):
+    """
+    Оценки и маски детекторов по строкам Z-score массива (..., показатели, годы).
+    Возвращает {детектор: (оценки, маска)}.
+    """
+    results = {}
+    for name, thresholds in detectors.items():
+        scores = DETECTOR_REGISTRY[name]['score'](rows)
+        results[name] = scores, np.abs(np.nan_to_num(scores)) > thresholds
+    return results
+
+
+def anomaly_masks(values, indicator_index, rules=None, detectors=None):
+    """
+    Все проверки одним проходом по массиву (..., показатели, годы).
+
+    Возвращает словарь массивов: оценки и маски статистических детекторов,
+    общую маску статистических аномалий и маски бизнес-правил по годам
+    (для правил, сравнивающих соседние годы, маска относится к более
+    позднему году). rules — RuleSet, по умолчанию действующий набор
+    правил; detectors — как в resolve_detectors.
+    """
+    rules = active_rules() if rules is None else rules
+    indicators = key_indicators(rules)
+    rows, _ = select_rows(values, indicator_index, indicators)
+
+    detected = detector_scores(rows[..., :len(Z_SCORE_INDICATORS), :], resolve_detectors(detectors))
+    statistical = np.zeros(rows.shape[:-2] + (len(Z_SCORE_INDICATORS), rows.shape[-1]), dtype=bool)
+    for _, mask in detected.values():
+        statistical |= mask
+
+    evaluation = rules.evaluate(rows, {name: k for k, name in enumerate(indicators)})
+    masks = {
+        'detectors': detected,
+        'statistical': statistical,
+        'rows': rows,
+        'rules': (rules, evaluation),
+    }
+    for r, name in enumerate(rules.names):
+        masks[name] = evaluation['masks'][..., r, :]
+    return masks
+
+
+def statistical_records(name, scores, mask, rows, years):
+    """
+    Словари аномалий одного детектора: порядок — по показателю, затем по
+    году. Оценка детектора записывается в поле z_score.
+    """
+    spec = DETECTOR_REGISTRY[name]
+    records = []
+    for k, j in zip(*np.nonzero(mask)):
+        score = scores[k, j]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = rows[k, j] / rows[k, j - 1] - 1 if j > 0 else np.nan
+        records.append({
+            'type': spec['type'],
+            'indicator': Z_SCORE_INDICATORS[k],
+            'year': years[j],
+            'value': rows[k, j],
+            'z_score': score,
+            'severity': 'high' if abs(score) > spec['high'] else 'medium',
+            'description': spec['description'].format(
+                direction='увеличение' if score > 0 else 'снижение', score=score, growth=growth,
+                year=years[j], prev_year=years[j - 1] if j > 0 else ''
+            )
+        })
+    return records
+
+
+def rule_records(masks, years, columns=None):
+    """
+    Словари аномалий бизнес-правил по маскам anomaly_masks.
+    columns ограничивает проверяемые годы (номера столбцов).
+    Возвращает словарь {правило: список аномалий}.
+    """
+    rules, evaluation = masks['rules']
+
+    def hits(mask):
+        found = np.flatnonzero(mask)
+        return found if columns is None else found[np.isin(found, columns)]
+
+    records = {rule: [] for rule in rules.names}
+    for rule in rules.names:
+        spec = rules.registry[rule]
+        values = evaluation['values'][rule]
+        fields = evaluation['fields'][rule]
+        for j in hits(masks[rule]):
+            value = values[j]
+            records[rule].append({
+                'type': spec.get('type', 'Бизнес-логика'),
+                'indicator': spec['indicator'],
+                'year': years[j],
+                'value': value,
+                'severity': spec['severity'],
+                'description': spec['description'].format(
+                    year=years[j], prev_year=years[j - 1] if j > 0 else '', value=value,
+                    **{field: field_values[j] for field, field_values in fields.items()}
+                )
+            })
+
+    return records
+
+
+def detect_anomalies(cube, rules=None, detectors=None):
+    """Обнаруживает аномалии в StatementCube и возвращает список словарей"""
+    masks = anomaly_masks(cube.values, cube.indicator_index, rules, detectors)
+
+    # 1. Статистические аномалии — по детекторам в порядке их выбора
+    anomalies = []
+    for name, (scores, mask) in masks['detectors'].items():
+        anomalies.extend(statistical_records(name, scores, mask, masks['rows'], cube.years))
+
+    # 2. Бизнес-логические аномалии
+    for records in rule_records(masks, cube.years).values():
+        anomalies.extend(records)
+
+    return anomalies
@@ -0,0 +1,234 @@
+"""Пакетный анализ каталога с файлами отчетности без Streamlit"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer import analysis
+from financial_analyzer.ratios import evaluate_ratios
+
+REQUIRED_COLUMNS = ['Показатель', 'Год', 'Значение']
+STATEMENT_PATTERNS = ('*.xlsx', '*.xls')
+# Этапы анализа: коэффициенты (с таблицей по годам), горизонтальный и вертикальный анализ, аномалии
+STAGES = ('ratios', 'horizontal', 'vertical', 'anomalies')
+
+ANOMALY_COLUMNS = ['company', 'type', 'indicator', 'year', 'value', 'z_score', 'severity', 'description']
+ISSUE_COLUMNS = ['company', 'level', 'message']
+HORIZONTAL_COLUMNS = ['Показатель', 'Период', 'Δ', 'Δ%']
+
+
+@dataclass
+class AnalysisResult:
+    """Результаты анализа одной отчетности и накопленные предупреждения"""
+    company: str
+    source: str = ''
+    ratios: dict = field(default_factory=dict)
+    ratio_table: pd.DataFrame = None
+    horizontal: pd.DataFrame = None
+    vertical_assets: pd.DataFrame = None
+    vertical_liabilities: pd.DataFrame = None
+    anomalies: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def horizontal_deltas(self):
+        """Длинная таблица изменений: показатель, период, Δ и Δ%"""
+        return horizontal_deltas(self.horizontal)
+
+
+def split_horizontal(horizontal):
+    """Разбирает таблицу горизонтального анализа на показатели, периоды и массивы Δ, Δ%"""
+    delta_columns = [col for col in horizontal.columns if isinstance(col, str) and col.startswith('Δ ')]
+    periods = [col[2:] for col in delta_columns]
+    deltas = horizontal[delta_columns].to_numpy(dtype=np.float64)
+    percents = horizontal[[f'Δ% {period}' for period in periods]].to_numpy(dtype=np.float64)
+    return horizontal['Показатель'].tolist(), periods, deltas, percents
+
+
+def deltas_frame(indicators, periods, deltas, percents):
+    """Длинная таблица изменений по показателям и периодам"""
+    if not indicators or not periods:
+        return pd.DataFrame(columns=HORIZONTAL_COLUMNS)
+    return pd.DataFrame({
+        'Показатель': np.repeat(indicators, len(periods)),
+        'Период': np.tile(periods, len(indicators)),
+        'Δ': deltas.ravel(),
+        'Δ%': percents.ravel(),
+    })
+
+
+def horizontal_deltas(horizontal):
+    """Переводит изменения из таблицы горизонтального анализа в длинный формат"""
+    if horizontal is None or horizontal.empty:
+        return pd.DataFrame(columns=HORIZONTAL_COLUMNS)
+    return deltas_frame(*split_horizontal(horizontal))
+
+
+def analyze_frame(df, company, source='', year=None, stages=STAGES):
+    """Выполняет анализ загруженной таблицы: этапы stages, по умолчанию все"""
+    result = AnalysisResult(company=company, source=source)
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        result.error = f"В файле нет столбцов: {', '.join(missing)}"
+        return result
+
+    df = analysis.preprocess_data(df, result.warnings)
+    return analyze_cube(analysis.as_cube(df), result, year, stages)
+
+
+def analyze_cube(cube, result, year=None, stages=STAGES):
+    """Заполняет результат анализа по готовому кубу; считаются только этапы stages"""
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Неизвестные этапы анализа: {', '.join(sorted(unknown))}")
+    if not cube.years:
+        result.error = "В файле нет данных за какой-либо год"
+        return result
+
+    if 'ratios' in stages:
+        result.ratios = analysis.calculate_financial_ratios(cube, result.warnings)
+        result.ratio_table = evaluate_ratios(cube)
+    if 'horizontal' in stages:
+        result.horizontal = analysis.perform_horizontal_analysis(cube)
+    if 'vertical' in stages:
+        result.vertical_assets, result.vertical_liabilities = analysis.perform_vertical_analysis(cube, year)
+    if 'anomalies' in stages:
+        result.anomalies = analysis.detect_anomalies(cube)
+    return result
+
+
+def analyze_file(path, year=None, streaming=False, company=None):
+    """
+    Загружает и анализирует один файл; ошибки сохраняются в результат.
+    streaming=True читает файлы .xlsx порциями, не загружая лист целиком.
+    company — идентификатор компании, по умолчанию имя файла.
+    """
+    path = Path(path)
+    company = company or path.stem
+    if streaming and path.suffix.lower() == '.xlsx':
+        return analyze_file_streaming(path, year, company)
+
+    messages = []
+    df = analysis.load_data(path, messages)
+    if df is None:
+        return AnalysisResult(company=company, source=str(path), error='; '.join(messages))
+
+    try:
+        result = analyze_frame(df, company, str(path), year)
+    except Exception as e:
+        return AnalysisResult(company=company, source=str(path), warnings=messages, error=f"Ошибка анализа: {e}")
+    result.warnings[:0] = messages
+    return result
+
+
+def analyze_file_streaming(path, year=None, company=None):
+    """Анализ большого файла через потоковое построение куба"""
+    from financial_analyzer.streaming import stream_cube
+
+    path = Path(path)
+    result = AnalysisResult(company=company or path.stem, source=str(path))
+    try:
+        cube = stream_cube(path, messages=result.warnings)
+        return analyze_cube(cube, result, year)
+    except Exception as e:
+        result.error = f"Ошибка анализа: {e}"
+        return result
+
+
+def find_statements(directory, patterns=STATEMENT_PATTERNS):
+    """Файлы отчетности в каталоге (рекурсивно), без временных файлов Excel"""
+    directory = Path(directory)
+    files = set()
+    for pattern in patterns:
+        files.update(path for path in directory.rglob(pattern) if not path.name.startswith('~$'))
+    return sorted(files)
+
+
+def company_ids(paths, directory):
+    """
+    Идентификаторы компаний по файлам каталога: путь файла относительно
+    каталога без расширения (agro, region/agro), поэтому одноименные файлы
+    из разных подкаталогов не сливаются в одну компанию. Идентификатор не
+    зависит от порядка файлов. Расширение остается, только если рядом
+    лежит файл с тем же именем.
+    """
+    relative = [Path(path).relative_to(directory) for path in paths]
+    stems = Counter(path.with_suffix('').as_posix() for path in relative)
+    return [path.as_posix() if stems[path.with_suffix('').as_posix()] > 1 else path.with_suffix('').as_posix()
+            for path in relative]
+
+
+def consolidate(results):
+    """Сводит результаты в таблицы коэффициентов, аномалий и замечаний"""
+    ratio_frames = []
+    horizontal_frames = []
+    anomaly_rows = []
+    issue_rows = []
+
+    for result in results:
+        if result.ratio_table is not None and not result.ratio_table.empty:
+            frame = result.ratio_table.reset_index()
+            frame.insert(0, 'company', result.company)
+            ratio_frames.append(frame)
+        deltas = result.horizontal_deltas
+        if not deltas.empty:
+            deltas.insert(0, 'company', result.company)
+            horizontal_frames.append(deltas)
+        for anomaly in result.anomalies:
+            anomaly_rows.append({'company': result.company, **anomaly})
+        for message in result.warnings:
+            issue_rows.append({'company': result.company, 'level': 'warning', 'message': message})
+        if result.error:
+            issue_rows.append({'company': result.company, 'level': 'error', 'message': result.error})
+
+    ratios_df = pd.concat(ratio_frames, ignore_index=True) if ratio_frames else pd.DataFrame(columns=['company', 'Год'])
+    horizontal_df = pd.concat(horizontal_frames, ignore_index=True) if horizontal_frames else pd.DataFrame(columns=['company'] + HORIZONTAL_COLUMNS)
+    anomalies_df = pd.DataFrame(anomaly_rows).reindex(columns=ANOMALY_COLUMNS)
+    issues_df = pd.DataFrame(issue_rows, columns=ISSUE_COLUMNS)
+    return ratios_df, horizontal_df, anomalies_df, issues_df
+
+
+def write_tables(results, output_dir):
+    """Записывает сводные таблицы в CSV и возвращает пути к файлам"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    ratios_df, horizontal_df, anomalies_df, issues_df = consolidate(results)
+    paths = {
+        'ratios': output_dir / 'ratios.csv',
+        'horizontal': output_dir / 'horizontal.csv',
+        'anomalies': output_dir / 'anomalies.csv',
+        'issues': output_dir / 'issues.csv',
+    }
+    ratios_df.to_csv(paths['ratios'], index=False, encoding='utf-8')
+    horizontal_df.to_csv(paths['horizontal'], index=False, encoding='utf-8')
+    anomalies_df.to_csv(paths['anomalies'], index=False, encoding='utf-8')
+    issues_df.to_csv(paths['issues'], index=False, encoding='utf-8')
+    return paths
+
+
+def run_batch(directory, output_dir, year=None, workers=1, chunksize=None, streaming=False):
+    """
+    Анализирует все файлы каталога и записывает сводные таблицы.
+    При workers != 1 файлы обрабатываются в пуле процессов
+    (workers=None — по числу ядер).
+    """
+    paths = find_statements(directory)
+    companies = company_ids(paths, directory)
+    if workers == 1:
+        results = [analyze_file(path, year, streaming, company) for path, company in zip(paths, companies)]
+    else:
+        from financial_analyzer.parallel import run_parallel
+        results = run_parallel(paths, workers=workers, chunksize=chunksize, year=year, streaming=streaming,
+                               companies=companies)
+    paths = write_tables(results, output_dir)
+    return results, paths
@@ -0,0 +1,172 @@
+"""
+Построение графиков Plotly без зависимости от Streamlit.
+
+Графики строятся по StatementCube. Длинные ряды прореживаются до
+MAX_POINTS точек на фигуру, чтобы объем JSON, который уходит в браузер,
+не зависел от числа лет. Прореживание сохраняет минимум и максимум
+каждого отрезка ряда, поэтому пики и провалы остаются на графике.
+Аномалии выводятся одним набором маркеров на каждую важность.
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Наибольшее число точек линий в одной фигуре
+MAX_POINTS = 2000
+
+KEY_INDICATORS = [
+    'Выручка',
+    'Чистая прибыль (убыток)',
+    'БАЛАНС (актив)',
+    'Итого по разделу III - Капитал и резервы'
+]
+
+# Оформление маркеров аномалий по важности
+SEVERITY_MARKERS = {
+    'high': {'name': 'Аномалии: высокая важность', 'color': 'red', 'symbol': 'x'},
+    'medium': {'name': 'Аномалии: средняя важность', 'color': 'orange', 'symbol': 'diamond'},
+}
+
+
+def downsample(x, y, max_points):
+    """
+    Прореживает ряд до max_points точек: ряд делится на отрезки, из каждого
+    берутся точки минимума и максимума (в исходном порядке). Первая и
+    последняя точки сохраняются. Пропуски (NaN) отбрасываются.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    present = ~np.isnan(y)
+    x, y = x[present], y[present]
+    if len(y) <= max_points:
+        return x, y
+
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-(len(y) - 2) // buckets)
+    inner = y[1:-1]
+    padded = np.full(buckets * size, np.nan)
+    padded[:len(inner)] = inner
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size + 1
+    filled = ~np.isnan(blocks).all(axis=1)
+    low = np.nanargmin(np.where(filled[:, None], blocks, 0.0), axis=1) + offsets
+    high = np.nanargmax(np.where(filled[:, None], blocks, 0.0), axis=1) + offsets
+    index = np.unique(np.concatenate([[0], low[filled], high[filled], [len(y) - 1]]))
+    return x[index], y[index]
+
+
+def _line_traces(cube, indicators, max_points):
+    """Линии показателей куба; бюджет точек делится между линиями поровну"""
+    names = [name for name in indicators if name in cube]
+    budget = max(2, max_points // max(1, len(names)))
+    traces = []
+    for name in names:
+        x, y = downsample(cube.years, cube.row(name), budget)
+        traces.append(go.Scatter(x=x, y=y, mode='lines+markers', name=name))
+    return traces
+
+
+def key_indicators_trend(cube, max_points=MAX_POINTS):
+    """График динамики ключевых показателей"""
+    fig = go.Figure(_line_traces(cube, KEY_INDICATORS, max_points))
+
+    fig.update_layout(
+        title='Динамика ключевых финансовых показателей',
+        xaxis_title='Год',
+        yaxis_title='Значение, тыс. руб.',
+        hovermode="x unified",
+        legend_title_text='Показатели'
+    )
+
+    return fig
+
+
+def financial_ratios(ratios):
+    """График финансовых коэффициентов с нормативами"""
+    ratio_names = list(ratios.keys())
+    values = [ratios[name]['value'] for name in ratio_names]
+    norms = [ratios[name]['norm'] for name in ratio_names]
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=ratio_names,
+        y=values,
+        name='Фактическое значение',
+        marker_color='steelblue'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=ratio_names,
+        y=norms,
+        mode='lines+markers',
+        name='Нормативное значение',
+        line=dict(color='red', dash='dash'),
+        marker=dict(size=8)
+    ))
+
+    fig.update_layout(
+        title='Финансовые коэффициенты с нормативными значениями',
+        xaxis_title='Коэффициенты',
+        yaxis_title='Значение',
+        barmode='group',
+        hovermode="x unified"
+    )
+
+    return fig
+
+
+def asset_structure(asset_df):
+    """Круговая диаграмма структуры активов"""
+    fig = px.pie(
+        asset_df,
+        names='Показатель',
+        values='Значение',
+        title='Структура активов',
+        hole=0.3
+    )
+
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+
+    return fig
+
+
+def anomaly_visualization(cube, anomalies, max_points=MAX_POINTS):
+    """
+    Динамика показателей с аномалиями. Маркеры аномалий собираются в один
+    след на важность, описание аномалии выводится во всплывающей подсказке.
+    """
+    if not anomalies:
+        return None
+
+    indicators = list(dict.fromkeys(anomaly['indicator'] for anomaly in anomalies))
+    fig = go.Figure(_line_traces(cube, indicators, max_points))
+
+    for severity, style in SEVERITY_MARKERS.items():
+        selected = [anomaly for anomaly in anomalies if anomaly['severity'] == severity]
+        if not selected:
+            continue
+        fig.add_trace(go.Scatter(
+            x=[anomaly['year'] for anomaly in selected],
+            y=[anomaly['value'] for anomaly in selected],
+            mode='markers',
+            name=style['name'],
+            marker=dict(
+                size=15,
+                color=style['color'],
+                symbol=style['symbol'],
+                line=dict(width=2, color='white')
+            ),
+            customdata=[[anomaly['indicator'], anomaly['description']] for anomaly in selected],
+            hovertemplate="<b>%{customdata[0]}</b><br>Год: %{x}<br>Значение: %{y:.0f}<br><i>%{customdata[1]}</i><extra></extra>"
+        ))
+
+    fig.update_layout(
+        title='Динамика показателей с обнаруженными аномалиями',
+        xaxis_title='Год',
+        yaxis_title='Значение',
+        hovermode="x unified",
+        legend_title_text='Показатели'
+    )
+
+    return fig
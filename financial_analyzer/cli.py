@@ -0,0 +1,165 @@
+"""Командная строка: python -m financial_analyzer <команда>"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def _batch(args):
+    """Пакетный анализ каталога с отчетностью"""
+    from financial_analyzer.batch import find_statements, run_batch
+
+    # Без файлов ничего не записывается, даже каталог результатов
+    if not find_statements(args.directory):
+        print(f"В каталоге {args.directory} не найдено файлов Excel", file=sys.stderr)
+        return 1
+    output_dir = args.output or Path(args.directory) / 'analysis_results'
+    if args.workers == 0:
+        args.workers = None
+    results, paths = run_batch(
+        args.directory, output_dir, year=args.year,
+        workers=args.workers, chunksize=args.chunksize, streaming=args.stream
+    )
+
+    failed = sum(1 for result in results if not result.ok)
+    anomalies = sum(len(result.anomalies) for result in results)
+    print(f"Обработано файлов: {len(results)}, с ошибками: {failed}, аномалий: {anomalies}")
+    for name, path in paths.items():
+        print(f"  {name}: {path}")
+    return 0
+
+
+def _report(args):
+    """PDF-отчеты по всем компаниям каталога и сводка портфеля"""
+    from financial_analyzer.batch import find_statements
+    from financial_analyzer.report_batch import run_reports
+
+    if not find_statements(args.directory):
+        print(f"В каталоге {args.directory} не найдено файлов Excel", file=sys.stderr)
+        return 1
+    output_dir = args.output or Path(args.directory) / 'reports'
+    if args.workers == 0:
+        args.workers = None
+    try:
+        entries, paths = run_reports(
+            args.directory, output_dir,
+            workers=args.workers, chunksize=args.chunksize, streaming=args.stream
+        )
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    failed = sum(1 for entry in entries if not entry.ok)
+    print(f"Отчетов: {len(entries) - failed}, с ошибками: {failed}, каталог: {output_dir}")
+    for name, path in paths.items():
+        print(f"  {name}: {path}")
+    return 0
+
+
+def _store(args):
+    """Запись отчетности каталога в хранилище для анализа портфеля"""
+    from financial_analyzer.analysis import load_statement
+    from financial_analyzer.batch import company_ids, find_statements
+    from financial_analyzer.store import META_FILE, StatementStore
+
+    paths = find_statements(args.directory)
+    if not paths:
+        print(f"В каталоге {args.directory} не найдено файлов Excel", file=sys.stderr)
+        return 1
+
+    frames, failed = {}, 0
+    for path, name in zip(paths, company_ids(paths, args.directory)):
+        messages = []
+        df = load_statement(path, messages=messages)
+        if df is None or df.empty:
+            failed += 1
+            print(f"{path}: {'; '.join(messages) or 'нет данных'}", file=sys.stderr)
+            continue
+        frames[name] = df
+
+    if not frames:
+        print("Нет файлов, которые удалось загрузить", file=sys.stderr)
+        return 1
+    if (Path(args.output) / META_FILE).exists():
+        store = StatementStore(args.output, mode='r+')
+    else:
+        years = [int(year) for df in frames.values() for year in df['Год'].dropna().unique()]
+        store = StatementStore.create(args.output, years)
+    messages = []
+    store.write(frames, messages)
+    for message in messages:
+        print(message, file=sys.stderr)
+    print(f"Записано компаний: {len(frames)}, с ошибками: {failed}; в хранилище: {store}")
+    return 0
+
+
+def _serve(args):
+    """HTTP-сервис анализа файлов"""
+    import asyncio
+
+    from financial_analyzer.service import serve
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            workers=args.workers or None, queue_size=args.queue, cache_size=args.cache_size
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m financial_analyzer',
+        description='Финансовый анализатор отчетности без интерфейса Streamlit'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='проанализировать все файлы Excel в каталоге')
+    batch.add_argument('directory', help='каталог с файлами отчетности')
+    batch.add_argument('-o', '--output', help='каталог для сводных таблиц (по умолчанию <directory>/analysis_results)')
+    batch.add_argument('--year', type=int, help='год для вертикального анализа (по умолчанию последний)')
+    batch.add_argument('-j', '--workers', type=int, default=1,
+                       help='число процессов (0 — по числу ядер, по умолчанию 1)')
+    batch.add_argument('--chunksize', type=int, help='число файлов в одной задаче процесса')
+    batch.add_argument('--stream', action='store_true',
+                       help='читать файлы .xlsx порциями (для очень больших выгрузок)')
+    batch.set_defaults(handler=_batch)
+
+    reports = commands.add_parser('report', help='построить PDF-отчет по каждому файлу Excel в каталоге')
+    reports.add_argument('directory', help='каталог с файлами отчетности')
+    reports.add_argument('-o', '--output', help='каталог для отчетов (по умолчанию <directory>/reports)')
+    reports.add_argument('-j', '--workers', type=int, default=1,
+                         help='число процессов (0 — по числу ядер, по умолчанию 1)')
+    reports.add_argument('--chunksize', type=int, help='число файлов в одной задаче процесса')
+    reports.add_argument('--stream', action='store_true',
+                         help='читать файлы .xlsx порциями (для очень больших выгрузок)')
+    reports.set_defaults(handler=_report)
+
+    store = commands.add_parser('store', help='записать отчетность каталога в хранилище для анализа портфеля')
+    store.add_argument('directory', help='каталог с файлами отчетности')
+    store.add_argument('-o', '--output', required=True,
+                       help='каталог хранилища (создается; в существующее хранилище компании дописываются)')
+    store.set_defaults(handler=_store)
+
+    from financial_analyzer import service
+
+    serve = commands.add_parser('serve', help='запустить HTTP-сервис анализа файлов Excel')
+    serve.add_argument('--host', default=service.DEFAULT_HOST, help=f'адрес (по умолчанию {service.DEFAULT_HOST})')
+    serve.add_argument('--port', type=int, default=service.DEFAULT_PORT,
+                       help=f'порт (по умолчанию {service.DEFAULT_PORT})')
+    serve.add_argument('-j', '--workers', type=int, default=1,
+                       help='число процессов для расчетов (0 — по числу ядер, по умолчанию 1)')
+    serve.add_argument('--queue', type=int, default=service.DEFAULT_QUEUE_SIZE,
+                       help=f'сколько запросов может ждать очереди (по умолчанию {service.DEFAULT_QUEUE_SIZE})')
+    serve.add_argument('--cache-size', type=int, default=service.DEFAULT_CACHE_SIZE,
+                       help=f'число результатов в кэше (по умолчанию {service.DEFAULT_CACHE_SIZE})')
+    serve.set_defaults(handler=_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
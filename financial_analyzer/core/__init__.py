@@ -0,0 +1,68 @@
+"""
+Аналитическое ядро без интерфейса: загрузка отчетности, коэффициенты,
+горизонтальный и вертикальный анализ, аномалии, графики и PDF-отчет.
+
+Пакет не зависит от Streamlit. Модули с реализацией импортируются при
+первом обращении к их именам (PEP 562), поэтому import
+financial_analyzer.core не загружает ни pandas, ни plotly, ни fpdf:
+например, plotly подгружается при первом обращении к charts, а fpdf —
+при построении PDF-отчета.
+"""
+
+import importlib
+
+# Имя -> модуль, где оно определено; None — имя само является модулем пакета
+EXPORTS = {
+    # Загрузка и подготовка данных
+    'load_data': 'financial_analyzer.analysis',
+    'preprocess_data': 'financial_analyzer.analysis',
+    'load_statement': 'financial_analyzer.analysis',
+    'as_cube': 'financial_analyzer.analysis',
+    'compact_frame': 'financial_analyzer.analysis',
+    'frame_memory': 'financial_analyzer.analysis',
+    'select_indicators': 'financial_analyzer.analysis',
+    'StatementCube': 'financial_analyzer.cube',
+    'PortfolioCube': 'financial_analyzer.portfolio',
+    'AnalysisPipeline': 'financial_analyzer.pipeline',
+    # Расчеты
+    'calculate_financial_ratios': 'financial_analyzer.analysis',
+    'evaluate_ratios': 'financial_analyzer.ratios',
+    'get_norm_value': 'financial_analyzer.analysis',
+    'interpret_ratio': 'financial_analyzer.analysis',
+    'perform_horizontal_analysis': 'financial_analyzer.analysis',
+    'perform_vertical_analysis': 'financial_analyzer.analysis',
+    'detect_anomalies': 'financial_analyzer.analysis',
+    'analyze_file': 'financial_analyzer.batch',
+    'analyze_frame': 'financial_analyzer.batch',
+    # Функции прежнего app.py
+    'clean_value': 'financial_analyzer.core.compat',
+    'detect_financial_table_start': 'financial_analyzer.core.compat',
+    'extract_years': 'financial_analyzer.core.compat',
+    'load_financial_report': 'financial_analyzer.core.compat',
+    'get_possible_causes': 'financial_analyzer.core.compat',
+    'get_recommendations': 'financial_analyzer.core.compat',
+    'get_indicator_value': 'financial_analyzer.core.compat',
+    'generate_pdf_report': 'financial_analyzer.core.compat',
+    # Графики (plotly) и PDF-отчет (fpdf2)
+    'charts': None,
+    'report': None,
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = EXPORTS[name]
+    if module is None:
+        value = importlib.import_module(f'financial_analyzer.{name}')
+    else:
+        value = getattr(importlib.import_module(module), name)
+    # Следующие обращения берут имя из модуля напрямую
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
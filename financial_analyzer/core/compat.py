@@ -0,0 +1,69 @@
+"""
+Функции прежнего app.py, на которые опираются тесты и внешние скрипты.
+Все они сводятся к вызовам модулей пакета.
+"""
+
+import pandas as pd
+
+from financial_analyzer import normalize
+from financial_analyzer.analysis import as_cube
+from financial_analyzer.readers import header_start, read_table
+
+
+def clean_value(val):
+    """Очистка одного числового значения: None, если это не число"""
+    value = normalize.clean_values([val]).iloc[0]
+    return None if pd.isna(value) else float(value)
+
+
+def detect_financial_table_start(df):
+    """Номер строки, с которой начинается финансовая отчетность"""
+    return normalize.find_table_start(df)
+
+
+def extract_years(header_row):
+    """Годы из заголовков столбцов"""
+    return normalize.extract_years(header_row)
+
+
+def load_financial_report(file_path):
+    """Таблица отчетности из Excel-файла начиная со строки «Показатель»; None при ошибке"""
+    try:
+        return read_table(file_path, start=header_start(['Показатель']))
+    except Exception:
+        return None
+
+
+def get_possible_causes(indicator, value, mean_value):
+    """Возможные причины аномалии"""
+    return ['Требуется детальный анализ']
+
+
+def get_recommendations(indicator, value, mean_value):
+    """Рекомендации по аномалии"""
+    return ['Требуется углубленный финансовый анализ']
+
+
+def get_indicator_value(data, pattern, year=None):
+    """
+    Значение показателя, найденного по шаблону, за год (по умолчанию —
+    последний); 0.0, если показателя или данных нет
+    """
+    if data is None:
+        return 0.0
+
+    cube = as_cube(data)
+    indicator = cube.find(pattern)
+    if indicator is None or not cube.years:
+        return 0.0
+
+    if year is None:
+        year = cube.years[-1]
+    return float(cube.get(indicator, year, 0.0))
+
+
+def generate_pdf_report(df, ratios, horizontal_df, vertical_asset_df, vertical_liability_df, anomalies):
+    """Генерирует PDF-отчет с результатами анализа"""
+    from financial_analyzer import report
+
+    return report.build_report(df, ratios, horizontal_df, vertical_asset_df, vertical_liability_df, anomalies)
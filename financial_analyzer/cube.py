@@ -0,0 +1,151 @@
+"""Индексированное представление отчетности: матрица показатель × год"""
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMN = 'Показатель'
+YEAR_COLUMN = 'Год'
+VALUE_COLUMN = 'Значение'
+
+
+def _year_columns(df):
+    """Возвращает столбцы широкой таблицы, названия которых являются годами"""
+    return [col for col in df.columns if str(col).strip().isdigit() and len(str(col).strip()) == 4]
+
+
+class StatementCube:
+    """
+    Плотная матрица значений отчетности с целочисленными словарями осей.
+
+    Строки матрицы соответствуют показателям (в порядке первого появления),
+    столбцы — годам (по возрастанию). Отсутствующие пары (показатель, год)
+    хранятся как NaN. Поиск значения выполняется за O(1), а строка или
+    столбец матрицы возвращаются как представления без копирования.
+    """
+
+    def __init__(self, values, indicators, years):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.indicators = list(indicators)
+        self.years = [int(year) for year in years]
+        self.indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+
+        if self.values.shape != (len(self.indicators), len(self.years)):
+            raise ValueError(
+                f"Размер матрицы {self.values.shape} не совпадает с осями "
+                f"({len(self.indicators)}, {len(self.years)})"
+            )
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Строит куб из длинной (Показатель/Год/Значение) или широкой
+        (по столбцу на год) таблицы. При повторах пары (показатель, год)
+        используется первое вхождение.
+        """
+        if YEAR_COLUMN not in df.columns:
+            year_cols = _year_columns(df)
+            df = df.melt(
+                id_vars=[INDICATOR_COLUMN],
+                value_vars=year_cols,
+                var_name=YEAR_COLUMN,
+                value_name=VALUE_COLUMN
+            )
+
+        indicator_codes, indicators = pd.factorize(df[INDICATOR_COLUMN], sort=False)
+        year_codes, years = pd.factorize(pd.to_numeric(df[YEAR_COLUMN]).astype(np.int64), sort=True)
+        values = pd.to_numeric(df[VALUE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+
+        # Строки с пустым названием или годом не попадают в куб
+        valid = (indicator_codes >= 0) & (year_codes >= 0)
+        indicator_codes = indicator_codes[valid]
+        year_codes = year_codes[valid]
+        values = values[valid]
+
+        # Оставляем первое вхождение каждой пары (показатель, год)
+        flat_index = indicator_codes * len(years) + year_codes
+        _, first = np.unique(flat_index, return_index=True)
+
+        matrix = np.full((len(indicators), len(years)), np.nan)
+        matrix[indicator_codes[first], year_codes[first]] = values[first]
+
+        return cls(matrix, list(indicators), years.tolist())
+
+    def extend(self, other):
+        """
+        Новый куб с годами из other, которые должны быть позже последнего
+        года куба. Новые показатели добавляются в конец, как при построении
+        куба из объединенной таблицы.
+        """
+        if self.years and other.years and other.years[0] <= self.years[-1]:
+            raise ValueError(
+                f"Можно добавить только годы после {self.years[-1]}, получен {other.years[0]}"
+            )
+        indicators = self.indicators + [name for name in other.indicators if name not in self.indicator_index]
+        matrix = np.full((len(indicators), len(self.years) + len(other.years)), np.nan)
+        matrix[:len(self.indicators), :len(self.years)] = self.values
+        index = {name: i for i, name in enumerate(indicators)}
+        rows = [index[name] for name in other.indicators]
+        matrix[rows, len(self.years):] = other.values
+        return StatementCube(matrix, indicators, self.years + other.years)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __contains__(self, indicator):
+        return indicator in self.indicator_index
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def get(self, indicator, year, default=np.nan):
+        """Возвращает значение показателя за год или default, если его нет"""
+        i = self.indicator_index.get(indicator)
+        j = self.year_index.get(int(year))
+        if i is None or j is None:
+            return default
+        value = self.values[i, j]
+        return default if np.isnan(value) else value
+
+    def row(self, indicator):
+        """Ряд значений показателя по всем годам (представление без копирования)"""
+        i = self.indicator_index.get(indicator)
+        if i is None:
+            return None
+        return self.values[i]
+
+    def column(self, year):
+        """Значения всех показателей за год (представление без копирования)"""
+        j = self.year_index.get(int(year))
+        if j is None:
+            return None
+        return self.values[:, j]
+
+    def rows(self, indicators):
+        """Подматрица для списка показателей; отсутствующие показатели заполняются NaN"""
+        result = np.full((len(indicators), len(self.years)), np.nan)
+        for k, name in enumerate(indicators):
+            i = self.indicator_index.get(name)
+            if i is not None:
+                result[k] = self.values[i]
+        return result
+
+    def find(self, pattern):
+        """Первый показатель, содержащий подстроку pattern (без учета регистра)"""
+        pattern = pattern.lower()
+        for name in self.indicators:
+            if pattern in str(name).lower():
+                return name
+        return None
+
+    def to_frame(self, indicators=None):
+        """Широкая таблица: показатели в строках, годы в столбцах"""
+        if indicators is None:
+            return pd.DataFrame(self.values, index=pd.Index(self.indicators, name=INDICATOR_COLUMN), columns=self.years)
+        present = [name for name in indicators if name in self.indicator_index]
+        rows = [self.indicator_index[name] for name in present]
+        return pd.DataFrame(self.values[rows], index=pd.Index(present, name=INDICATOR_COLUMN), columns=self.years)
+
+    def __repr__(self):
+        return f"StatementCube(indicators={len(self.indicators)}, years={self.years[:1] + self.years[-1:]})"
@@ -0,0 +1,137 @@
+"""
+Досчет анализа при добавлении нового года отчетности.
+
+Горизонтальный анализ получает только столбцы новых лет и изменений к
+ним, бизнес-правила проверяются только для новой пары лет, а среднее и
+дисперсия ключевых показателей обновляются по алгоритму Уэлфорда.
+Статистические детекторы, включая Z-score, пересчитываются по сохраненным
+ключевым строкам теми же функциями, что и при полном расчете, поэтому
+результат совпадает с полным пересчетом без погрешности округления.
+"""
+
+import numpy as np
+
+from financial_analyzer.analysis import HORIZONTAL_INDICATORS, add_change_columns, perform_horizontal_analysis
+from financial_analyzer.anomalies import (
+    DETECTOR_REGISTRY, Z_SCORE_INDICATORS, anomaly_masks, key_indicators, moments, resolve_detectors,
+    rule_records, select_rows, statistical_records, z_scores
+)
+from financial_analyzer.rules import active_rules
+
+
+def extend_horizontal(previous, cube):
+    """
+    Дополняет таблицу горизонтального анализа годами куба, которые позже
+    последнего года в previous. Уже рассчитанные столбцы не пересчитываются.
+    """
+    year_columns = [col for col in previous.columns if not isinstance(col, str)]
+    if not year_columns:
+        return perform_horizontal_analysis(cube)
+
+    last_year = year_columns[-1]
+    new_years = [year for year in cube.years if year > last_year]
+    if not new_years:
+        return previous
+
+    # Новый ключевой показатель добавляет строку с пустыми прошлыми годами
+    indicators = sorted(name for name in HORIZONTAL_INDICATORS if name in cube)
+    if previous['Показатель'].tolist() == indicators:
+        pivot_df = previous.copy()
+    else:
+        pivot_df = previous.set_index('Показатель').reindex(indicators).reset_index()
+
+    table = cube.to_frame(indicators)[new_years]
+    table = table.loc[:, table.notna().any(axis=0)]
+
+    position = 1 + len(year_columns)
+    prev_year, prev_values = last_year, pivot_df[last_year].to_numpy()
+    for year in table.columns:
+        curr_values = table[year].to_numpy()
+        pivot_df.insert(position, year, curr_values)
+        position += 1
+        add_change_columns(pivot_df, prev_year, year, prev_values, curr_values)
+        prev_year, prev_values = year, curr_values
+
+    return pivot_df
+
+
+class AnomalyState:
+    """
+    Состояние поиска аномалий, которое дополняется новыми годами.
+
+    Для показателей Z-score ведутся число значений, среднее и сумма
+    квадратов отклонений (сводка по всем годам), для бизнес-правил —
+    найденные аномалии. Оценки детекторов считаются по сохраненным
+    значениям ключевых строк двухпроходным расчетом, как в anomaly_masks.
+    Набор правил и детекторов фиксируется при создании состояния.
+    """
+
+    def __init__(self, cube=None, rules=None, detectors=None):
+        self.rule_set = active_rules() if rules is None else rules
+        self.detectors = resolve_detectors(detectors)
+        self.key_indicators = key_indicators(self.rule_set)
+        self.key_index = {name: k for k, name in enumerate(self.key_indicators)}
+        self.years = []
+        self.rows = np.empty((len(self.key_indicators), 0))
+        self.count = np.zeros(len(Z_SCORE_INDICATORS), dtype=np.int64)
+        self.mean = np.zeros(len(Z_SCORE_INDICATORS))
+        self.m2 = np.zeros(len(Z_SCORE_INDICATORS))
+        self.rules = {rule: [] for rule in self.rule_set.names}
+        if cube is not None and cube.years:
+            # Начальное состояние считается одним проходом по всем годам
+            masks = anomaly_masks(cube.values, cube.indicator_index, self.rule_set, [])
+            self.years = list(cube.years)
+            self.rows = masks['rows']
+            self.rules = rule_records(masks, self.years)
+            count, mean, m2 = moments(self.rows[:len(Z_SCORE_INDICATORS)])
+            self.count, self.mean, self.m2 = count, np.nan_to_num(mean), m2
+
+    def _update(self, values):
+        """Шаг алгоритма Уэлфорда для значений одного года; NaN пропускаются"""
+        present = ~np.isnan(values)
+        self.count = self.count + present
+        delta = np.where(present, values - self.mean, 0.0)
+        self.mean = self.mean + delta / np.maximum(self.count, 1)
+        self.m2 = self.m2 + np.where(present, delta * (values - self.mean), 0.0)
+
+    def append(self, cube):
+        """Учитывает годы куба, которые позже уже обработанных"""
+        new_years = [year for year in cube.years if not self.years or year > self.years[-1]]
+        if not new_years:
+            return self
+
+        columns = [cube.year_index[year] for year in new_years]
+        new_rows, _ = select_rows(cube.values[:, columns], cube.indicator_index, self.key_indicators)
+
+        for k, year in enumerate(new_years):
+            column = new_rows[:, k:k + 1]
+            self._update(column[:len(Z_SCORE_INDICATORS), 0])
+
+            # Правила проверяются для нового года и стольких прошлых лет, сколько они читают
+            start = max(len(self.years) - self.rule_set.max_lag, 0)
+            window = np.hstack([self.rows[:, start:], column])
+            masks = anomaly_masks(window, self.key_index, self.rule_set, [])
+            found = rule_records(masks, self.years[start:] + [year], columns=[window.shape[1] - 1])
+            for rule, records in found.items():
+                self.rules[rule].extend(records)
+
+            self.rows = np.hstack([self.rows, column])
+            self.years.append(year)
+
+        return self
+
+    def z_scores(self):
+        """Z-score ключевых показателей по всем годам, как при полном расчете"""
+        return z_scores(self.rows[:len(Z_SCORE_INDICATORS)])
+
+    @property
+    def anomalies(self):
+        """Аномалии в том же порядке, что и у detect_anomalies"""
+        anomalies = []
+        for name, thresholds in self.detectors.items():
+            scores = DETECTOR_REGISTRY[name]['score'](self.rows[:len(Z_SCORE_INDICATORS)])
+            mask = np.abs(np.nan_to_num(scores)) > thresholds
+            anomalies.extend(statistical_records(name, scores, mask, self.rows, self.years))
+        for records in self.rules.values():
+            anomalies.extend(records)
+        return anomalies
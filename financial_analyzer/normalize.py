@@ -0,0 +1,116 @@
+"""
+Приведение «широких» выгрузок (list-org и подобных) к длинной таблице.
+
+В широкой выгрузке над таблицей есть шапка с реквизитами компании, затем
+строка заголовка с годами, а каждый год — отдельный столбец со значениями
+вида '1,146' или 'н/д'. normalize_wide находит заголовок и годы, очищает
+все значения одной векторной операцией над столбцом строк и возвращает
+таблицу Показатель/Код/Ед.изм./Год/Значение.
+"""
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.readers import REPORT_START_KEYWORDS
+
+# Значения, которые считаются пустыми (как в clean_value)
+EMPTY_VALUES = {'', '-', 'nan', 'н/д'}
+
+# Год в заголовке — вся ячейка: '2021', '2,021', '2021 г.', '2021.0' (число из Excel).
+# Суммы ('12,019') и даты ('01.03.2021') годом не считаются
+YEAR_PATTERN = r'^\s*(2,?0[0-9]{2}|[1-2][0-9]{3})(?:\.0+)?\s*(?:г\.?|год)?\s*$'
+MIN_YEAR, MAX_YEAR = 1990, 2100
+
+# Первые столбцы широкой выгрузки: показатель, код, единица измерения
+LABEL_COLUMNS = 3
+DEFAULT_TABLE_START = 26
+
+
+def clean_values(values):
+    """
+    Векторная версия clean_value: числа переводятся в float, из строк
+    удаляется все, кроме цифр, точек, запятых и минуса, запятая заменяется
+    точкой. Пустые и нераспознанные значения становятся NaN.
+    """
+    values = pd.Series(values, dtype=object)
+    is_text = values.map(type) == str
+    result = pd.to_numeric(values.mask(is_text), errors='coerce')
+    if is_text.any():
+        text = values[is_text]
+        empty = text.str.strip().str.lower().isin(EMPTY_VALUES)
+        cleaned = text.str.replace(r'[^\d\.,\-]', '', regex=True).str.replace(',', '.', regex=False)
+        result[is_text] = pd.to_numeric(cleaned.mask(empty), errors='coerce')
+    return result.astype(np.float64)
+
+
+def parse_years(cells):
+    """Год из каждой ячейки заголовка (float, NaN — не год)"""
+    text = pd.Series(cells, dtype=object).astype(str).str.strip()
+    years = pd.to_numeric(text.str.extract(YEAR_PATTERN, expand=False).str.replace(',', '', regex=False),
+                          errors='coerce')
+    return years.where(years.between(MIN_YEAR, MAX_YEAR))
+
+
+def extract_years(header_row):
+    """Годы из заголовка широкой выгрузки (столбцы после показателя, кода и единицы)"""
+    years = parse_years(header_row.iloc[LABEL_COLUMNS:]).dropna()
+    return [str(int(year)) for year in years]
+
+
+def find_table_start(raw, keywords=REPORT_START_KEYWORDS, default=DEFAULT_TABLE_START):
+    """Метка первой строки, в первом столбце которой есть ключевое слово раздела баланса"""
+    first = raw.iloc[:, 0].astype(str).str.lower()
+    found = first.str.contains('|'.join(keywords), regex=True)
+    return found.idxmax() if found.any() else default
+
+
+def find_header_row(raw, limit=None):
+    """
+    Позиция строки заголовка с годами: первая строка (до limit включительно),
+    в которой годы занимают не меньше половины непустых ячеек после
+    столбцов показателя, кода и единицы. None, если такой строки нет.
+    """
+    cells = raw.iloc[:None if limit is None else limit + 1, LABEL_COLUMNS:]
+    if cells.empty:
+        return None
+    flat = cells.to_numpy(dtype=object).ravel()
+    is_year = parse_years(flat).notna().to_numpy().reshape(cells.shape)
+    filled = pd.notna(cells).to_numpy() & (cells.astype(str).apply(lambda column: column.str.strip()) != '').to_numpy()
+    year_counts = is_year.sum(axis=1)
+    matches = np.flatnonzero((year_counts > 0) & (2 * year_counts >= filled.sum(axis=1)))
+    return int(matches[0]) if len(matches) else None
+
+
+def normalize_wide(raw):
+    """
+    Длинная таблица из сырой широкой выгрузки (лист, прочитанный без
+    заголовка). Строки без показателя и строки-подзаголовки без значений
+    отбрасываются; повторяющиеся годы берутся из первого столбца.
+    """
+    start = find_table_start(raw, default=None)
+    header = find_header_row(raw, limit=None if start is None else raw.index.get_loc(start))
+    if header is None:
+        raise ValueError("Не найдена строка заголовка с годами")
+
+    years = parse_years(raw.iloc[header, LABEL_COLUMNS:]).to_numpy()
+    positions = np.flatnonzero(~np.isnan(years))
+    _, first = np.unique(years[positions], return_index=True)
+    positions = positions[np.sort(first)]
+    years = years[positions].astype(np.int64)
+
+    body = raw.iloc[header + 1:]
+    names = body.iloc[:, 0].astype(str).str.strip().where(body.iloc[:, 0].notna(), '')
+    values = body.iloc[:, LABEL_COLUMNS + positions].to_numpy(dtype=object)
+    values = clean_values(values.ravel()).to_numpy().reshape(values.shape)
+
+    keep = (names != '').to_numpy() & ~np.isnan(values).all(axis=1)
+
+    labels = body.iloc[keep, :LABEL_COLUMNS]
+    count = len(years)
+    return pd.DataFrame({
+        'Показатель': np.repeat(names[keep].to_numpy(), count),
+        'Код': np.repeat(labels.iloc[:, 1].to_numpy(dtype=object), count),
+        'Ед.изм.': np.repeat(labels.iloc[:, 2].to_numpy(dtype=object), count),
+        'Год': np.tile(years, len(labels)),
+        'Значение': values[keep].ravel(),
+    })
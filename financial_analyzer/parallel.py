@@ -0,0 +1,105 @@
+"""Параллельный анализ множества файлов в пуле процессов"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.batch import analyze_file, deltas_frame, split_horizontal
+from financial_analyzer.ratios import RATIO_REGISTRY
+
+
+@dataclass
+class CompactResult:
+    """
+    Компактный результат анализа для передачи между процессами:
+    вместо таблиц pandas — массивы NumPy и списки простых значений.
+    """
+    company: str
+    source: str = ''
+    years: list = field(default_factory=list)
+    ratio_values: np.ndarray = None
+    horizontal_indicators: list = field(default_factory=list)
+    horizontal_periods: list = field(default_factory=list)
+    deltas: np.ndarray = None
+    delta_percents: np.ndarray = None
+    anomalies: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def ratio_table(self):
+        """Таблица коэффициентов годы × коэффициенты"""
+        if self.ratio_values is None:
+            return None
+        return pd.DataFrame(self.ratio_values, index=pd.Index(self.years, name='Год'), columns=list(RATIO_REGISTRY))
+
+    @property
+    def horizontal_deltas(self):
+        """Длинная таблица изменений: показатель, период, Δ и Δ%"""
+        return deltas_frame(self.horizontal_indicators, self.horizontal_periods, self.deltas, self.delta_percents)
+
+
+def _plain(value):
+    """Переводит скаляры NumPy в значения Python для компактной сериализации"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def compact(result):
+    """Сжимает AnalysisResult до CompactResult"""
+    compact_result = CompactResult(
+        company=result.company,
+        source=result.source,
+        anomalies=[{key: _plain(value) for key, value in anomaly.items()} for anomaly in result.anomalies],
+        warnings=list(result.warnings),
+        error=result.error,
+    )
+
+    if result.ratio_table is not None:
+        compact_result.years = [int(year) for year in result.ratio_table.index]
+        compact_result.ratio_values = result.ratio_table.to_numpy(dtype=np.float64)
+
+    horizontal = result.horizontal
+    if horizontal is not None and not horizontal.empty:
+        (compact_result.horizontal_indicators, compact_result.horizontal_periods,
+         compact_result.deltas, compact_result.delta_percents) = split_horizontal(horizontal)
+
+    return compact_result
+
+
+def analyze_file_compact(path, year=None, streaming=False, company=None):
+    """Задача для процесса-обработчика: анализ одного файла с компактным результатом"""
+    return compact(analyze_file(path, year, streaming, company))
+
+
+def default_chunksize(count, workers):
+    """Размер пакета задач: примерно по четыре пакета на процесс"""
+    return max(1, count // (workers * 4))
+
+
+def run_parallel(paths, workers=None, chunksize=None, year=None, streaming=False, companies=None):
+    """
+    Анализирует файлы в пуле процессов и возвращает компактные результаты
+    в порядке входного списка. При workers=1 пул не создается.
+    companies — идентификаторы компаний по файлам (по умолчанию имена файлов).
+    """
+    paths = list(paths)
+    companies = list(companies) if companies is not None else [None] * len(paths)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths) or 1))
+
+    if workers == 1:
+        return [analyze_file_compact(path, year, streaming, company) for path, company in zip(paths, companies)]
+
+    chunksize = chunksize or default_chunksize(len(paths), workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            analyze_file_compact, paths, [year] * len(paths), [streaming] * len(paths), companies,
+            chunksize=chunksize
+        ))
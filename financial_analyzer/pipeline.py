@@ -0,0 +1,255 @@
+"""
+Конвейер анализа с запоминанием результатов этапов.
+
+Каждый этап хранит ключ входных данных (версии этапов, от которых он
+зависит, и параметры) и пересчитывается только при изменении ключа.
+Например, смена года вертикального анализа пересчитывает только этап
+vertical (и его график), а повторный запуск скрипта Streamlit без изменений не
+пересчитывает ничего. Данные за новый год дописываются к уже
+рассчитанным этапам без полного пересчета.
+
+Если передан ResultCache, коэффициенты, таблицы анализа и аномалии
+дополнительно сохраняются на диск по хэшу содержимого файла и берутся
+оттуда в других сессиях и процессах, открывших тот же файл.
+"""
+
+import os
+from collections import Counter
+
+import pandas as pd
+
+from financial_analyzer import analysis
+from financial_analyzer.anomalies import DETECTORS_VARIABLE
+from financial_analyzer.incremental import AnomalyState, extend_horizontal
+from financial_analyzer.profiling import count_rows
+from financial_analyzer.ratios import evaluate_ratios
+from financial_analyzer.result_cache import result_key
+from financial_analyzer.rules import RULES_VARIABLE
+from financial_analyzer.statement_cache import content_key, read_bytes
+
+
+def source_key(file):
+    """
+    Дешевый идентификатор загруженного файла: file_id загрузки Streamlit
+    или хэш содержимого для остальных источников.
+    """
+    file_id = getattr(file, 'file_id', None)
+    if file_id:
+        return (file_id, getattr(file, 'size', None))
+    return content_key(read_bytes(file))
+
+
+def anomaly_settings():
+    """Настройки, от которых зависят аномалии: файл правил (с временем изменения) и набор детекторов"""
+    path = os.environ.get(RULES_VARIABLE)
+    return (path, os.path.getmtime(path) if path else None, os.environ.get(DETECTORS_VARIABLE))
+
+
+class AnalysisPipeline:
+    """
+    Результаты всех этапов анализа одного файла. Если передан Profiler,
+    каждый пересчет этапа замеряется (запомненные результаты — нет).
+    result_cache — общий дисковый кэш результатов этапов (ResultCache).
+    """
+
+    def __init__(self, profiler=None, result_cache=None):
+        self.profiler = profiler
+        self.result_cache = result_cache
+        # Хэш содержимого загруженных данных; None — результаты не сохраняются на диск
+        self.content = None
+        self._results = {}
+        self._versions = Counter()
+        self.runs = Counter()
+        # Ключи дописанных файлов по порядку и результат этапа frame до дописывания
+        self._appended = []
+        self._base = None
+
+    def _stage(self, name, key, compute, shared=None):
+        """
+        Возвращает запомненный результат этапа или пересчитывает его.
+        Если заданы параметры shared, результат ищется и сохраняется в
+        дисковом кэше по хэшу содержимого, имени этапа и этим параметрам.
+        """
+        cached = self._results.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        disk_key = None
+        if shared is not None and self.result_cache is not None and self.content is not None:
+            disk_key = result_key(self.content, name, shared)
+            stored = self.result_cache.get(disk_key)
+            if stored is not None:
+                self._store(name, key, *stored)
+                return stored[0]
+        messages = []
+        if self.profiler is None:
+            value = compute(messages)
+        else:
+            with self.profiler.stage(name) as record:
+                value = compute(messages)
+                record.rows = count_rows(value)
+        self._store(name, key, value, messages)
+        self.runs[name] += 1
+        if disk_key is not None:
+            self.result_cache.put(disk_key, (value, messages))
+        return value
+
+    def _store(self, name, key, value, messages=()):
+        """Сохраняет результат этапа, рассчитанный вне _stage"""
+        self._results[name] = (key, value, list(messages))
+        self._versions[name] += 1
+
+    def version(self, name):
+        """Номер версии результата этапа; меняется при каждом пересчете"""
+        return self._versions[name]
+
+    def messages(self, *names):
+        """Предупреждения, накопленные при последнем расчете этапов"""
+        collected = []
+        for name in names:
+            cached = self._results.get(name)
+            if cached is not None:
+                collected.extend(cached[2])
+        return collected
+
+    def load(self, file, loader=None, key=None):
+        """
+        Загружает файл, если он отличается от уже загруженного.
+        loader(file, messages) возвращает очищенную длинную таблицу или None.
+        """
+        if loader is None:
+            loader = lambda source, messages: analysis.load_statement(source, messages=messages)
+        key = source_key(file) if key is None else key
+        version = self.version('frame')
+        frame = self._stage('frame', key, lambda messages: loader(file, messages))
+        if self.version('frame') != version:
+            self._appended = []
+            self.content = None
+            if self.result_cache is not None and frame is not None:
+                self.content = content_key(read_bytes(file))
+            self._base = self._results['frame'], self.content
+        return frame
+
+    def reset_appended(self):
+        """Убирает дописанные файлы: данные восстанавливаются из основного файла"""
+        if not self._appended:
+            return
+        frame_result, self.content = self._base
+        self._store('frame', *frame_result)
+        self._appended = []
+
+    def append(self, rows, messages=()):
+        """
+        Дописывает строки лет, следующих за последним загруженным годом.
+        Куб, горизонтальный анализ и аномалии досчитываются только для
+        новых лет, остальные этапы пересчитаются при обращении.
+        """
+        horizontal = self.horizontal
+        state = self.anomaly_state
+        cube = self.cube.extend(analysis.as_cube(rows))
+
+        frame_key, frame, frame_messages = self._results['frame']
+        frame = analysis.compact_frame(pd.concat([frame, rows], ignore_index=True))
+        self._store('frame', frame_key, frame, frame_messages + list(messages))
+        self._store('cube', self.version('frame'), cube)
+        self._store('horizontal', (self.version('cube'),), extend_horizontal(horizontal, cube))
+        self._store('anomaly_state', (self.version('cube'),) + anomaly_settings(), state.append(cube))
+        # Хэш дописанных данных неизвестен: append_file восстанавливает его по файлу
+        self.content = None
+        return self.frame
+
+    def append_file(self, file, loader=None, key=None):
+        """
+        Дописывает файл с данными за новые годы и возвращает сообщения
+        загрузки. Повторная передача того же файла ничего не меняет.
+        """
+        if loader is None:
+            loader = lambda source, messages: analysis.load_statement(source, messages=messages)
+        key = source_key(file) if key is None else key
+        if key in self._appended:
+            return []
+        content = self.content
+        messages = []
+        rows = loader(file, messages)
+        if rows is not None:
+            self.append(rows, messages)
+            if content is not None:
+                self.content = content_key(f'{content}+{content_key(read_bytes(file))}'.encode())
+        self._appended.append(key)
+        return messages
+
+    def append_files(self, files, loader=None, keys=None):
+        """
+        Приводит дописанные данные к списку files и возвращает сообщения
+        загрузки. Если файл убран или заменен другим, данные сначала
+        восстанавливаются из основного файла, затем файлы дописываются заново.
+        """
+        keys = [source_key(file) for file in files] if keys is None else list(keys)
+        if keys[:len(self._appended)] != self._appended:
+            self.reset_appended()
+        messages = []
+        for file, key in zip(files, keys):
+            messages.extend(self.append_file(file, loader, key))
+        return messages
+
+    @property
+    def loaded(self):
+        return self.frame is not None
+
+    @property
+    def frame(self):
+        cached = self._results.get('frame')
+        return cached[1] if cached is not None else None
+
+    @property
+    def cube(self):
+        return self._stage('cube', self.version('frame'), lambda messages: analysis.as_cube(self.frame))
+
+    def _cube_stage(self, name, compute, *params, shared=None):
+        """Этап, зависящий от куба: сначала актуализируется сам куб, затем берется его версия"""
+        cube = self.cube
+        return self._stage(
+            name, (self.version('cube'),) + params, lambda messages: compute(cube, messages), shared
+        )
+
+    @property
+    def ratios(self):
+        return self._cube_stage('ratios', analysis.calculate_financial_ratios, shared=())
+
+    @property
+    def ratio_table(self):
+        return self._cube_stage('ratio_table', lambda cube, messages: evaluate_ratios(cube), shared=())
+
+    @property
+    def horizontal(self):
+        return self._cube_stage(
+            'horizontal', lambda cube, messages: analysis.perform_horizontal_analysis(cube), shared=()
+        )
+
+    @property
+    def anomaly_state(self):
+        # Смена правил или детекторов во время сессии пересоздает состояние
+        return self._cube_stage('anomaly_state', lambda cube, messages: AnomalyState(cube), *anomaly_settings())
+
+    @property
+    def anomalies(self):
+        settings = anomaly_settings()
+        return self._cube_stage(
+            'anomalies', lambda cube, messages: self.anomaly_state.anomalies, *settings, shared=settings
+        )
+
+    def figure(self, name, build, *params):
+        """
+        График этапа name: build() вызывается только при изменении куба или
+        параметров params, иначе возвращается уже построенная фигура.
+        """
+        return self._cube_stage(name, lambda cube, messages: build(), *params)
+
+    def vertical(self, year=None):
+        """
+        Вертикальный анализ за год по таблице (с Кодом и Ед.изм.);
+        пересчитывается только при смене года или данных
+        """
+        return self._stage(
+            'vertical', (self.version('frame'), year),
+            lambda messages: analysis.perform_vertical_analysis(self.frame, year), shared=(year,)
+        )
@@ -0,0 +1,134 @@
+"""
+Портфель компаний: массив компания × показатель × год с общими осями.
+
+Коэффициенты, рейтинги, перцентили и счетчики аномалий считаются одной
+операцией над всем массивом, без цикла по компаниям.
+"""
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.anomalies import DETECTOR_REGISTRY, anomaly_masks
+from financial_analyzer.cube import INDICATOR_COLUMN, VALUE_COLUMN, YEAR_COLUMN, StatementCube
+from financial_analyzer.ratios import RATIO_REGISTRY, evaluate_ratio_array
+
+COMPANY_COLUMN = 'Компания'
+
+
+def peer_percentiles(ratios):
+    """
+    Перцентиль каждой компании по каждому столбцу: 0 — худшее значение
+    среди компаний со значением, 100 — лучшее; единственная компания со
+    значением получает 100, компании без значения — NaN.
+    """
+    ranks = ratios.rank()
+    count = ratios.notna().sum()
+    scaled = (ranks - 1) / (count - 1).where(count > 1) * 100
+    return scaled.mask(ranks.notna() & (count == 1), 100.0)
+
+
+class PortfolioCube:
+    """
+    Плотный массив значений (компании, показатели, годы). Показатели идут в
+    порядке первого появления, годы — по возрастанию; если у компании нет
+    показателя или года, значение NaN.
+    """
+
+    def __init__(self, values, companies, indicators, years):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.companies = list(companies)
+        self.indicators = list(indicators)
+        self.years = [int(year) for year in years]
+        self.company_index = {name: c for c, name in enumerate(self.companies)}
+        self.indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+
+        if self.values.shape != (len(self.companies), len(self.indicators), len(self.years)):
+            raise ValueError(
+                f"Размер массива {self.values.shape} не совпадает с осями "
+                f"({len(self.companies)}, {len(self.indicators)}, {len(self.years)})"
+            )
+
+    @classmethod
+    def from_cubes(cls, cubes):
+        """Портфель из словаря {компания: StatementCube}"""
+        indicators = {}
+        for cube in cubes.values():
+            for name in cube.indicators:
+                indicators.setdefault(name, len(indicators))
+        years = sorted({year for cube in cubes.values() for year in cube.years})
+        year_index = {year: j for j, year in enumerate(years)}
+
+        values = np.full((len(cubes), len(indicators), len(years)), np.nan)
+        for c, cube in enumerate(cubes.values()):
+            rows = [indicators[name] for name in cube.indicators]
+            columns = [year_index[year] for year in cube.years]
+            values[c][np.ix_(rows, columns)] = cube.values
+        return cls(values, list(cubes), list(indicators), years)
+
+    @classmethod
+    def from_frame(cls, df, company_column=COMPANY_COLUMN):
+        """
+        Портфель из длинной таблицы со столбцом компании. При повторах тройки
+        (компания, показатель, год) используется первое вхождение.
+        """
+        company_codes, companies = pd.factorize(df[company_column], sort=False)
+        indicator_codes, indicators = pd.factorize(df[INDICATOR_COLUMN], sort=False)
+        year_codes, years = pd.factorize(pd.to_numeric(df[YEAR_COLUMN]).astype(np.int64), sort=True)
+        values = pd.to_numeric(df[VALUE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+
+        valid = (company_codes >= 0) & (indicator_codes >= 0) & (year_codes >= 0)
+        company_codes, indicator_codes = company_codes[valid], indicator_codes[valid]
+        year_codes, values = year_codes[valid], values[valid]
+
+        flat_index = (company_codes * len(indicators) + indicator_codes) * len(years) + year_codes
+        _, first = np.unique(flat_index, return_index=True)
+
+        matrix = np.full((len(companies), len(indicators), len(years)), np.nan)
+        matrix[company_codes[first], indicator_codes[first], year_codes[first]] = values[first]
+        return cls(matrix, list(companies), list(indicators), years.tolist())
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return len(self.companies)
+
+    def company(self, name):
+        """StatementCube одной компании (значения — представление без копирования)"""
+        return StatementCube(self.values[self.company_index[name]], self.indicators, self.years)
+
+    def ratio_array(self, registry=None):
+        """Коэффициенты реестра для всех компаний: массив (компании, коэффициенты, годы)"""
+        return evaluate_ratio_array(self.values, self.indicator_index, registry)
+
+    def ratios(self, year, registry=None):
+        """Таблица компании × коэффициенты за год"""
+        registry = RATIO_REGISTRY if registry is None else registry
+        values = self.ratio_array(registry)[:, :, self.year_index[int(year)]]
+        return pd.DataFrame(values, index=pd.Index(self.companies, name=COMPANY_COLUMN), columns=list(registry))
+
+    def rankings(self, year, registry=None):
+        """
+        Место компании среди пиров по каждому коэффициенту за год: 1 — лучшее
+        (наибольшее) значение, компании без значения не получают места.
+        """
+        return self.ratios(year, registry).rank(ascending=False, method='min').astype('Int64')
+
+    def percentiles(self, year, registry=None):
+        """Перцентиль компании среди пиров по каждому коэффициенту за год (0 — худшее, 100 — лучшее)"""
+        return peer_percentiles(self.ratios(year, registry))
+
+    def anomaly_counts(self, rules=None, detectors=None):
+        """Число аномалий каждого вида по компаниям за все годы"""
+        masks = anomaly_masks(self.values, self.indicator_index, rules, detectors)
+        rule_set, _ = masks['rules']
+        counts = {}
+        for name, (_, mask) in masks['detectors'].items():
+            counts[DETECTOR_REGISTRY[name]['label']] = mask.sum(axis=(-2, -1))
+        for rule in rule_set.names:
+            counts[rule_set.label(rule)] = masks[rule].sum(axis=-1)
+        table = pd.DataFrame(counts, index=pd.Index(self.companies, name=COMPANY_COLUMN))
+        table['Всего'] = table.sum(axis=1)
+        return table
@@ -0,0 +1,195 @@
+"""
+Замеры этапов анализа: время, процессорное время, память и число строк.
+
+Profiler.stage — контекстный менеджер вокруг этапа, Profiler.measure —
+декоратор для функций. Память считается через tracemalloc и только при
+trace_memory=True, потому что трассировка замедляет выделение памяти.
+Результаты выгружаются в JSON и в текстовый формат OpenMetrics.
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+METRIC_PREFIX = 'project_alpha_stage'
+MAX_RECORDS = 1000
+
+
+@dataclass
+class StageRecord:
+    """Один замер этапа"""
+    stage: str
+    started_at: float
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    allocated_bytes: int = None
+    peak_bytes: int = None
+    rows: int = None
+    error: str = None
+
+
+def count_rows(value):
+    """Число строк результата: длина таблицы или списка, сумма для кортежа таблиц"""
+    if isinstance(value, tuple):
+        counts = [count_rows(item) for item in value]
+        return sum(counts) if all(count is not None for count in counts) else None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class Profiler:
+    """Накопитель замеров этапов (последние MAX_RECORDS записей)"""
+
+    def __init__(self, trace_memory=False, max_records=MAX_RECORDS):
+        self.records = deque(maxlen=max_records)
+        self.trace_memory = trace_memory
+        self._local = threading.local()
+        self._started_tracing = False
+
+    @property
+    def _stack(self):
+        """Стек вложенных этапов свой у каждого потока (отчеты строятся в фоне)"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _memory_enabled(self):
+        if not self.trace_memory:
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return True
+
+    def set_trace_memory(self, enabled):
+        """Включает или выключает замер памяти; трассировка, запущенная профилировщиком, останавливается"""
+        self.trace_memory = enabled
+        if not enabled and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Замер блока кода. Возвращает StageRecord, в котором можно указать
+        rows внутри блока. Вложенные этапы учитываются и в пике памяти
+        внешнего этапа.
+        """
+        record = StageRecord(stage=name, started_at=time.time(), rows=rows)
+        trace = self._memory_enabled()
+        frame = {'record': record, 'peak': 0, 'start': 0}
+        if trace:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak'] = max(parent['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start'] = current
+        self._stack.append(frame)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except Exception as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.wall_s = time.perf_counter() - wall
+            record.cpu_s = time.process_time() - cpu
+            self._stack.pop()
+            if trace and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame['peak'], peak)
+                record.allocated_bytes = current - frame['start']
+                record.peak_bytes = peak - frame['start']
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent['peak'] = max(parent['peak'], peak)
+            self.records.append(record)
+
+    def measure(self, name=None):
+        """Декоратор: замер каждого вызова функции, число строк берется из результата"""
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name) as record:
+                    result = func(*args, **kwargs)
+                    if record.rows is None:
+                        record.rows = count_rows(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def clear(self):
+        self.records.clear()
+
+    def summary(self):
+        """Сводка по этапам в порядке первого замера: число вызовов, суммы и последний замер"""
+        stages = {}
+        for record in self.records:
+            item = stages.setdefault(record.stage, {
+                'stage': record.stage, 'calls': 0, 'errors': 0, 'wall_s_total': 0.0, 'cpu_s_total': 0.0,
+                'peak_bytes_max': None,
+            })
+            item['calls'] += 1
+            item['errors'] += record.error is not None
+            item['wall_s_total'] += record.wall_s
+            item['cpu_s_total'] += record.cpu_s
+            if record.peak_bytes is not None:
+                item['peak_bytes_max'] = max(item['peak_bytes_max'] or 0, record.peak_bytes)
+            item['wall_s_last'] = record.wall_s
+            item['cpu_s_last'] = record.cpu_s
+            item['allocated_bytes_last'] = record.allocated_bytes
+            item['rows_last'] = record.rows
+        return list(stages.values())
+
+    def to_json(self):
+        """Все записи и сводка в формате JSON"""
+        return json.dumps(
+            {'records': [asdict(record) for record in self.records], 'summary': self.summary()},
+            ensure_ascii=False, indent=2
+        )
+
+    def to_openmetrics(self):
+        """Сводка в текстовом формате OpenMetrics (для Prometheus)"""
+        summary = self.summary()
+        families = [
+            ('calls', 'counter', 'Число выполнений этапа', 'calls'),
+            ('errors', 'counter', 'Число выполнений этапа с ошибкой', 'errors'),
+            ('wall_seconds', 'counter', 'Суммарное время выполнения этапа, с', 'wall_s_total'),
+            ('cpu_seconds', 'counter', 'Суммарное процессорное время этапа, с', 'cpu_s_total'),
+            ('last_wall_seconds', 'gauge', 'Время последнего выполнения этапа, с', 'wall_s_last'),
+            ('peak_bytes', 'gauge', 'Максимальный пик памяти этапа, байт', 'peak_bytes_max'),
+            ('rows', 'gauge', 'Число строк результата последнего выполнения', 'rows_last'),
+        ]
+        lines = []
+        for suffix, kind, help_text, key in families:
+            name = f'{METRIC_PREFIX}_{suffix}'
+            samples = [(item['stage'], item[key]) for item in summary if item[key] is not None]
+            if not samples:
+                continue
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'# HELP {name} {help_text}')
+            sample_name = f'{name}_total' if kind == 'counter' else name
+            for stage, value in samples:
+                lines.append(f'{sample_name}{{stage="{_escape_label(stage)}"}} {_format_value(value)}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
@@ -0,0 +1,140 @@
+"""Декларативный реестр финансовых коэффициентов и векторный расчет по всем годам"""
+
+import numpy as np
+import pandas as pd
+
+CURRENT_ASSETS = 'Итого по разделу II - Оборотные активы'
+SHORT_LIABILITIES = 'Итого по разделу V - Краткосрочные обязательства'
+INVENTORY = 'Запасы'
+CASH = 'Денежные средства и денежные эквиваленты'
+NET_PROFIT = 'Чистая прибыль (убыток)'
+TOTAL_ASSETS = 'БАЛАНС (актив)'
+EQUITY = 'Итого по разделу III - Капитал и резервы'
+REVENUE = 'Выручка'
+
+# Каждый коэффициент — отношение двух линейных комбинаций показателей.
+# Коэффициенты комбинаций задаются словарем {показатель: множитель}.
+RATIO_REGISTRY = {
+    'Текущая ликвидность': {
+        'numerator': {CURRENT_ASSETS: 1},
+        'denominator': {SHORT_LIABILITIES: 1},
+        'norm': 2.0,
+        'group': 'Ликвидность',
+    },
+    'Быстрая ликвидность': {
+        'numerator': {CURRENT_ASSETS: 1, INVENTORY: -1},
+        'denominator': {SHORT_LIABILITIES: 1},
+        'norm': 1.0,
+        'group': 'Ликвидность',
+    },
+    'Абсолютная ликвидность': {
+        'numerator': {CASH: 1},
+        'denominator': {SHORT_LIABILITIES: 1},
+        'norm': 0.2,
+        'group': 'Ликвидность',
+    },
+    'ROA': {
+        'numerator': {NET_PROFIT: 1},
+        'denominator': {TOTAL_ASSETS: 1},
+        'norm': 0.05,
+        'group': 'Рентабельность',
+    },
+    'ROE': {
+        'numerator': {NET_PROFIT: 1},
+        'denominator': {EQUITY: 1},
+        'norm': 0.15,
+        'group': 'Рентабельность',
+    },
+    'Маржа чистой прибыли': {
+        'numerator': {NET_PROFIT: 1},
+        'denominator': {REVENUE: 1},
+        'norm': 0.1,
+        'group': 'Рентабельность',
+    },
+    'Коэффициент автономии': {
+        'numerator': {EQUITY: 1},
+        'denominator': {TOTAL_ASSETS: 1},
+        'norm': 0.5,
+        'group': 'Финансовая устойчивость',
+    },
+}
+
+
+def get_norm_value(ratio_name, registry=None):
+    """Возвращает нормативное значение для коэффициента"""
+    registry = RATIO_REGISTRY if registry is None else registry
+    return registry.get(ratio_name, {}).get('norm', 0)
+
+
+def referenced_indicators(registry=None):
+    """Показатели, используемые в реестре, в порядке первого упоминания"""
+    registry = RATIO_REGISTRY if registry is None else registry
+    names = {}
+    for spec in registry.values():
+        for name in list(spec['numerator']) + list(spec['denominator']):
+            names.setdefault(name, None)
+    return list(names)
+
+
+def compile_registry(registry=None):
+    """
+    Переводит реестр в матрицы множителей числителей и знаменателей
+    размером (коэффициенты × показатели).
+    """
+    registry = RATIO_REGISTRY if registry is None else registry
+    indicators = referenced_indicators(registry)
+    position = {name: k for k, name in enumerate(indicators)}
+
+    numerators = np.zeros((len(registry), len(indicators)))
+    denominators = np.zeros((len(registry), len(indicators)))
+    for r, spec in enumerate(registry.values()):
+        for name, coef in spec['numerator'].items():
+            numerators[r, position[name]] = coef
+        for name, coef in spec['denominator'].items():
+            denominators[r, position[name]] = coef
+    return list(registry), indicators, numerators, denominators
+
+
+def evaluate_ratio_array(values, indicator_index, registry=None):
+    """
+    Рассчитывает все коэффициенты реестра одной операцией над массивом.
+
+    values — массив (..., показатели, годы), indicator_index — словарь
+    {показатель: номер строки}. Возвращает массив (..., коэффициенты, годы).
+    Отсутствующие слагаемые числителя считаются нулем; если нет знаменателя
+    или он равен нулю, результат NaN.
+    """
+    names, indicators, numerators, denominators = compile_registry(registry)
+    values = np.asarray(values, dtype=np.float64)
+
+    # Выбираем только нужные строки; отсутствующие показатели — строки NaN
+    rows = [indicator_index.get(name, -1) for name in indicators]
+    present = np.array([row >= 0 for row in rows])
+    if values.shape[-2] == 0:
+        selected = np.full(values.shape[:-2] + (len(rows), values.shape[-1]), np.nan)
+    else:
+        selected = values[..., [max(row, 0) for row in rows], :]
+        selected = np.where(present[:, None], selected, np.nan)
+
+    missing = np.isnan(selected)
+    filled = np.where(missing, 0.0, selected)
+
+    numerator = numerators @ filled
+    denominator = denominators @ filled
+    denominator_missing = (denominators != 0).astype(np.float64) @ missing.astype(np.float64) > 0
+
+    valid = (denominator != 0) & ~denominator_missing
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, numerator / np.where(valid, denominator, 1.0), np.nan)
+
+
+def evaluate_ratios(cube, registry=None):
+    """Таблица коэффициентов годы × коэффициенты для StatementCube"""
+    registry = RATIO_REGISTRY if registry is None else registry
+    result = evaluate_ratio_array(cube.values, cube.indicator_index, registry)
+    return pd.DataFrame(result.T, index=pd.Index(cube.years, name='Год'), columns=list(registry))
+
+
+def missing_indicators(cube, registry=None):
+    """Показатели реестра, которых нет в отчетности"""
+    return [name for name in referenced_indicators(registry) if name not in cube]
@@ -0,0 +1,182 @@
+"""
+Чтение листов Excel через подключаемые движки.
+
+Движок выбирается автоматически: calamine (python-calamine, на Rust),
+если он установлен, иначе openpyxl в режиме read-only. Строки читаются
+по одной: строки до заголовка таблицы пропускаются без сохранения, а из
+остальных берутся только нужные столбцы. Типы столбцов выводятся так же,
+как в pd.read_excel.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# Порядок предпочтения движков
+ENGINES = ('calamine', 'openpyxl')
+ENGINE_VARIABLE = 'PROJECT_ALPHA_EXCEL_ENGINE'
+
+# Ключевые слова начала отчетности (как в detect_financial_table_start)
+REPORT_START_KEYWORDS = ['нематериальные активы', 'нематериальные', 'активы', 'пассивы']
+
+
+def _calamine_rows(file, sheet):
+    from python_calamine import CalamineWorkbook
+
+    if isinstance(file, (str, os.PathLike)):
+        workbook = CalamineWorkbook.from_path(str(file))
+    else:
+        workbook = CalamineWorkbook.from_filelike(file)
+    worksheet = workbook.get_sheet_by_name(sheet) if isinstance(sheet, str) else workbook.get_sheet_by_index(sheet)
+    yield from worksheet.iter_rows()
+
+
+def _openpyxl_rows(file, sheet):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet]
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+READERS = {
+    'calamine': _calamine_rows,
+    'openpyxl': _openpyxl_rows,
+}
+
+
+def engine_available(engine):
+    """Установлен ли пакет движка"""
+    module = {'calamine': 'python_calamine', 'openpyxl': 'openpyxl'}[engine]
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def available_engines():
+    """Установленные движки в порядке предпочтения"""
+    return [engine for engine in ENGINES if engine_available(engine)]
+
+
+def pick_engine(file=None, engine=None):
+    """
+    Движок для файла: явно заданный, из PROJECT_ALPHA_EXCEL_ENGINE или
+    самый быстрый из установленных. Файлы .xls читает только calamine;
+    без него возвращается None (чтение через pd.read_excel).
+    """
+    engine = engine or os.environ.get(ENGINE_VARIABLE)
+    if engine:
+        if engine not in READERS:
+            raise ValueError(f"Неизвестный движок чтения Excel: {engine}")
+        if not engine_available(engine):
+            raise ValueError(f"Движок чтения Excel не установлен: {engine}")
+        return engine
+
+    name = str(file) if isinstance(file, (str, os.PathLike)) else getattr(file, 'name', '') or ''
+    candidates = available_engines()
+    if Path(name).suffix.lower() == '.xls':
+        candidates = [engine for engine in candidates if engine == 'calamine']
+    return candidates[0] if candidates else None
+
+
+def _convert_cell(value):
+    """Приводит значение ячейки так же, как pandas: пустые — '', целые float — int"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _is_empty(row):
+    return all(value == '' for value in row)
+
+
+def header_start(names):
+    """Условие начала таблицы: строка содержит одно из названий столбцов"""
+    names = set(names)
+    return lambda row: any(isinstance(value, str) and value.strip() in names for value in row)
+
+
+def report_start(row):
+    """Условие начала отчетности: первая ячейка содержит ключевое слово раздела баланса"""
+    first = str(row[0]).lower() if row else ''
+    return any(keyword in first for keyword in REPORT_START_KEYWORDS)
+
+
+def iter_rows(file, engine=None, sheet=0):
+    """Строки листа с приведенными значениями ячеек"""
+    engine = pick_engine(file, engine)
+    if engine is None:
+        raise ValueError("Нет движка для потокового чтения файла")
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    for row in READERS[engine](file, sheet):
+        yield [_convert_cell(value) for value in row]
+
+
+def read_table(file, engine=None, usecols=None, start=None, header=True, sheet=0):
+    """
+    Читает таблицу с листа.
+
+    start(row) отмечает первую строку таблицы; строки до нее не сохраняются.
+    Если такой строки нет, таблица читается с начала листа. usecols —
+    список названий или функция от названия столбца. header=False
+    возвращает строки без заголовка, как pd.read_excel(header=None).
+    """
+    engine = pick_engine(file, engine)
+    if engine is None:
+        return _read_with_pandas(file, usecols, start, header, sheet)
+
+    rows = iter_rows(file, engine, sheet)
+    first = None
+    if start is not None:
+        first = next((row for row in rows if start(row)), None)
+        if first is None:
+            rows = iter_rows(file, engine, sheet)
+    if first is None:
+        first = next(rows, None)
+    if first is None:
+        return pd.DataFrame()
+
+    if header and usecols is not None:
+        wanted = usecols if callable(usecols) else set(usecols).__contains__
+        indices = [i for i, name in enumerate(first) if wanted(name)]
+    else:
+        indices = list(range(len(first)))
+
+    width = len(first)
+    data = [[first[i] for i in indices]]
+    for row in rows:
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        data.append([row[i] for i in indices])
+
+    # Пустые строки в конце листа не входят в таблицу
+    while len(data) > 1 and _is_empty(data[-1]):
+        data.pop()
+    if not indices:
+        return pd.DataFrame()
+    return TextParser(data, header=0 if header else None).read()
+
+
+def _read_with_pandas(file, usecols, start, header, sheet):
+    """Запасной путь: pd.read_excel с тем же поиском начала таблицы"""
+    raw = pd.read_excel(file, header=None, sheet_name=sheet)
+    position = 0
+    if start is not None:
+        matches = [i for i, row in enumerate(raw.fillna('').itertuples(index=False)) if start(list(row))]
+        position = matches[0] if matches else 0
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return pd.read_excel(
+        file, sheet_name=sheet, skiprows=position, header=0 if header else None,
+        usecols=usecols if header else None
+    )
@@ -0,0 +1,373 @@
+"""
+Формирование PDF-отчета без зависимости от Streamlit.
+
+Шрифты с кириллицей ищутся один раз на процесс, класс документа тоже
+создается один раз. Каждый отчет — новый документ FPDF, шрифты в него
+добавляются через add_font, поэтому документы не делят состояние fpdf.
+Таблицы размечаются целиком до вывода: ширины столбцов и обрезка текста
+считаются один раз, затем строки выводятся блоками по странице — сетка
+рисуется линиями, текст — без построения ячеек. Отчет можно строить в
+фоновом потоке через submit_report.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+COMPANY = 'ООО "Агрисовгаз"'
+REPORT_TITLE = f'Финансовый анализ {COMPANY}'
+FONT_FAMILY = 'DejaVu'
+FONT_VARIABLE = 'PROJECT_ALPHA_FONT_DIR'
+# Сколько отчетов строится в фоне одновременно; по умолчанию — как у ThreadPoolExecutor
+WORKERS_VARIABLE = 'PROJECT_ALPHA_REPORT_WORKERS'
+
+# Наборы шрифтов с кириллицей (обычный, полужирный, курсив) и где их искать
+FONT_SETS = [
+    ('DejaVuSansCondensed.ttf', 'DejaVuSansCondensed-Bold.ttf', 'DejaVuSansCondensed-Oblique.ttf'),
+    ('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf', 'DejaVuSans-Oblique.ttf'),
+    ('arial.ttf', 'arialbd.ttf', 'ariali.ttf'),
+]
+FONT_DIRS = ['.', '/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu', 'C:\\Windows\\Fonts']
+
+# Разметка таблиц, мм
+CELL_PADDING = 1.5
+HEADER_HEIGHT = 10
+ROW_HEIGHT = 8
+MAX_COLUMN_WIDTH = 70
+TABLE_FONT_SIZE = 10
+PAGE_MARGIN = 15
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def find_fonts(directory=None):
+    """
+    Пути к файлам шрифта {стиль: путь} для первого найденного набора.
+    Каталог из PROJECT_ALPHA_FONT_DIR проверяется первым. Если нет
+    полужирного или курсива, используется обычное начертание.
+    """
+    directories = [directory] if directory else FONT_DIRS
+    for folder in directories:
+        for regular, bold, italic in FONT_SETS:
+            base = Path(folder) / regular
+            if not base.exists():
+                continue
+            styles = {'': base}
+            for style, name in (('B', bold), ('I', italic)):
+                path = Path(folder) / name
+                styles[style] = path if path.exists() else base
+            return styles
+    raise FileNotFoundError(
+        f"Не найден шрифт с кириллицей для PDF-отчета. Положите DejaVuSansCondensed.ttf "
+        f"в рабочий каталог или укажите каталог со шрифтами в {FONT_VARIABLE}"
+    )
+
+
+def clear_font_cache():
+    find_fonts.cache_clear()
+
+
+def format_number(value, digits=0, suffix=''):
+    """Число с пробелами между разрядами; пустое значение — Н/Д"""
+    if value is None or pd.isna(value):
+        return 'Н/Д'
+    return f"{value:,.{digits}f}".replace(',', ' ') + suffix
+
+
+@lru_cache(maxsize=None)
+def _report_pdf_class():
+    from fpdf import FPDF, XPos, YPos
+
+    class ReportPDF(FPDF):
+        """Документ отчета: колонтитулы, заголовки разделов и таблицы"""
+
+        report_title = REPORT_TITLE
+
+        def header(self):
+            self.set_font(FONT_FAMILY, 'B', 12)
+            self.cell(0, 10, self.report_title, 0, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+            self.ln(5)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font(FONT_FAMILY, 'I', 8)
+            self.cell(0, 10, f'Страница {self.page_no()}', 0, new_x=XPos.LMARGIN, new_y=YPos.TOP, align='C')
+
+        def chapter_title(self, title):
+            self.set_font(FONT_FAMILY, 'B', 14)
+            self.cell(0, 10, title, 0, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
+            self.ln(4)
+
+        def chapter_body(self, body):
+            self.set_font(FONT_FAMILY, '', 12)
+            self.multi_cell(0, 6, body)
+            self.ln()
+
+        def printable(self, text):
+            """Текст без символов, которых нет в шрифте (например, эмодзи в интерпретации)"""
+            glyphs = self.current_font.glyph_ids
+            return ''.join(char for char in text if ord(char) in glyphs).strip()
+
+        def text_width(self, text):
+            """Ширина текста текущим шрифтом по кэшированным метрикам, без разбора на фрагменты"""
+            widths = self.current_font.cw
+            return sum(widths[ord(char)] for char in text) * self.font_size_pt * 0.001 / self.k
+
+        def fit_text(self, text, width):
+            """Текст, обрезанный до ширины width (с многоточием)"""
+            if self.text_width(text) <= width:
+                return text
+            widths = self.current_font.cw
+            limit = width / (self.font_size_pt * 0.001 / self.k) - widths[ord('…')]
+            total = 0
+            for k, char in enumerate(text):
+                total += widths[ord(char)]
+                if total > limit:
+                    return text[:k].rstrip() + '…'
+            return text
+
+        def table_layout(self, header, rows):
+            """Ширины столбцов по содержимому и обрезанный под них текст"""
+            self.set_font(FONT_FAMILY, 'B', TABLE_FONT_SIZE)
+            titles = [self.printable(str(title)) for title in header]
+            widths = [self.text_width(title) for title in titles]
+            self.set_font(FONT_FAMILY, '', TABLE_FONT_SIZE)
+            body = [[self.printable(str(item)) for item in row] for row in rows]
+            for row in body:
+                widths = [max(width, self.text_width(item)) for width, item in zip(widths, row)]
+            widths = [min(width + 2 * CELL_PADDING, MAX_COLUMN_WIDTH) for width in widths]
+
+            # Если таблица не помещается по ширине, столбцы сжимаются пропорционально
+            if sum(widths) > self.epw:
+                scale = self.epw / sum(widths)
+                widths = [width * scale for width in widths]
+
+            texts = [[self.fit_text(item, width - 2 * CELL_PADDING) for item, width in zip(row, widths)] for row in body]
+            self.set_font(FONT_FAMILY, 'B', TABLE_FONT_SIZE)
+            titles = [self.fit_text(title, width - 2 * CELL_PADDING) for title, width in zip(titles, widths)]
+            return titles, texts, widths
+
+        def _draw_block(self, titles, texts, widths, top, links=None):
+            """
+            Заголовок и строки одного блока таблицы: сетка линиями, текст без
+            ячеек. links — ссылки строк (вся строка становится ссылкой).
+            """
+            left = self.l_margin
+            right = left + sum(widths)
+            bottom = top + HEADER_HEIGHT + ROW_HEIGHT * len(texts)
+            baseline = 0.35 * TABLE_FONT_SIZE / self.k
+
+            self.line(left, top, right, top)
+            for y in [top + HEADER_HEIGHT + ROW_HEIGHT * r for r in range(len(texts) + 1)]:
+                self.line(left, y, right, y)
+            x = left
+            for width in widths + [0]:
+                self.line(x, top, x, bottom)
+                x += width
+
+            self.set_font(FONT_FAMILY, 'B', TABLE_FONT_SIZE)
+            x = left
+            for title, width in zip(titles, widths):
+                self.text(x + CELL_PADDING, top + HEADER_HEIGHT / 2 + baseline, title)
+                x += width
+
+            self.set_font(FONT_FAMILY, '', TABLE_FONT_SIZE)
+            for r, row in enumerate(texts):
+                y = top + HEADER_HEIGHT + ROW_HEIGHT * r + ROW_HEIGHT / 2 + baseline
+                x = left
+                for item, width in zip(row, widths):
+                    if item:
+                        self.text(x + CELL_PADDING, y, item)
+                    x += width
+                if links and links[r]:
+                    self.link(left, top + HEADER_HEIGHT + ROW_HEIGHT * r, right - left, ROW_HEIGHT, links[r])
+            self.set_y(bottom)
+
+        def add_table(self, header, data, links=None):
+            """Таблица, размеченная целиком и выведенная блоками по странице"""
+            titles, texts, widths = self.table_layout(header, data)
+            start = 0
+            while True:
+                room = self.page_break_trigger - self.get_y() - HEADER_HEIGHT
+                count = max(0, int(room // ROW_HEIGHT))
+                if count == 0 and (start < len(texts) or not texts):
+                    self.add_page()
+                    continue
+                self._draw_block(titles, texts[start:start + count], widths, self.get_y(),
+                                 links and links[start:start + count])
+                start += count
+                if start >= len(texts):
+                    break
+                self.add_page()
+            self.ln(4)
+
+    return ReportPDF
+
+
+def new_document(title=REPORT_TITLE):
+    """Новый документ отчета со шрифтами с кириллицей"""
+    pdf = _report_pdf_class()()
+    for style, path in find_fonts(os.environ.get(FONT_VARIABLE)).items():
+        pdf.add_font(FONT_FAMILY, style, str(path))
+    pdf.set_auto_page_break(auto=True, margin=PAGE_MARGIN)
+    pdf.report_title = title
+    return pdf
+
+
+def horizontal_table(horizontal_df):
+    """Заголовок и строки таблицы горизонтального анализа (значения по годам и Δ%)"""
+    years = [column for column in horizontal_df.columns if isinstance(column, int)]
+    changes = [column for column in horizontal_df.columns if str(column).startswith('Δ%')]
+    header = ['Показатель'] + [str(year) for year in years] + [column.replace('Δ% ', 'Δ%') for column in changes]
+    rows = [
+        [row['Показатель']]
+        + [format_number(row[year]) for year in years]
+        + [format_number(row[column], 1, '%') for column in changes]
+        for _, row in horizontal_df.iterrows()
+    ]
+    return header, rows
+
+
+def column_groups(header, rows, size):
+    """Делит широкую таблицу на части по size столбцов, первый столбец повторяется"""
+    for start in range(1, max(len(header), 2), size):
+        columns = [0] + list(range(start, min(start + size, len(header))))
+        yield [header[k] for k in columns], [[row[k] for k in columns] for row in rows]
+
+
+def build_report(df, ratios, horizontal_df, vertical_asset_df, vertical_liability_df, anomalies):
+    """PDF-отчет с результатами анализа в BytesIO"""
+    return render_report(COMPANY, (df['Год'].min(), df['Год'].max()), ratios, horizontal_df, anomalies)
+
+
+def save_pdf(pdf):
+    """Документ в BytesIO"""
+    pdf_output = BytesIO()
+    pdf.output(pdf_output)
+    pdf_output.seek(0)
+    return pdf_output
+
+
+def render_report(company, period, ratios, horizontal_df, anomalies):
+    """PDF-отчет по компании за период (первый год, последний год) в BytesIO"""
+    pdf = new_document(f'Финансовый анализ {company}')
+    pdf.add_page()
+
+    # Введение
+    pdf.chapter_title('1. Введение')
+    intro_text = f"""
+    Настоящий отчет подготовлен на основе финансовой отчетности {company} за период с {period[0]} по {period[1]} год.
+    Цель анализа - оценка финансового состояния компании, выявление позитивных и негативных тенденций, а также обнаружение возможных аномалий.
+    """
+    pdf.chapter_body(intro_text)
+
+    # Горизонтальный анализ
+    pdf.chapter_title('2. Горизонтальный анализ')
+    horiz_text = """
+    Горизонтальный анализ позволяет оценить динамику изменения финансовых показателей в течение анализируемого периода.
+    """
+    pdf.chapter_body(horiz_text)
+    if horizontal_df is not None and not horizontal_df.empty:
+        header, rows = horizontal_table(horizontal_df)
+        for group_header, group_rows in column_groups(header, rows, 6):
+            pdf.add_table(group_header, group_rows)
+
+    # Финансовые коэффициенты
+    pdf.chapter_title('3. Финансовые коэффициенты')
+    ratios_text = "В таблице представлены ключевые финансовые коэффициенты за последний год:\n"
+    pdf.chapter_body(ratios_text)
+
+    ratio_data = []
+    for ratio_name, data in ratios.items():
+        ratio_data.append([
+            ratio_name,
+            f"{data['value']:.3f}" if not pd.isna(data['value']) else "Н/Д",
+            f"{data['norm']:.3f}",
+            data['interpretation']
+        ])
+
+    pdf.add_table(['Коэффициент', 'Значение', 'Норматив', 'Интерпретация'], ratio_data)
+
+    # Аномалии
+    pdf.chapter_title('4. Выявленные аномалии')
+    if anomalies:
+        anomaly_text = f"В ходе анализа выявлено {len(anomalies)} аномалий:\n"
+        pdf.chapter_body(anomaly_text)
+
+        anomaly_data = []
+        for anomaly in anomalies:
+            anomaly_data.append([
+                anomaly['indicator'],
+                anomaly['year'],
+                f"{anomaly['value']:.0f}",
+                anomaly['type'],
+                anomaly['severity'].upper(),
+                anomaly['description']
+            ])
+
+        pdf.add_table(['Показатель', 'Год', 'Значение', 'Тип', 'Важность', 'Описание'], anomaly_data)
+    else:
+        pdf.chapter_body("В ходе анализа не выявлено значимых аномалий.")
+
+    # Заключение
+    pdf.chapter_title('5. Заключение')
+    conclusion_text = """
+    По результатам проведенного анализа можно сделать следующие выводы:
+    """
+
+    # Добавляем выводы на основе анализа коэффициентов
+    positive_ratios = sum(1 for r in ratios.values() if 'Хорошее' in r['interpretation'])
+    total_ratios = len(ratios)
+    share = positive_ratios / total_ratios if total_ratios else 0
+
+    if share > 0.7:
+        conclusion_text += "\n- Финансовое состояние компании можно оценить как хорошее."
+    elif share > 0.4:
+        conclusion_text += "\n- Финансовое состояние компании можно оценить как удовлетворительное с отдельными проблемными зонами."
+    else:
+        conclusion_text += "\n- Финансовое состояние компании вызывает серьезные опасения."
+
+    if anomalies:
+        high_severity = sum(1 for a in anomalies if a['severity'] == 'high')
+        if high_severity > 0:
+            conclusion_text += f"\n- Выявлено {high_severity} критически важных аномалий, требующих немедленного внимания."
+
+    conclusion_text += "\n\nРекомендуется провести детальный анализ выявленных проблем и разработать план их устранения."
+    pdf.chapter_body(conclusion_text)
+
+    return save_pdf(pdf)
+
+
+def report_workers():
+    """Число фоновых потоков отчетов: PROJECT_ALPHA_REPORT_WORKERS или None (значение ThreadPoolExecutor)"""
+    text = os.environ.get(WORKERS_VARIABLE)
+    if not text:
+        return None
+    try:
+        workers = int(text)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise ValueError(f"{WORKERS_VARIABLE} должна быть целым числом больше нуля: {text}")
+    return workers
+
+
+def submit_report(*args, build=build_report, **kwargs):
+    """
+    Запускает build (по умолчанию build_report) в фоновом потоке и сразу
+    возвращает Future. Пул потоков общий для всех сессий процесса, поэтому
+    в нем несколько потоков: большой отчет одного пользователя не задерживает
+    отчеты остальных.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=report_workers(), thread_name_prefix='pdf-report')
+    return _executor.submit(build, *args, **kwargs)
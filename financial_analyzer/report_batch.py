@@ -0,0 +1,162 @@
+"""
+Пакетное построение PDF-отчетов по каталогу с отчетностью.
+
+Каждый файл анализируется и превращается в PDF в пуле процессов. Процесс
+при запуске один раз разбирает шрифты, дальше документы берут метрики из
+кэша report. Обработчик сам записывает PDF на диск и возвращает только
+краткую запись ReportEntry. По записям строится сводка портфеля:
+index.csv и index.pdf со ссылками на отчеты компаний.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from financial_analyzer import report
+from financial_analyzer.batch import analyze_file, company_ids, find_statements
+from financial_analyzer.parallel import default_chunksize
+
+INDEX_COLUMNS = ['company', 'source', 'report', 'first_year', 'last_year',
+                 'anomalies', 'high_severity', 'warnings', 'error']
+INDEX_TITLE = 'Сводный отчет по портфелю'
+
+
+@dataclass
+class ReportEntry:
+    """Итог по одной компании для сводки: имя PDF-файла и счетчики"""
+    company: str
+    source: str = ''
+    report: str = None
+    first_year: int = None
+    last_year: int = None
+    anomalies: int = 0
+    high_severity: int = 0
+    warnings: int = 0
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def report_names(paths):
+    """
+    Имена PDF-файлов по именам файлов отчетности. Повтор получает первый
+    свободный номер: имя сверяется со всеми уже выданными, поэтому файл
+    x_2.xlsx не совпадет со вторым x.xlsx из другого каталога.
+    """
+    used = set()
+    names = []
+    for path in paths:
+        stem = Path(path).stem
+        name, number = f"{stem}.pdf", 1
+        while name in used:
+            number += 1
+            name = f"{stem}_{number}.pdf"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def init_worker():
+    """Запуск процесса-обработчика: шрифты ищутся и fpdf загружается один раз на процесс"""
+    report.new_document()
+
+
+def render_file(path, output_dir, name, streaming=False, company=None):
+    """Анализ одного файла и запись его PDF-отчета в output_dir/name"""
+    result = analyze_file(path, streaming=streaming, company=company)
+    entry = ReportEntry(
+        company=result.company,
+        source=result.source,
+        anomalies=len(result.anomalies),
+        high_severity=sum(1 for anomaly in result.anomalies if anomaly['severity'] == 'high'),
+        warnings=len(result.warnings),
+        error=result.error,
+    )
+    if not result.ok:
+        return entry
+
+    years = result.ratio_table.index
+    entry.first_year, entry.last_year = int(years.min()), int(years.max())
+    try:
+        buffer = report.render_report(
+            result.company, (entry.first_year, entry.last_year),
+            result.ratios, result.horizontal, result.anomalies
+        )
+    except Exception as e:
+        entry.error = f"Ошибка построения отчета: {e}"
+        return entry
+
+    (Path(output_dir) / name).write_bytes(buffer.getvalue())
+    entry.report = name
+    return entry
+
+
+def write_index(entries, output_dir):
+    """Записывает сводку портфеля в index.csv и index.pdf и возвращает пути"""
+    output_dir = Path(output_dir)
+    paths = {
+        'index_csv': output_dir / 'index.csv',
+        'index_pdf': output_dir / 'index.pdf',
+    }
+    table = pd.DataFrame([asdict(entry) for entry in entries]).reindex(columns=INDEX_COLUMNS)
+    table.to_csv(paths['index_csv'], index=False, encoding='utf-8')
+
+    done = [entry for entry in entries if entry.report]
+    failed = [entry for entry in entries if not entry.ok]
+
+    pdf = report.new_document(INDEX_TITLE)
+    pdf.add_page()
+    pdf.chapter_title('Отчеты компаний')
+    pdf.chapter_body(
+        f"Подготовлено отчетов: {len(done)}, не удалось обработать файлов: {len(failed)}.\n"
+        f"Строки таблицы — ссылки на PDF-отчеты компаний."
+    )
+    pdf.add_table(
+        ['Компания', 'Период', 'Аномалии', 'Высокая важность', 'Отчет'],
+        [[entry.company, f"{entry.first_year}–{entry.last_year}", entry.anomalies, entry.high_severity, entry.report]
+         for entry in done],
+        links=[entry.report for entry in done]
+    )
+    if failed:
+        pdf.chapter_title('Ошибки')
+        pdf.add_table(['Компания', 'Файл', 'Ошибка'],
+                      [[entry.company, entry.source, entry.error] for entry in failed])
+    paths['index_pdf'].write_bytes(report.save_pdf(pdf).getvalue())
+    return paths
+
+
+def run_reports(directory, output_dir, workers=1, chunksize=None, streaming=False):
+    """
+    Строит PDF-отчеты по всем файлам каталога и сводку портфеля.
+    При workers != 1 отчеты строятся в пуле процессов
+    (workers=None — по числу ядер).
+    """
+    # Без шрифта с кириллицей ни один отчет не построить — проверяем до запуска пула
+    report.find_fonts(os.environ.get(report.FONT_VARIABLE))
+
+    paths = find_statements(directory)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    names = report_names(paths)
+    companies = company_ids(paths, directory)
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths) or 1))
+    if workers == 1:
+        entries = [render_file(path, output_dir, name, streaming, company)
+                   for path, name, company in zip(paths, names, companies)]
+    else:
+        chunksize = chunksize or default_chunksize(len(paths), workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            entries = list(executor.map(
+                render_file, paths, [output_dir] * len(paths), names, [streaming] * len(paths), companies,
+                chunksize=chunksize
+            ))
+    if not entries:
+        return entries, {}
+    return entries, write_index(entries, output_dir)
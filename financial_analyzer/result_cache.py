@@ -0,0 +1,144 @@
+"""
+Дисковый кэш результатов этапов анализа, общий для сессий и процессов.
+
+Ключ — хэш содержимого отчетности, версии анализа, отпечатка настроек
+расчета (реестров коэффициентов, правил и детекторов), имени этапа и его
+параметров, поэтому второй пользователь, открывший тот же файл, получает
+коэффициенты, таблицы и аномалии без пересчета. Результаты хранятся в
+pickle и записываются атомарно. Записи старше срока хранения (TTL)
+не используются, а при превышении размера удаляются записи, к которым
+дольше всего не обращались.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+
+from financial_analyzer import __version__
+from financial_analyzer.statement_cache import StatementCache, default_cache_dir
+
+# Меняется при изменении расчетов, чтобы старые результаты не использовались
+ANALYSIS_VERSION = f'{__version__}/results-v1'
+# Константы детекторов, которые функции оценок берут из модуля, а не из реестра
+DETECTOR_CONSTANTS = ('Z_SCORE_INDICATORS', 'ROLLING_WINDOW', 'ROLLING_MIN_PERIODS',
+                      'ROBUST_MIN_VALUES', 'MAD_SCALE', 'MEAN_AD_SCALE')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+TTL_VARIABLE = 'PROJECT_ALPHA_RESULT_TTL'
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+def _qualified_name(value):
+    """Функция в отпечатке записывается именем: repr содержит адрес в памяти"""
+    return f"{value.__module__}.{value.__qualname__}"
+
+
+def analysis_fingerprint():
+    """
+    Хэш реестров коэффициентов, правил и детекторов вместе с константами
+    детекторов. Реестры можно менять во время работы, поэтому отпечаток
+    считается при каждом обращении.
+    """
+    from financial_analyzer import anomalies
+    from financial_analyzer.ratios import RATIO_REGISTRY
+    from financial_analyzer.rules import RULE_REGISTRY
+
+    settings = {
+        'ratios': RATIO_REGISTRY,
+        'rules': RULE_REGISTRY,
+        'detectors': anomalies.DETECTOR_REGISTRY,
+        'constants': {name: getattr(anomalies, name) for name in DETECTOR_CONSTANTS},
+    }
+    text = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=_qualified_name)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def result_key(content, stage, params=()):
+    """Ключ результата этапа stage с параметрами params для отчетности с хэшем content"""
+    digest = hashlib.sha256(ANALYSIS_VERSION.encode())
+    digest.update(analysis_fingerprint().encode())
+    digest.update(repr((content, stage, tuple(params))).encode())
+    return digest.hexdigest()
+
+
+def default_ttl():
+    """Срок хранения в секундах: PROJECT_ALPHA_RESULT_TTL или неделя; 0 — без ограничения"""
+    text = os.environ.get(TTL_VARIABLE)
+    if not text:
+        return DEFAULT_TTL
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{TTL_VARIABLE} должна быть числом секунд: {text}")
+
+
+class ResultCache(StatementCache):
+    """Ограниченный по размеру и сроку хранения LRU-кэш результатов этапов на диске"""
+
+    suffix = '.pickle'
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        super().__init__(directory or default_cache_dir('results'), max_bytes)
+        # pickle есть всегда, pyarrow не нужен
+        self.enabled = True
+        self.ttl = default_ttl() if ttl is None else ttl
+
+    def _expired(self, created):
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    def get(self, key):
+        """Результат из кэша или None; обращение обновляет время записи для LRU"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                created, value = pickle.load(f)
+            if self._expired(created):
+                path.unlink()
+                value = None
+            else:
+                os.utime(path)
+        except FileNotFoundError:
+            value = None
+        except Exception:
+            # Поврежденная или несовместимая запись считается промахом
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Сохраняет результат атомарной записью и при необходимости вытесняет старые записи"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, self._path(key))
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        self.evict()
+
+    def evict(self):
+        """Удаляет просроченные записи, затем давно не использованные сверх лимита размера"""
+        if self.ttl:
+            # Время изменения не раньше времени записи: такие записи точно просрочены
+            deadline = time.time() - self.ttl
+            for modified, _, path in self._entries():
+                if modified < deadline:
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        continue
+                    with self._lock:
+                        self.evictions += 1
+        super().evict()
@@ -0,0 +1,373 @@
+"""
+Декларативные бизнес-правила поиска аномалий.
+
+Правило — словарь с условием на языке выражений над показателями:
+
+    'when': "profit < 0 and revenue > prev(revenue)"
+
+В выражениях доступны псевдонимы показателей (INDICATOR_ALIASES) и
+indicator('Полное название'), числа, + - * /, сравнения, and/or/not и
+функции prev (значение прошлого года), change (изменение к прошлому
+году), growth (темп прироста) и abs. Деление на ноль дает NaN, сравнения
+с NaN ложны.
+
+RuleSet компилирует все правила в одну программу: одинаковые
+подвыражения разных правил (например, growth(revenue)) вычисляются один
+раз, а однотипные шаги всех правил выполняются одним вызовом NumPy над
+всеми годами (и компаниями) сразу, поэтому сотни правил стоят немногим
+дороже трех. Правила можно загрузить из JSON или YAML (load_rules) и
+подключить через переменную окружения PROJECT_ALPHA_RULES.
+"""
+
+import ast
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from financial_analyzer.ratios import (
+    CASH, CURRENT_ASSETS, EQUITY, INVENTORY, NET_PROFIT, REVENUE, SHORT_LIABILITIES, TOTAL_ASSETS
+)
+
+RULES_VARIABLE = 'PROJECT_ALPHA_RULES'
+SEVERITIES = ('high', 'medium')
+
+INDICATOR_ALIASES = {
+    'revenue': REVENUE,
+    'profit': NET_PROFIT,
+    'receivables': 'Дебиторская задолженность',
+    'payables': 'Кредиторская задолженность',
+    'current_assets': CURRENT_ASSETS,
+    'short_liabilities': SHORT_LIABILITIES,
+    'total_assets': TOTAL_ASSETS,
+    'equity': EQUITY,
+    'inventory': INVENTORY,
+    'cash': CASH,
+}
+
+# Встроенные правила в порядке вывода аномалий. description — шаблон
+# str.format: доступны year, prev_year, value и поля из fields.
+RULE_REGISTRY = {
+    'loss_with_revenue_growth': {
+        'when': "profit < 0 and revenue > prev(revenue)",
+        'indicator': 'Чистая прибыль',
+        'value': "profit",
+        'severity': 'high',
+        'label': 'Убыток при росте выручки',
+        'description': "Отрицательная чистая прибыль при росте выручки с {prev_year} по {year} год",
+    },
+    'receivables_outpace_revenue': {
+        'when': "growth(receivables) > growth(revenue) * 1.5 and growth(receivables) > 0",
+        'indicator': 'Дебиторская задолженность',
+        'value': "receivables",
+        'fields': {'receivables_growth': "growth(receivables)", 'revenue_growth': "growth(revenue)"},
+        'severity': 'medium',
+        'label': 'Дебиторка быстрее выручки',
+        'description': "Рост дебиторской задолженности ({receivables_growth:.1%}) значительно опережает рост выручки ({revenue_growth:.1%})",
+    },
+    'low_current_ratio': {
+        'when': "current_assets / short_liabilities < 1",
+        'indicator': 'Текущая ликвидность',
+        'value': "current_assets / short_liabilities",
+        'severity': 'high',
+        'label': 'Низкая ликвидность',
+        'description': "Коэффициент текущей ликвидности ниже критического уровня ({value:.2f} < 1)",
+    },
+}
+
+REQUIRED_KEYS = ('when', 'indicator', 'value', 'severity', 'description')
+# Имена, занятые другими массивами в результате anomaly_masks
+RESERVED_NAMES = {'detectors', 'statistical', 'rows', 'rules'}
+
+
+def prev(x):
+    """Значение прошлого года; для первого года — NaN"""
+    shifted = np.full(x.shape, np.nan)
+    shifted[..., 1:] = x[..., :-1]
+    return shifted
+
+
+def growth(x):
+    """Темп прироста год к году; при нулевой базе и для первого года — ноль"""
+    base = prev(x)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(base != 0, (x - base) / np.where(base != 0, base, 1.0), 0.0)
+    result[..., :1] = 0.0
+    return result
+
+
+def divide(a, b):
+    """Деление; на ноль — NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b != 0, a / np.where(b != 0, b, 1.0), np.nan)
+
+
+OPERATIONS = {
+    'prev': prev,
+    'growth': growth,
+    'abs': np.abs,
+    'neg': np.negative,
+    'add': np.add,
+    'sub': np.subtract,
+    'mul': np.multiply,
+    'div': divide,
+    'lt': np.less,
+    'le': np.less_equal,
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'eq': np.equal,
+    'ne': np.not_equal,
+    'and': np.logical_and,
+    'or': np.logical_or,
+    'not': np.logical_not,
+}
+
+BINARY_OPERATORS = {ast.Add: 'add', ast.Sub: 'sub', ast.Mult: 'mul', ast.Div: 'div'}
+COMPARISONS = {ast.Lt: 'lt', ast.LtE: 'le', ast.Gt: 'gt', ast.GtE: 'ge', ast.Eq: 'eq', ast.NotEq: 'ne'}
+FUNCTIONS = ('prev', 'growth', 'change', 'abs', 'indicator')
+
+
+def parse_expression(text, aliases=INDICATOR_ALIASES):
+    """
+    Разбирает выражение в дерево из кортежей (операция, аргументы...).
+    Одинаковые подвыражения дают равные кортежи, поэтому их легко
+    вычислить один раз.
+    """
+    try:
+        tree = ast.parse(str(text).strip(), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Ошибка в выражении «{text}»: {e.msg}") from None
+
+    def convert(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return ('const', float(node.value))
+        if isinstance(node, ast.Name):
+            if node.id not in aliases:
+                raise ValueError(f"Неизвестный показатель «{node.id}» в выражении «{text}»")
+            return ('row', aliases[node.id])
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+            if len(node.args) != 1 or node.keywords:
+                raise ValueError(f"Функция {node.func.id} принимает один аргумент: «{text}»")
+            argument = node.args[0]
+            if node.func.id == 'indicator':
+                if not (isinstance(argument, ast.Constant) and isinstance(argument.value, str)):
+                    raise ValueError(f"indicator() принимает название показателя в кавычках: «{text}»")
+                return ('row', argument.value)
+            operand = convert(argument)
+            if node.func.id == 'change':
+                return ('sub', operand, ('prev', operand))
+            return (node.func.id, operand)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd, ast.Not)):
+            operand = convert(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            return ('neg' if isinstance(node.op, ast.USub) else 'not', operand)
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            return (BINARY_OPERATORS[type(node.op)], convert(node.left), convert(node.right))
+        if isinstance(node, ast.BoolOp):
+            operation = 'and' if isinstance(node.op, ast.And) else 'or'
+            result = convert(node.values[0])
+            for value in node.values[1:]:
+                result = (operation, result, convert(value))
+            return result
+        if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+            # a < b < c читается как (a < b) and (b < c)
+            operands = [convert(node.left)] + [convert(item) for item in node.comparators]
+            result = None
+            for op, left, right in zip(node.ops, operands, operands[1:]):
+                comparison = (COMPARISONS[type(op)], left, right)
+                result = comparison if result is None else ('and', result, comparison)
+            return result
+        raise ValueError(f"Недопустимая конструкция «{ast.unparse(node)}» в выражении «{text}»")
+
+    return convert(tree)
+
+
+def check_rule(name, spec):
+    """Проверяет описание правила и возвращает список ошибок"""
+    if not isinstance(spec, dict):
+        return [f"Правило {name}: ожидается словарь, получено {type(spec).__name__}"]
+    errors = [f"Правило {name}: нет ключа '{key}'" for key in REQUIRED_KEYS if key not in spec]
+    if spec.get('severity', SEVERITIES[0]) not in SEVERITIES:
+        errors.append(f"Правило {name}: важность должна быть одной из {', '.join(SEVERITIES)}")
+    if name in RESERVED_NAMES:
+        errors.append(f"Правило {name}: имя занято")
+    return errors
+
+
+class RuleSet:
+    """
+    Набор правил, скомпилированный в программу из уникальных шагов.
+
+    indicators — показатели, которые читают правила (в порядке первого
+    упоминания). evaluate получает их строки и возвращает маски всех
+    правил, значения и поля для описаний.
+    """
+
+    def __init__(self, registry=None):
+        registry = RULE_REGISTRY if registry is None else registry
+        errors = [error for name, spec in registry.items() for error in check_rule(name, spec)]
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        self.registry = dict(registry)
+        self.names = list(registry)
+        self.indicators = []
+        self.program = []
+        self._slots = {}
+
+        self.mask_slots = []
+        self.value_slots = []
+        self.field_slots = []
+        for name, spec in registry.items():
+            aliases = {**INDICATOR_ALIASES, **spec.get('indicators', {})}
+            try:
+                self.mask_slots.append(self._emit(parse_expression(spec['when'], aliases)))
+                self.value_slots.append(self._emit(parse_expression(spec['value'], aliases)))
+                self.field_slots.append({
+                    field: self._emit(parse_expression(expression, aliases))
+                    for field, expression in spec.get('fields', {}).items()
+                })
+            except ValueError as e:
+                raise ValueError(f"Правило {name}: {e}") from None
+        self.schedule = self._schedule()
+        self.max_lag = self._max_lag()
+
+    def _max_lag(self):
+        """На сколько лет назад заглядывают правила: глубина вложенных prev и growth"""
+        lags = []
+        for operation, argument in self.program:
+            if operation in ('const', 'row'):
+                lags.append(0)
+            else:
+                lags.append(max(lags[k] for k in argument) + (operation in ('prev', 'growth')))
+        return max(lags, default=0)
+
+    def _emit(self, node):
+        """Номер шага программы для узла; повторный узел не добавляет шаг"""
+        if node in self._slots:
+            return self._slots[node]
+        operation = node[0]
+        if operation == 'const':
+            step = (operation, node[1])
+        elif operation == 'row':
+            if node[1] not in self.indicators:
+                self.indicators.append(node[1])
+            step = (operation, self.indicators.index(node[1]))
+        else:
+            step = (operation, tuple(self._emit(argument) for argument in node[1:]))
+        self.program.append(step)
+        self._slots[node] = len(self.program) - 1
+        return self._slots[node]
+
+    def _schedule(self):
+        """
+        Группирует шаги программы по уровням: шаг уровня n зависит только от
+        шагов младших уровней. Шаги одного уровня с одной операцией
+        выполняются одним вызовом NumPy над всеми правилами сразу.
+        """
+        self.row_slots = [slot for slot, (operation, _) in enumerate(self.program) if operation == 'row']
+        self.const_slots = [slot for slot, (operation, _) in enumerate(self.program) if operation == 'const']
+        self.const_values = np.array([self.program[slot][1] for slot in self.const_slots])
+
+        levels = []
+        groups = {}
+        for slot, (operation, argument) in enumerate(self.program):
+            if operation in ('const', 'row'):
+                levels.append(0)
+                continue
+            levels.append(1 + max(levels[k] for k in argument))
+            groups.setdefault((levels[-1], operation), []).append((slot, argument))
+        schedule = []
+        for (_, operation), steps in sorted(groups.items(), key=lambda item: item[0][0]):
+            outputs = np.array([slot for slot, _ in steps])
+            arguments = [np.array(column) for column in zip(*(argument for _, argument in steps))]
+            schedule.append((operation, outputs, arguments))
+        return schedule
+
+    def __len__(self):
+        return len(self.names)
+
+    def label(self, name):
+        """Подпись правила для таблиц"""
+        return self.registry[name].get('label', name)
+
+    def evaluate(self, rows, row_index):
+        """
+        Выполняет программу над массивом строк (..., строки, годы);
+        row_index — {показатель: номер строки}. Возвращает словарь:
+        masks — маски (..., правила, годы), values и fields — массивы
+        (..., годы) по правилам.
+        """
+        shape = rows.shape[:-2] + rows.shape[-1:]
+        # Все промежуточные результаты — строки одного буфера (шаги, ..., годы)
+        buffer = np.empty((len(self.program),) + shape)
+        if self.row_slots:
+            positions = [row_index[self.indicators[self.program[slot][1]]] for slot in self.row_slots]
+            buffer[self.row_slots] = np.moveaxis(rows[..., positions, :], -2, 0)
+        if self.const_slots:
+            buffer[self.const_slots] = self.const_values.reshape((-1,) + (1,) * len(shape))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for operation, outputs, arguments in self.schedule:
+                buffer[outputs] = OPERATIONS[operation](*(buffer[argument] for argument in arguments))
+
+        return {
+            'masks': np.moveaxis(buffer[self.mask_slots], 0, -2).astype(bool),
+            'values': {name: buffer[slot] for name, slot in zip(self.names, self.value_slots)},
+            'fields': {
+                name: {field: buffer[slot] for field, slot in fields.items()}
+                for name, fields in zip(self.names, self.field_slots)
+            },
+        }
+
+
+def load_rules(path):
+    """
+    Правила из файла JSON или YAML (словарь {имя: описание}). Для YAML
+    нужен пакет PyYAML.
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Для правил в формате YAML установите PyYAML: pip install pyyaml") from None
+        rules = yaml.safe_load(text)
+    else:
+        rules = json.loads(text)
+    if not isinstance(rules, dict):
+        raise ValueError(f"Файл правил {path} должен содержать словарь {{имя: правило}}")
+    return rules
+
+
+def merge_rules(registry, extra):
+    """Встроенные правила с дополнительными; правило со значением null отключает одноименное"""
+    merged = dict(registry)
+    for name, spec in extra.items():
+        if spec is None:
+            merged.pop(name, None)
+        else:
+            merged[name] = spec
+    return merged
+
+
+@lru_cache(maxsize=8)
+def _compiled(path, modified):
+    if path is None:
+        return RuleSet(RULE_REGISTRY)
+    return RuleSet(merge_rules(RULE_REGISTRY, load_rules(path)))
+
+
+def active_rules():
+    """
+    Действующий набор правил: встроенные и правила из файла
+    PROJECT_ALPHA_RULES. Набор компилируется заново при изменении файла.
+    """
+    path = os.environ.get(RULES_VARIABLE)
+    if not path:
+        return _compiled(None, None)
+    return _compiled(path, os.path.getmtime(path))
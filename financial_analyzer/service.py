@@ -0,0 +1,336 @@
+"""
+HTTP-сервис анализа отчетности на asyncio (только стандартная библиотека).
+
+POST /analyze — тело запроса: файл Excel; ответ — JSON с коэффициентами
+за последний год и по всем годам, аномалиями и предупреждениями.
+Название компании можно передать параметром ?company=. GET /health —
+состояние очереди и кэша.
+
+Цикл событий только принимает запросы: разбор файла и расчеты выполняются
+в пуле процессов, причем считаются только этапы, которые попадают в ответ
+(коэффициенты и аномалии). Если процесс-обработчик аварийно завершился
+(например, его остановила система при нехватке памяти), пул пересоздается,
+а затронутые запросы получают 503. Одновременно считается не больше workers файлов. Запрос
+занимает место с приема до ответа, включая чтение тела, и всего
+обрабатывается не больше workers + queue_size запросов; остальные сразу,
+не читая тела, получают 503 с заголовком Retry-After. Результаты хранятся в LRU-кэше по
+хэшу содержимого: повторная отправка того же файла не пересчитывается,
+а одинаковые файлы, пришедшие одновременно, считаются один раз.
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+from financial_analyzer.statement_cache import content_key
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_CACHE_SIZE = 128
+MAX_BODY_BYTES = 50 * 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+DEFAULT_COMPANY = 'statement'
+# Через сколько секунд клиенту стоит повторить запрос, отклоненный из-за очереди
+RETRY_AFTER = 1
+# Этапы анализа, результаты которых попадают в ответ
+SERVICE_STAGES = ('ratios', 'anomalies')
+# Модули, которые процесс-обработчик получает уже загруженными
+WORKER_MODULES = ['financial_analyzer.analysis', 'financial_analyzer.batch']
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+def plain(value):
+    """Значение для JSON: скаляры NumPy — в числа Python, NaN и бесконечности — в None"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def result_payload(result):
+    """Результат анализа в виде словаря для JSON"""
+    payload = {
+        'company': result.company,
+        'ok': result.ok,
+        'error': result.error,
+        'warnings': list(result.warnings),
+        'years': [],
+        'ratios': {},
+        'ratio_table': {},
+        'anomalies': [],
+    }
+    if not result.ok:
+        return payload
+
+    table = result.ratio_table
+    payload['years'] = [int(year) for year in table.index]
+    payload['ratios'] = {
+        name: {key: plain(value) for key, value in ratio.items()} for name, ratio in result.ratios.items()
+    }
+    payload['ratio_table'] = {
+        str(int(year)): {name: plain(value) for name, value in row.items()}
+        for year, row in zip(table.index, table.to_dict('records'))
+    }
+    payload['anomalies'] = [{key: plain(value) for key, value in anomaly.items()} for anomaly in result.anomalies]
+    return payload
+
+
+def analyze_bytes(data, company=DEFAULT_COMPANY):
+    """Задача для процесса-обработчика: анализ файла Excel из байтов, результат — словарь для JSON"""
+    # pandas и модули анализа нужны только процессам-обработчикам
+    from financial_analyzer import analysis
+    from financial_analyzer.batch import AnalysisResult, analyze_frame
+
+    messages = []
+    df = analysis.load_data(BytesIO(data), messages)
+    if df is None:
+        return result_payload(AnalysisResult(company=company, error='; '.join(messages)))
+    try:
+        result = analyze_frame(df, company, stages=SERVICE_STAGES)
+    except Exception as e:
+        return result_payload(AnalysisResult(company=company, warnings=messages, error=f"Ошибка анализа: {e}"))
+    result.warnings[:0] = messages
+    return result_payload(result)
+
+
+def worker_context():
+    """
+    Способ запуска процессов-обработчиков. fork из процесса с потоками
+    asyncio может зависнуть, поэтому на POSIX обработчики порождаются
+    сервером forkserver, который заранее загружает pandas и модули
+    анализа: новый процесс стартует без повторного импорта. Где
+    forkserver нет (Windows), используется spawn.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(WORKER_MODULES)
+    return context
+
+
+class HTTPError(Exception):
+    """Ошибка запроса, которая возвращается клиенту с кодом status"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class AnalysisService:
+    """
+    Обработчик запросов: очередь с ограничением, пул процессов и кэш
+    результатов. executor по умолчанию — ProcessPoolExecutor на workers
+    процессов, создается при запуске.
+    """
+
+    def __init__(self, workers=1, queue_size=DEFAULT_QUEUE_SIZE, cache_size=DEFAULT_CACHE_SIZE,
+                 max_body=MAX_BODY_BYTES, executor=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache_size = cache_size
+        self.max_body = max_body
+        self.executor = executor
+        self._own_executor = executor is None
+        self._slots = None
+        self._active = 0
+        self._pending = {}
+        self._cache = OrderedDict()
+        self.stats = Counter(dict.fromkeys(['computed', 'cache_hits', 'shared', 'rejected', 'restarts'], 0))
+
+    @property
+    def capacity(self):
+        """Сколько запросов анализа может одновременно обрабатываться: считаться, ждать очереди и передавать тело"""
+        return self.workers + self.queue_size
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'active': self._active,
+            'pending': len(self._pending),
+            'capacity': self.capacity,
+            'cached': len(self._cache),
+            **self.stats,
+        }
+
+    def _remember(self, key, payload):
+        self._cache[key] = payload
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _compute(self, key, data):
+        """Считает файл, когда освободится место в пуле, и кладет результат в кэш"""
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                executor = self.executor
+                try:
+                    payload = await loop.run_in_executor(executor, analyze_bytes, data)
+                except BrokenProcessPool:
+                    self._restart(executor)
+                    raise HTTPError(503, "Обработчик анализа аварийно завершился, повторите запрос позже",
+                                    {'Retry-After': str(RETRY_AFTER)})
+            self._remember(key, payload)
+            self.stats['computed'] += 1
+            return payload
+        finally:
+            del self._pending[key]
+
+    async def analyze(self, data):
+        """Результат анализа файла: из кэша, из уже идущего расчета или новым расчетом"""
+        key = await asyncio.to_thread(content_key, data)
+        payload = self._cache.get(key)
+        if payload is not None:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return payload, 'hit'
+
+        task = self._pending.get(key)
+        if task is not None:
+            self.stats['shared'] += 1
+            return await asyncio.shield(task), 'shared'
+
+        task = asyncio.ensure_future(self._compute(key, data))
+        self._pending[key] = task
+        return await asyncio.shield(task), 'miss'
+
+    def _admit(self):
+        """Отклоняет новый запрос, если пул и очередь заняты"""
+        if self._active >= self.capacity:
+            self.stats['rejected'] += 1
+            raise HTTPError(503, "Сервис перегружен, повторите запрос позже",
+                            {'Retry-After': str(RETRY_AFTER)})
+
+    async def handle(self, reader, writer):
+        """Обрабатывает одно соединение: один запрос — один ответ"""
+        status, payload, headers = 200, None, {}
+        try:
+            method, target, request_headers = await self._read_head(reader)
+            url = urlsplit(target)
+            if url.path == '/health':
+                if method != 'GET':
+                    raise HTTPError(405, "Ожидается GET")
+                payload = self.health()
+            elif url.path == '/analyze':
+                if method != 'POST':
+                    raise HTTPError(405, "Ожидается POST с файлом Excel в теле запроса")
+                payload, headers['X-Cache'] = await self._analyze_request(reader, url, request_headers)
+                if not payload['ok']:
+                    status = 422
+            else:
+                raise HTTPError(404, f"Неизвестный адрес: {url.path}")
+        except HTTPError as e:
+            status, payload, headers = e.status, {'error': str(e)}, e.headers
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except (ValueError, UnicodeError) as e:
+            status, payload = 400, {'error': f"Некорректный запрос: {e}"}
+        except Exception as e:
+            status, payload = 500, {'error': f"Ошибка сервиса: {e}"}
+
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                'Content-Type: application/json; charset=utf-8',
+                f'Content-Length: {len(body)}',
+                'Connection: close']
+        head += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _read_head(self, reader):
+        """Строка запроса и заголовки"""
+        try:
+            raw = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Слишком длинные заголовки")
+        lines = raw.decode('latin-1').split('\r\n')
+        method, target, _ = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    async def _analyze_request(self, reader, url, headers):
+        """Читает тело запроса и возвращает результат анализа и признак попадания в кэш"""
+        if 'content-length' not in headers:
+            raise HTTPError(411, "Нужен заголовок Content-Length")
+        length = int(headers['content-length'])
+        if length > self.max_body:
+            raise HTTPError(413, f"Файл больше {self.max_body} байт")
+        if not length:
+            raise HTTPError(400, "Пустое тело запроса")
+        # Под нагрузкой запрос отклоняется до чтения тела; принятый занимает место до ответа
+        self._admit()
+        self._active += 1
+        try:
+            data = await reader.readexactly(length)
+            payload, cache = await self.analyze(data)
+        finally:
+            self._active -= 1
+        company = parse_qs(url.query).get('company')
+        if company:
+            payload = {**payload, 'company': company[0]}
+        return payload, cache
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context())
+
+    def _restart(self, broken):
+        """
+        Пересоздает сломанный пул процессов. Запросы, упавшие вместе с
+        пулом, пересоздают его один раз; чужой executor не трогается.
+        """
+        if not self._own_executor or self.executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._new_executor()
+        self.stats['restarts'] += 1
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Запускает сервер и возвращает asyncio.Server"""
+        self._slots = asyncio.Semaphore(self.workers)
+        if self.executor is None:
+            self.executor = self._new_executor()
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+
+    def close(self):
+        """Останавливает пул процессов, если он создан сервисом"""
+        if self._own_executor and self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Запускает сервис и обслуживает запросы до остановки"""
+    service = AnalysisService(**options)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Сервис анализа: http://{address[0]}:{address[1]} (процессов: {service.workers})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
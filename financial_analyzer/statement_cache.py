@@ -0,0 +1,204 @@
+"""
+Дисковый кэш разобранных файлов отчетности.
+
+Ключ — SHA-256 содержимого файла. Очищенная длинная таблица хранится в
+формате Arrow IPC (Feather v2 без сжатия) вместе с предупреждениями
+предобработки (в метаданных схемы) и читается через отображение файла в
+память. Поврежденная запись (например, после сбоя при записи) удаляется и
+считается промахом. Размер кэша ограничен: при превышении удаляются записи,
+к которым дольше всего не обращались (LRU по времени изменения файла).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Меняется при изменении предобработки, чтобы старые записи не использовались
+CACHE_FORMAT = 'statement-v3'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SUFFIX = '.arrow'
+# Ключ метаданных схемы Arrow с предупреждениями предобработки
+MESSAGES_KEY = b'project_alpha.messages'
+
+
+def default_cache_dir(name='statements'):
+    """Каталог кэша name внутри PROJECT_ALPHA_CACHE_DIR или ~/.cache/project_alpha"""
+    root = os.environ.get('PROJECT_ALPHA_CACHE_DIR')
+    root = Path(root) if root else Path.home() / '.cache' / 'project_alpha'
+    return root / name
+
+
+def read_bytes(file):
+    """Содержимое загруженного файла, пути или файлового объекта"""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        return Path(file).read_bytes()
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    position = file.tell()
+    data = file.read()
+    file.seek(position)
+    return data
+
+
+def content_key(data):
+    """Ключ кэша по содержимому файла"""
+    digest = hashlib.sha256(CACHE_FORMAT.encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class StatementCache:
+    """Ограниченный по размеру LRU-кэш таблиц отчетности на диске"""
+
+    suffix = SUFFIX
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        try:
+            import pyarrow.feather  # noqa: F401
+            self.enabled = True
+        except ImportError:
+            self.enabled = False
+
+    def _path(self, key):
+        return self.directory / f'{key}{self.suffix}'
+
+    def get(self, key, messages=None):
+        """
+        Таблица из кэша или None; сохраненные с ней предупреждения
+        добавляются в messages. Обращение обновляет время записи для LRU.
+        """
+        if not self.enabled:
+            return None
+        import pyarrow as pa
+        from pyarrow import feather
+
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+            stored = json.loads((table.schema.metadata or {}).get(MESSAGES_KEY, b'[]'))
+            df = table.to_pandas()
+            os.utime(path)
+        except FileNotFoundError:
+            df = None
+        except (pa.ArrowInvalid, ValueError, OSError):
+            # Недописанная или поврежденная запись считается промахом
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            df = None
+        with self._lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if df is not None and messages is not None:
+            messages.extend(stored)
+        return df
+
+    def put(self, key, df, messages=()):
+        """
+        Сохраняет таблицу с предупреждениями messages атомарной записью и
+        при необходимости вытесняет старые записи
+        """
+        if not self.enabled:
+            return
+        import pyarrow as pa
+        from pyarrow import feather
+
+        table = pa.Table.from_pandas(df.reset_index(drop=True))
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            MESSAGES_KEY: json.dumps(list(messages), ensure_ascii=False).encode('utf-8'),
+        })
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            feather.write_feather(table, tmp_name, compression='uncompressed')
+            os.replace(tmp_name, self._path(key))
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        self.evict()
+
+    def load(self, file, loader, messages=None):
+        """
+        Возвращает очищенную таблицу для файла: из кэша, а при промахе —
+        через loader(data, messages), результат которого сохраняется вместе
+        с предупреждениями (кроме None). Предупреждения добавляются в messages
+        и при попадании в кэш, и при разборе.
+        """
+        data = read_bytes(file)
+        key = content_key(data)
+        found = []
+        df = self.get(key, found)
+        if df is None:
+            found = []
+            df = loader(data, found)
+            if df is not None:
+                self.put(key, df, found)
+        if messages is not None:
+            messages.extend(found)
+        return df
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob(f'*{self.suffix}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока размер не станет допустимым"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def clear(self):
+        """Удаляет все записи кэша"""
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """Статистика кэша для отображения в интерфейсе"""
+        entries = self._entries()
+        requests = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / requests if requests else 0.0,
+        }
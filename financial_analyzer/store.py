@@ -0,0 +1,285 @@
+"""
+Хранилище разобранной отчетности портфеля на диске.
+
+Каталог хранилища:
+- store.json — фиксированный словарь показателей и годы (оси массива);
+  годы расширяются, когда записывается отчетность за более ранние или
+  поздние годы;
+- companies.txt — идентификаторы компаний по одному в строке, номер строки —
+  номер компании в массиве;
+- values.f64 — массив float64 (компании, показатели, годы) без заголовка.
+
+Массив открывается через np.memmap: компания, срез компаний или весь
+портфель передаются в StatementCube и PortfolioCube как представления без
+копирования, а расчеты по портфелю идут порциями компаний, поэтому
+хранилище не загружается в память целиком. Записывать в хранилище может
+один процесс; читать — сколько угодно.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.cube import INDICATOR_COLUMN, VALUE_COLUMN, YEAR_COLUMN, StatementCube
+from financial_analyzer.portfolio import COMPANY_COLUMN, PortfolioCube, peer_percentiles
+
+STORE_FORMAT = 'statement-store-v1'
+META_FILE = 'store.json'
+INDEX_FILE = 'companies.txt'
+VALUES_FILE = 'values.f64'
+# Число компаний в одной порции расчетов по хранилищу
+CHUNK_COMPANIES = 4096
+
+
+def _report(messages, text):
+    """Добавляет сообщение в список, если он передан"""
+    if messages is not None:
+        messages.append(text)
+
+
+def _write_meta(directory, indicators, years):
+    """Записывает store.json с осями массива"""
+    meta = {'format': STORE_FORMAT, 'indicators': list(indicators), 'years': list(years)}
+    (Path(directory) / META_FILE).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def default_indicators():
+    """Словарь по умолчанию: показатели коэффициентов, проверок аномалий и горизонтального анализа"""
+    from financial_analyzer.analysis import HORIZONTAL_INDICATORS
+    from financial_analyzer.anomalies import key_indicators
+    from financial_analyzer.ratios import referenced_indicators
+    from financial_analyzer.rules import active_rules
+
+    names = referenced_indicators() + key_indicators(active_rules()) + HORIZONTAL_INDICATORS
+    return list(dict.fromkeys(names))
+
+
+class StatementStore:
+    """
+    Хранилище отчетности компаний с общими осями показателей и лет.
+    mode='r' открывает массив только для чтения, 'r+' — для записи.
+    """
+
+    def __init__(self, directory, mode='r'):
+        if mode not in ('r', 'r+'):
+            raise ValueError(f"Режим хранилища должен быть 'r' или 'r+', получен {mode!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        meta_path = self.directory / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(f"Хранилище не найдено: {self.directory}")
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        if meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"Неподдерживаемый формат хранилища: {meta.get('format')}")
+
+        self.indicators = list(meta['indicators'])
+        self.years = [int(year) for year in meta['years']]
+        self.indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+
+        index_path = self.directory / INDEX_FILE
+        self.companies = index_path.read_text(encoding='utf-8').splitlines() if index_path.exists() else []
+        self.company_index = {name: c for c, name in enumerate(self.companies)}
+        self._map(len(self.companies))
+
+    @classmethod
+    def create(cls, directory, years, indicators=None):
+        """
+        Создает пустое хранилище с годами years (от первого до последнего
+        без пропусков) и словарем показателей indicators
+        (по умолчанию default_indicators()). Возвращает его открытым для записи.
+        """
+        directory = Path(directory)
+        if (directory / META_FILE).exists():
+            raise ValueError(f"Хранилище уже существует: {directory}")
+        years = [int(year) for year in years]
+        if not years:
+            raise ValueError("Не заданы годы хранилища")
+        indicators = default_indicators() if indicators is None else list(dict.fromkeys(indicators))
+
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_meta(directory, indicators, range(min(years), max(years) + 1))
+        (directory / INDEX_FILE).write_text('', encoding='utf-8')
+        (directory / VALUES_FILE).write_bytes(b'')
+        return cls(directory, mode='r+')
+
+    @property
+    def _company_bytes(self):
+        return len(self.indicators) * len(self.years) * np.dtype(np.float64).itemsize
+
+    def _release(self):
+        """Сбрасывает на диск и закрывает отображение массива перед изменением размера файла"""
+        values = getattr(self, 'values', None)
+        if isinstance(values, np.memmap):
+            values.flush()
+        self.values = None
+        del values
+
+    def _map(self, count):
+        """Отображает в память массив на count компаний"""
+        shape = (count, len(self.indicators), len(self.years))
+        path = self.directory / VALUES_FILE
+        if count == 0 or self._company_bytes == 0:
+            self.values = np.empty(shape)
+            return
+        if path.stat().st_size < count * self._company_bytes:
+            raise ValueError(f"Файл {path} короче, чем нужно для {count} компаний из индекса")
+        self.values = np.memmap(path, dtype=np.float64, mode=self.mode, shape=shape)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return len(self.companies)
+
+    def __contains__(self, company):
+        return company in self.company_index
+
+    def _grow(self, names):
+        """Добавляет компании: новые строки массива заполняются NaN, затем дописывается индекс"""
+        if not names:
+            return
+        for name in names:
+            if not name or '\n' in name or '\r' in name:
+                raise ValueError(f"Некорректный идентификатор компании: {name!r}")
+        count = len(self.companies) + len(names)
+        # Старое отображение закрывается до изменения размера файла (на Windows иначе ошибка)
+        self._release()
+        # Индекс дописывается последним: при сбое лишние байты массива не видны
+        with open(self.directory / VALUES_FILE, 'r+b') as f:
+            f.truncate(count * self._company_bytes)
+        self._map(count)
+        self.values[len(self.companies):] = np.nan
+        self.values.flush()
+        with open(self.directory / INDEX_FILE, 'a', encoding='utf-8') as f:
+            f.write(''.join(f'{name}\n' for name in names))
+        for name in names:
+            self.company_index[name] = len(self.companies)
+            self.companies.append(name)
+
+    def _extend_years(self, years, messages=None):
+        """
+        Расширяет ось лет, чтобы она включала years. Годы — последняя ось
+        массива, поэтому он переписывается порциями компаний во временный
+        файл, который заменяет прежний.
+        """
+        first, last = min(self.years[0], *years), max(self.years[-1], *years)
+        extended = list(range(first, last + 1))
+        if extended == self.years:
+            return
+        added = [year for year in extended if year not in self.year_index]
+        offset = self.years[0] - first
+        count = len(self.companies)
+        path = self.directory / VALUES_FILE
+        temporary = path.with_name(VALUES_FILE + '.tmp')
+        if count and self.indicators:
+            target = np.memmap(temporary, dtype=np.float64, mode='w+',
+                               shape=(count, len(self.indicators), len(extended)))
+            for start in range(0, count, CHUNK_COMPANIES):
+                target[start:start + CHUNK_COMPANIES] = np.nan
+                target[start:start + CHUNK_COMPANIES, :, offset:offset + len(self.years)] = \
+                    self.values[start:start + CHUNK_COMPANIES]
+            target.flush()
+            del target
+        else:
+            temporary.write_bytes(b'')
+
+        # store.json записывается первым: при сбое до замены массив окажется короче
+        # нужного и хранилище не откроется, а не будет прочитано со сдвигом лет
+        _write_meta(self.directory, self.indicators, extended)
+        self._release()
+        os.replace(temporary, path)
+        self.years = extended
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+        self._map(count)
+        _report(messages, f"Добавлены годы хранилища: {', '.join(str(year) for year in added)}")
+
+    def write_frame(self, df, company_column=COMPANY_COLUMN, messages=None):
+        """
+        Записывает длинную таблицу со столбцом компании. Отчетность каждой
+        компании из таблицы заменяет прежнюю; показатели вне словаря и годы
+        за пределами хранилища расширяют его ось лет. При повторах
+        тройки (компания, показатель, год) используется первое вхождение.
+        """
+        if self.mode != 'r+':
+            raise ValueError("Хранилище открыто только для чтения")
+        company_codes, companies = pd.factorize(df[company_column].astype(str), sort=False)
+        companies = list(companies)
+        self._grow([name for name in companies if name not in self.company_index])
+
+        indicator_rows = pd.Index(self.indicators).get_indexer(df[INDICATOR_COLUMN])
+        years = pd.to_numeric(df[YEAR_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+        whole = np.unique(years[years == np.round(years)])
+        if len(whole):
+            self._extend_years([int(year) for year in whole], messages)
+        year_columns = np.where(np.isnan(years), -1, years - self.years[0]).astype(np.int64)
+        year_columns[(year_columns >= len(self.years)) | (years != np.round(years))] = -1
+        values = pd.to_numeric(df[VALUE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+
+        unknown = pd.unique(df[INDICATOR_COLUMN][(indicator_rows < 0) & df[INDICATOR_COLUMN].notna().to_numpy()])
+        if len(unknown):
+            _report(messages, f"Показатели вне словаря хранилища пропущены: {len(unknown)}")
+        outside = np.unique(years[(year_columns < 0) & ~np.isnan(years)])
+        if len(outside):
+            _report(messages, f"Нецелые годы пропущены: {', '.join(f'{y:g}' for y in outside)}")
+
+        rows = np.array([self.company_index[name] for name in companies], dtype=np.int64)
+        self.values[rows] = np.nan
+
+        valid = (company_codes >= 0) & (indicator_rows >= 0) & (year_columns >= 0)
+        company_codes = company_codes[valid]
+        indicator_rows, year_columns, values = indicator_rows[valid], year_columns[valid], values[valid]
+        flat_index = (company_codes * len(self.indicators) + indicator_rows) * len(self.years) + year_columns
+        _, first = np.unique(flat_index, return_index=True)
+        self.values[rows[company_codes[first]], indicator_rows[first], year_columns[first]] = values[first]
+        self.values.flush()
+        return companies
+
+    def write(self, frames, messages=None):
+        """Записывает словарь {компания: длинная таблица}"""
+        stacked = pd.concat(
+            [df.assign(**{COMPANY_COLUMN: name}) for name, df in frames.items()], ignore_index=True
+        )
+        return self.write_frame(stacked, messages=messages)
+
+    def company(self, name):
+        """StatementCube одной компании (значения — представление памяти хранилища)"""
+        return StatementCube(self.values[self.company_index[name]], self.indicators, self.years)
+
+    def portfolio(self, start=0, stop=None):
+        """PortfolioCube для компаний с номерами [start, stop) без копирования значений"""
+        return PortfolioCube(self.values[start:stop], self.companies[start:stop], self.indicators, self.years)
+
+    def chunks(self, size=CHUNK_COMPANIES):
+        """Портфели по size компаний подряд для расчетов порциями"""
+        for start in range(0, len(self.companies), size):
+            yield self.portfolio(start, start + size)
+
+    def _collect(self, compute, size):
+        """Склеивает результаты расчета по порциям компаний"""
+        parts = [compute(portfolio) for portfolio in self.chunks(size)]
+        return pd.concat(parts) if parts else compute(self.portfolio())
+
+    def ratios(self, year, registry=None, size=CHUNK_COMPANIES):
+        """Таблица компании × коэффициенты за год по всему хранилищу"""
+        return self._collect(lambda portfolio: portfolio.ratios(year, registry), size)
+
+    def rankings(self, year, registry=None):
+        """Место компании среди всех компаний хранилища по каждому коэффициенту (1 — лучшее)"""
+        return self.ratios(year, registry).rank(ascending=False, method='min').astype('Int64')
+
+    def percentiles(self, year, registry=None):
+        """Перцентиль компании среди всех компаний хранилища по каждому коэффициенту (0 — худшее, 100 — лучшее)"""
+        return peer_percentiles(self.ratios(year, registry))
+
+    def anomaly_counts(self, rules=None, detectors=None, size=CHUNK_COMPANIES):
+        """Число аномалий каждого вида по компаниям хранилища"""
+        return self._collect(lambda portfolio: portfolio.anomaly_counts(rules, detectors), size)
+
+    def __repr__(self):
+        return (f"StatementStore(companies={len(self.companies)}, indicators={len(self.indicators)}, "
+                f"years={self.years[:1] + self.years[-1:]})")
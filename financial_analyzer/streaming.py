@@ -0,0 +1,151 @@
+"""
+Потоковое чтение больших плоских выгрузок Показатель/Код/Ед.изм./Год/Значение.
+
+Лист читается движком из readers (calamine или openpyxl read-only) порциями строк, числа
+очищаются по порциям, а порции сразу складываются в матрицу куба. Пиковый
+расход памяти определяется размером порции и числом различных пар
+(показатель, год), а не числом строк файла.
+"""
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.cube import INDICATOR_COLUMN, VALUE_COLUMN, YEAR_COLUMN, StatementCube
+from financial_analyzer.normalize import clean_values
+from financial_analyzer.readers import iter_rows
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def iter_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE, sheet=None, engine=None):
+    """
+    Читает первый (или указанный) лист книги порциями по chunk_size строк.
+    Первая строка листа — заголовок. Порции возвращаются как DataFrame с
+    очищенными столбцами Год и Значение. Строки читает движок из readers.
+    """
+    rows = iter_rows(file, engine, sheet if sheet is not None else 0)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(name).strip() if name != '' else f'Unnamed: {i}' for i, name in enumerate(header)]
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield _typed_chunk(chunk, columns)
+            chunk = []
+    if chunk:
+        yield _typed_chunk(chunk, columns)
+
+
+def _typed_chunk(rows, columns):
+    """Порция строк листа с приведенными типами"""
+    df = pd.DataFrame(rows).iloc[:, :len(columns)]
+    df = df.where(df != '', None)
+    df.columns = columns[:df.shape[1]]
+    df = df.reindex(columns=columns)
+    if VALUE_COLUMN in df.columns:
+        df[VALUE_COLUMN] = clean_values(df[VALUE_COLUMN])
+    if YEAR_COLUMN in df.columns:
+        df[YEAR_COLUMN] = pd.to_numeric(df[YEAR_COLUMN], errors='coerce')
+    return df
+
+
+class StatementCubeBuilder:
+    """
+    Собирает StatementCube из порций длинной таблицы.
+
+    aggregate='first' повторяет StatementCube.from_frame: для повторяющейся
+    пары (показатель, год) берется первое значение. aggregate='sum'
+    суммирует повторы — например, показатели дочерних обществ в сводной
+    выгрузке группы.
+    """
+
+    def __init__(self, aggregate='first'):
+        if aggregate not in ('first', 'sum'):
+            raise ValueError(f"Неизвестный способ агрегации: {aggregate}")
+        self.aggregate = aggregate
+        self.indicator_index = {}
+        self.year_index = {}
+        self.rows_read = 0
+        self.missing_values = 0
+        self._values = np.full((0, 0), np.nan)
+        self._filled = np.zeros((0, 0), dtype=bool)
+
+    def _codes(self, labels, index):
+        """Глобальные коды для меток порции; новые метки добавляются в словарь"""
+        codes, uniques = pd.factorize(labels, sort=False)
+        if not len(uniques):
+            return np.full(len(codes), -1, dtype=np.int64)
+        mapping = np.array([index.setdefault(label, len(index)) for label in uniques], dtype=np.int64)
+        return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+
+    def _reserve(self):
+        """Увеличивает матрицу под новые показатели и годы (с запасом)"""
+        need = (len(self.indicator_index), len(self.year_index))
+        have = self._values.shape
+        if need[0] <= have[0] and need[1] <= have[1]:
+            return
+        shape = tuple(max(n, 2 * h) if n > h else h for n, h in zip(need, have))
+        values = np.full(shape, np.nan)
+        filled = np.zeros(shape, dtype=bool)
+        values[:have[0], :have[1]] = self._values
+        filled[:have[0], :have[1]] = self._filled
+        self._values, self._filled = values, filled
+
+    def add(self, chunk):
+        """Добавляет порцию с колонками Показатель, Год и Значение"""
+        self.rows_read += len(chunk)
+        indicator_codes = self._codes(chunk[INDICATOR_COLUMN], self.indicator_index)
+        year_codes = self._codes(pd.to_numeric(chunk[YEAR_COLUMN], errors='coerce'), self.year_index)
+        values = pd.to_numeric(chunk[VALUE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+        self._reserve()
+
+        valid = (indicator_codes >= 0) & (year_codes >= 0)
+        indicator_codes, year_codes, values = indicator_codes[valid], year_codes[valid], values[valid]
+        self.missing_values += int(np.isnan(values).sum())
+
+        if self.aggregate == 'sum':
+            # Пустые значения не меняют сумму, но ячейка считается заполненной
+            new = ~self._filled[indicator_codes, year_codes]
+            self._values[indicator_codes[new], year_codes[new]] = 0.0
+            np.add.at(self._values, (indicator_codes, year_codes), np.nan_to_num(values))
+        else:
+            # Первое вхождение пары внутри порции, если ячейка еще не заполнена
+            flat_index = indicator_codes * self._values.shape[1] + year_codes
+            _, first = np.unique(flat_index, return_index=True)
+            first = first[~self._filled[indicator_codes[first], year_codes[first]]]
+            self._values[indicator_codes[first], year_codes[first]] = values[first]
+        self._filled[indicator_codes, year_codes] = True
+        return self
+
+    def build(self, fill_value=None):
+        """
+        Куб по накопленным данным с годами по возрастанию.
+        fill_value заменяет пустые значения (например, 0, как preprocess_data).
+        """
+        indicators = list(self.indicator_index)
+        years = [int(year) for year in self.year_index]
+        values = self._values[:len(indicators), :len(years)]
+        if fill_value is not None:
+            values = np.where(self._filled[:len(indicators), :len(years)] & np.isnan(values), fill_value, values)
+        order = np.argsort(years, kind='stable')
+        return StatementCube(values[:, order], indicators, [years[j] for j in order])
+
+
+def stream_cube(file, chunk_size=DEFAULT_CHUNK_SIZE, aggregate='first', messages=None):
+    """
+    Строит куб из файла без загрузки всего листа в память. Пустые значения
+    заменяются нулями, как при обычной предобработке.
+    """
+    builder = StatementCubeBuilder(aggregate)
+    for chunk in iter_chunks(file, chunk_size):
+        missing = [col for col in (INDICATOR_COLUMN, YEAR_COLUMN, VALUE_COLUMN) if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"В файле нет столбцов: {', '.join(missing)}")
+        builder.add(chunk)
+
+    if builder.missing_values and messages is not None:
+        messages.append("В данных обнаружены пустые значения. Они будут заменены на 0.")
+    return builder.build(fill_value=0.0)
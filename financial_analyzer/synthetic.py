@@ -0,0 +1,124 @@
+"""
+Генератор синтетической отчетности для нагрузочных тестов.
+
+Показатели берутся из словаря реальных строк бухгалтерского баланса и
+отчета о финансовых результатах. Если нужно больше показателей, к ним
+добавляются строки расшифровок. Значения растут год к году со случайным
+шумом и редкими скачками, поэтому в данных встречаются аномалии.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+UNIT = 'тыс. руб.'
+LAST_YEAR = 2024
+
+# Строки отчетности: код, показатель и типичное значение, тыс. руб.
+VOCABULARY = [
+    ('2110', 'Выручка', 120_000),
+    ('2120', 'Себестоимость продаж', 90_000),
+    ('2100', 'Валовая прибыль (убыток)', 30_000),
+    ('2200', 'Прибыль (убыток) от продаж', 12_000),
+    ('2300', 'Прибыль (убыток) до налогообложения', 10_000),
+    ('2400', 'Чистая прибыль (убыток)', 8_000),
+    ('1110', 'Нематериальные активы', 2_000),
+    ('1150', 'Основные средства', 60_000),
+    ('1190', 'Прочие внеоборотные активы', 3_000),
+    ('1100', 'Итого по разделу I - Внеоборотные активы', 65_000),
+    ('1210', 'Запасы', 15_000),
+    ('1230', 'Дебиторская задолженность', 12_000),
+    ('1250', 'Денежные средства и денежные эквиваленты', 5_000),
+    ('1260', 'Прочие оборотные активы', 1_000),
+    ('1200', 'Итого по разделу II - Оборотные активы', 33_000),
+    ('1600', 'БАЛАНС (актив)', 98_000),
+    ('1310', 'Уставный капитал (складочный капитал, уставный фонд, вклады товарищей)', 10_000),
+    ('1370', 'Нераспределенная прибыль (непокрытый убыток)', 40_000),
+    ('1300', 'Итого по разделу III - Капитал и резервы', 50_000),
+    ('1410', 'Заемные средства', 20_000),
+    ('1420', 'Отложенные налоговые обязательства', 1_000),
+    ('1400', 'Итого по разделу IV - Долгосрочные обязательства', 21_000),
+    ('1520', 'Кредиторская задолженность', 15_000),
+    ('1500', 'Итого по разделу V - Краткосрочные обязательства', 27_000),
+    ('1700', 'БАЛАНС (пассив)', 98_000),
+]
+
+
+def indicator_vocabulary(count=None):
+    """Коды, названия и типичные значения для count показателей"""
+    count = len(VOCABULARY) if count is None else count
+    vocabulary = VOCABULARY[:count]
+    for k in range(count - len(vocabulary)):
+        code, name, value = VOCABULARY[k % len(VOCABULARY)]
+        vocabulary.append((f'{code}.{k // len(VOCABULARY) + 1}', f'{name}: расшифровка {k + 1}', value / 10))
+    return vocabulary
+
+
+def generate_statement(years=5, indicators=None, seed=0, last_year=LAST_YEAR):
+    """Длинная таблица Показатель/Код/Ед.изм./Год/Значение одной компании"""
+    rng = np.random.default_rng(seed)
+    vocabulary = indicator_vocabulary(indicators)
+    codes = [code for code, _, _ in vocabulary]
+    names = [name for _, name, _ in vocabulary]
+    base = np.array([value for _, _, value in vocabulary], dtype=np.float64)
+
+    # Масштаб и рост компании, отклонение роста показателя, шум и редкие скачки
+    scale = rng.lognormal(0.0, 1.0)
+    trend = rng.normal(0.05, 0.03) + rng.normal(0.0, 0.005, size=(len(names), 1))
+    steps = np.arange(years)
+    noise = rng.normal(1.0, 0.05, size=(len(names), years))
+    shocks = np.where(rng.random((len(names), years)) < 0.02, rng.uniform(3, 5, (len(names), years)), 1.0)
+    values = np.round(base[:, None] * scale * (1 + trend) ** steps * noise * shocks)
+
+    # Иногда компания получает убыток
+    if 'Чистая прибыль (убыток)' in names:
+        row = names.index('Чистая прибыль (убыток)')
+        values[row] *= np.where(rng.random(years) < 0.1, -1, 1)
+
+    return pd.DataFrame({
+        'Показатель': np.repeat(names, years),
+        'Код': np.repeat(codes, years),
+        'Ед.изм.': UNIT,
+        'Год': np.tile(np.arange(last_year - years + 1, last_year + 1), len(names)),
+        'Значение': values.ravel(),
+    })
+
+
+def generate_wide_export(years=5, indicators=None, seed=0, last_year=LAST_YEAR):
+    """
+    Сырая широкая выгрузка, как с list-org: шапка, заголовок с годами и
+    значения строками с пробелами между разрядами; часть значений — 'н/д'
+    """
+    df = generate_statement(years, indicators, seed, last_year)
+    wide = df.pivot_table(index=['Показатель', 'Код', 'Ед.изм.'], columns='Год', values='Значение', sort=False)
+    rng = np.random.default_rng(seed)
+    text = pd.Series(wide.to_numpy().ravel()).map(lambda value: f'{value:,.0f}'.replace(',', ' '))
+    text = text.to_numpy(dtype=object).reshape(wide.shape)
+    text[rng.random(text.shape) < 0.01] = 'н/д'
+
+    width = 3 + years
+    preamble = [['Бухгалтерская отчетность', *[None] * (width - 1)], [None] * width]
+    header = [['Показатель', 'Код', 'Ед. изм.', *wide.columns.tolist()]]
+    rows = [[*labels, *values] for labels, values in zip(wide.index, text.tolist())]
+    return pd.DataFrame(preamble + header + rows)
+
+
+def generate_portfolio(companies, years=5, indicators=None, seed=0):
+    """Словарь {название компании: длинная таблица} для нескольких компаний"""
+    return {
+        f'company_{k:04d}': generate_statement(years, indicators, seed=seed + k)
+        for k in range(companies)
+    }
+
+
+def write_statements(directory, companies, years=5, indicators=None, seed=0):
+    """Записывает отчетности компаний в Excel-файлы и возвращает пути"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for company, df in generate_portfolio(companies, years, indicators, seed).items():
+        path = directory / f'{company}.xlsx'
+        df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
@@ -0,0 +1,731 @@
+"""
+Интерфейс Streamlit финансового анализатора.
+
+Модуль только описывает страницу: расчеты выполняет ядро
+(financial_analyzer.core и модули пакета), а main() рисует страницу при
+каждом запуске скрипта. Импорт модуля ничего не выводит; запускается
+интерфейс через оболочку app.py (streamlit run app.py).
+"""
+
+import functools
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from financial_analyzer import charts, report
+from financial_analyzer.analysis import as_cube, frame_memory, get_norm_value, load_statement, select_indicators
+from financial_analyzer.pipeline import AnalysisPipeline, source_key
+from financial_analyzer.portfolio import PortfolioCube
+from financial_analyzer.profiling import Profiler
+from financial_analyzer.result_cache import ResultCache
+from financial_analyzer.statement_cache import StatementCache
+
+# Интервал проверки готовности PDF-отчета, с
+PDF_POLL_INTERVAL = 0.5
+
+
+def show_warnings(messages):
+    """Выводит накопленные анализом предупреждения в интерфейсе"""
+    for message in messages:
+        st.warning(message)
+
+@st.cache_resource
+def get_statement_cache():
+    """Общий для всех сессий дисковый кэш разобранных файлов"""
+    return StatementCache()
+
+@st.cache_resource
+def get_result_cache():
+    """Общий для всех сессий и процессов дисковый кэш результатов анализа"""
+    return ResultCache()
+
+def load_cached_statement(file, messages):
+    """Загружает и предобрабатывает файл через дисковый кэш"""
+    return load_statement(file, get_statement_cache(), messages)
+
+def get_profiler():
+    """Профилировщик текущей сессии"""
+    profiler = st.session_state.get('profiler')
+    if profiler is None:
+        profiler = Profiler()
+        st.session_state['profiler'] = profiler
+    return profiler
+
+def profiled(func):
+    """Замеряет вызовы функции профилировщиком текущей сессии"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return get_profiler().measure(func.__name__)(func)(*args, **kwargs)
+    return wrapper
+
+def get_pipeline():
+    """Конвейер анализа текущей сессии: хранит результаты этапов между перезапусками скрипта"""
+    pipeline = st.session_state.get('pipeline')
+    if pipeline is None:
+        pipeline = AnalysisPipeline(profiler=get_profiler(), result_cache=get_result_cache())
+        st.session_state['pipeline'] = pipeline
+    return pipeline
+
+def company_name(file_name, taken):
+    """Название компании по имени файла; повторы получают номер"""
+    name = file_name.rsplit('.', 1)[0]
+    candidate, k = name, 2
+    while candidate in taken:
+        candidate, k = f"{name} ({k})", k + 1
+    return candidate
+
+def get_portfolio(files):
+    """
+    Портфель компаний из загруженных файлов. Собирается заново только при
+    изменении набора файлов; каждый файл разбирается через дисковый кэш.
+    """
+    key = tuple((file.name, file.size) for file in files)
+    cached = st.session_state.get('portfolio')
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
+    messages = []
+    cubes = {}
+    with get_profiler().stage('portfolio') as record:
+        for file in files:
+            file_messages = []
+            df = load_cached_statement(file, file_messages)
+            messages.extend(f"{file.name}: {message}" for message in file_messages)
+            if df is not None:
+                cubes[company_name(file.name, cubes)] = as_cube(df)
+        portfolio = PortfolioCube.from_cubes(cubes) if cubes else None
+        record.rows = len(cubes)
+    st.session_state['portfolio'] = (key, portfolio, messages)
+    st.session_state['portfolio_results'] = {}
+    return portfolio, messages
+
+def format_bytes(size):
+    """Размер в байтах в удобочитаемом виде"""
+    for unit in ['Б', 'КБ', 'МБ']:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
+
+# Функции визуализации
+@profiled
+def plot_ratio_ranking(ratio_values, ratio_name):
+    """Строит рейтинг компаний по коэффициенту"""
+    ranking = ratio_values[ratio_name].dropna().sort_values()
+    
+    fig = go.Figure(go.Bar(
+        x=ranking.values,
+        y=ranking.index,
+        orientation='h',
+        marker_color='steelblue'
+    ))
+    fig.add_vline(
+        x=get_norm_value(ratio_name),
+        line=dict(color='red', dash='dash'),
+        annotation_text='Норматив'
+    )
+    
+    fig.update_layout(
+        title=f'Рейтинг компаний: {ratio_name}',
+        xaxis_title='Значение',
+        yaxis_title='Компания',
+        height=max(400, 18 * len(ranking))
+    )
+    
+    return fig
+
+@profiled
+def plot_peer_percentiles(percentiles):
+    """Строит тепловую карту перцентилей компаний среди пиров"""
+    fig = px.imshow(
+        percentiles,
+        color_continuous_scale='RdYlGn',
+        zmin=0,
+        zmax=100,
+        aspect='auto',
+        title='Перцентили коэффициентов среди пиров'
+    )
+    
+    fig.update_layout(
+        xaxis_title='Коэффициенты',
+        yaxis_title='Компания',
+        coloraxis_colorbar_title='Перцентиль',
+        height=max(400, 18 * len(percentiles))
+    )
+    
+    return fig
+
+@profiled
+def plot_anomaly_counts(counts, top=30):
+    """Строит число аномалий по компаниям (компании с наибольшим числом)"""
+    top_counts = counts.sort_values('Всего', ascending=False).head(top).drop(columns='Всего')
+    
+    fig = px.bar(
+        top_counts,
+        orientation='h',
+        title='Число аномалий по компаниям',
+        labels={'value': 'Число аномалий', 'variable': 'Вид аномалии'}
+    )
+    
+    fig.update_layout(
+        yaxis=dict(autorange='reversed'),
+        yaxis_title='Компания',
+        height=max(400, 18 * len(top_counts))
+    )
+    
+    return fig
+
+def select_tab(labels, key):
+    """
+    Переключатель разделов вместо st.tabs: st.tabs выполняет код всех
+    вкладок при каждом перезапуске, а здесь рисуется только выбранный раздел
+    """
+    return st.radio("Раздел", labels, horizontal=True, key=key, label_visibility="collapsed")
+
+def portfolio_stage(name, compute, *params):
+    """
+    Результат расчета по портфелю. Считается при первом показе раздела,
+    дальше берется из сессии до смены портфеля или параметров.
+    """
+    results = st.session_state.setdefault('portfolio_results', {})
+    key = (name,) + params
+    if key not in results:
+        with get_profiler().stage(name):
+            results[key] = compute()
+    return results[key]
+
+@st.fragment
+def render_portfolio_ranking(portfolio, year):
+    st.header(f"🏆 Рейтинг компаний за {year} год")
+    ratio_values = portfolio_stage('portfolio_ratios', lambda: portfolio.ratios(year), year)
+    rankings = portfolio_stage('portfolio_rankings', lambda: portfolio.rankings(year), year)
+    percentiles = portfolio_stage('portfolio_percentiles', lambda: portfolio.percentiles(year), year)
+    ratio_name = st.selectbox("Коэффициент", list(ratio_values.columns))
+    st.plotly_chart(
+        portfolio_stage('plot_ratio_ranking', lambda: plot_ratio_ranking(ratio_values, ratio_name), year, ratio_name),
+        use_container_width=True
+    )
+    
+    ranking_table = pd.DataFrame({
+        'Место': rankings[ratio_name],
+        'Значение': ratio_values[ratio_name].round(3),
+        'Перцентиль': percentiles[ratio_name].round(1),
+    }).sort_values('Место')
+    st.dataframe(ranking_table, use_container_width=True)
+
+@st.fragment
+def render_portfolio_percentiles(portfolio, year):
+    st.header(f"📊 Перцентили среди пиров за {year} год")
+    st.markdown("100 — лучшее значение коэффициента среди загруженных компаний, 0 — худшее.")
+    rankings = portfolio_stage('portfolio_rankings', lambda: portfolio.rankings(year), year)
+    percentiles = portfolio_stage('portfolio_percentiles', lambda: portfolio.percentiles(year), year)
+    st.plotly_chart(
+        portfolio_stage('plot_peer_percentiles', lambda: plot_peer_percentiles(percentiles), year),
+        use_container_width=True
+    )
+    st.dataframe(rankings, use_container_width=True)
+
+@st.fragment
+def render_portfolio_anomalies(portfolio, year):
+    st.header("🔍 Аномалии по компаниям")
+    anomaly_counts = portfolio_stage('portfolio_anomalies', portfolio.anomaly_counts)
+    st.plotly_chart(
+        portfolio_stage('plot_anomaly_counts', lambda: plot_anomaly_counts(anomaly_counts)),
+        use_container_width=True
+    )
+    st.dataframe(anomaly_counts.sort_values('Всего', ascending=False), use_container_width=True)
+    
+    csv = anomaly_counts.to_csv().encode('utf-8')
+    st.download_button(
+        label="💾 Скачать число аномалий в CSV",
+        data=csv,
+        file_name=f'portfolio_anomalies_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+        mime='text/csv'
+    )
+
+@st.fragment
+def render_overview(pipeline, year):
+    st.header("📈 Обзор финансовых показателей")
+    df = pipeline.frame
+    
+    # График динамики ключевых показателей
+    fig_trend = pipeline.figure('plot_key_indicators_trend', lambda: charts.key_indicators_trend(pipeline.cube))
+    st.plotly_chart(fig_trend, use_container_width=True)
+    
+    # Сводная таблица по последнему году
+    st.subheader("Основные показатели за последний год")
+    last_year = df['Год'].max()
+    last_year_df = df[df['Год'] == last_year]
+    key_indicators = [
+        'Выручка',
+        'Себестоимость продаж',
+        'Валовая прибыль (убыток)',
+        'Чистая прибыль (убыток)',
+        'БАЛАНС (актив)',
+        'Итого по разделу III - Капитал и резервы'
+    ]
+    
+    summary_df = select_indicators(last_year_df, key_indicators)
+    if not summary_df.empty:
+        st.dataframe(
+            summary_df[['Показатель', 'Значение']].style.format({
+                'Значение': '{:,.0f}'.format
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.warning("Нет данных для отображения основных показателей за последний год.")
+
+@st.fragment
+def render_horizontal(pipeline, year):
+    st.header("📊 Горизонтальный анализ (динамика)")
+    st.markdown("""
+    Горизонтальный анализ позволяет оценить изменение финансовых показателей во времени.
+    В таблице представлены как абсолютные, так и относительные изменения ключевых показателей.
+    """)
+    
+    # Показываем таблицу с горизонтальным анализом
+    horizontal_df = pipeline.horizontal
+    st.dataframe(
+        horizontal_df.style.format({
+            **{year: '{:,.0f}'.format for year in horizontal_df.columns if isinstance(year, int)},
+            **{col: '{:+,.0f}'.format for col in horizontal_df.columns if isinstance(col, str) and 'Δ ' in col},
+            **{col: '{:+,.1f}%'.format for col in horizontal_df.columns if isinstance(col, str) and 'Δ%' in col}
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+@st.fragment
+def render_vertical(pipeline, year):
+    st.header(f"📉 Вертикальный анализ (структура за {year} год)")
+    st.markdown("""
+    Вертикальный анализ показывает структуру финансовых показателей в процентах от итоговых значений.
+    Это позволяет оценить долю каждого элемента в общей структуре активов или обязательств.
+    """)
+    vertical_asset_df, vertical_liability_df = pipeline.vertical(year)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Структура активов")
+        if not vertical_asset_df.empty:
+            st.dataframe(
+                vertical_asset_df[['Показатель', 'Значение', 'Доля, %']].style.format({
+                    'Значение': '{:,.0f}'.format,
+                    'Доля, %': '{:.1f}%'.format
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            fig_asset = pipeline.figure(
+                'plot_asset_structure', lambda: charts.asset_structure(vertical_asset_df), year
+            )
+            st.plotly_chart(fig_asset, use_container_width=True)
+        else:
+            st.warning("Нет данных для анализа структуры активов за выбранный год.")
+    
+    with col2:
+        st.subheader("Структура обязательств и капитала")
+        if not vertical_liability_df.empty:
+            st.dataframe(
+                vertical_liability_df[['Показатель', 'Значение', 'Доля, %']].style.format({
+                    'Значение': '{:,.0f}'.format,
+                    'Доля, %': '{:.1f}%'.format
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.warning("Нет данных для анализа структуры обязательств за выбранный год.")
+
+@st.fragment
+def render_anomalies(pipeline, year):
+    st.header("🔍 Обнаруженные аномалии")
+    st.markdown("""
+    Аномалии — это отклонения в финансовых данных, которые требуют особого внимания.
+    Они могут быть статистическими (резкие изменения показателей) или связаны с нарушением бизнес-логики.
+    """)
+    anomalies = pipeline.anomalies
+    
+    if anomalies:
+        st.warning(f"Обнаружено **{len(anomalies)}** аномалий в финансовых данных")
+        
+        for idx, anomaly in enumerate(anomalies):
+            with st.expander(f"{'🔴' if anomaly['severity'] == 'high' else '🟠'} {anomaly['indicator']} ({anomaly['year']}) - {anomaly['type']}"):
+                st.markdown(f"**Тип аномалии:** {anomaly['type']}")
+                st.markdown(f"**Значение:** {anomaly['value']:,.0f} тыс. руб.")
+                if 'z_score' in anomaly:
+                    st.markdown(f"**Z-score:** {anomaly['z_score']:.2f}")
+                st.markdown(f"**Описание:** {anomaly['description']}")
+        
+        # Визуализация аномалий
+        fig_anomaly = pipeline.figure(
+            'plot_anomaly_visualization', lambda: charts.anomaly_visualization(pipeline.cube, anomalies)
+        )
+        if fig_anomaly:
+            st.plotly_chart(fig_anomaly, use_container_width=True)
+    else:
+        st.success("✅ Аномалий, требующих внимания, не обнаружено")
+
+@st.fragment
+def render_ratios(pipeline, year):
+    st.header("💡 Финансовые коэффициенты")
+    st.markdown("""
+    Финансовые коэффициенты позволяют оценить различные аспекты финансового состояния компании:
+    - **Ликвидность** — способность погашать краткосрочные обязательства
+    - **Рентабельность** — эффективность использования ресурсов
+    - **Финансовая устойчивость** — зависимость от заемных средств
+    """)
+    ratios = pipeline.ratios
+    show_warnings(pipeline.messages('ratios'))
+    
+    if ratios:
+        # Выводим таблицу с коэффициентами
+        ratios_df = pd.DataFrame([
+            {
+                'Коэффициент': name,
+                'Значение': data['value'],
+                'Норматив': data['norm'],
+                'Оценка': data['interpretation']
+            } for name, data in ratios.items()
+        ])
+        
+        st.dataframe(
+            ratios_df.style.format({
+                'Значение': '{:.3f}',
+                'Норматив': '{:.3f}'
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        # Визуализация коэффициентов
+        fig_ratios = pipeline.figure('plot_financial_ratios', lambda: charts.financial_ratios(ratios))
+        st.plotly_chart(fig_ratios, use_container_width=True)
+        
+        # Динамика коэффициентов по всем годам
+        st.subheader("Динамика коэффициентов по годам")
+        st.dataframe(
+            pipeline.ratio_table.style.format('{:.3f}', na_rep='Н/Д'),
+            use_container_width=True
+        )
+        
+        # Анализ коэффициентов
+        st.subheader("Интерпретация ключевых коэффициентов")
+        
+        # Ликвидность
+        st.markdown("#### 💧 Ликвидность")
+        liquidity_ratios = ['Текущая ликвидность', 'Быстрая ликвидность', 'Абсолютная ликвидность']
+        for ratio in liquidity_ratios:
+            if ratio in ratios:
+                r = ratios[ratio]
+                st.markdown(f"**{ratio}:** {r['value']:.3f} (норматив: {r['norm']:.3f}) — {r['interpretation']}")
+        
+        # Рентабельность
+        st.markdown("#### 📈 Рентабельность")
+        profitability_ratios = ['ROA', 'ROE', 'Маржа чистой прибыли']
+        for ratio in profitability_ratios:
+            if ratio in ratios:
+                r = ratios[ratio]
+                st.markdown(f"**{ratio}:** {r['value']:.3f} (норматив: {r['norm']:.3f}) — {r['interpretation']}")
+        
+        # Финансовая устойчивость
+        st.markdown("#### ⚖️ Финансовая устойчивость")
+        stability_ratios = ['Коэффициент автономии']
+        for ratio in stability_ratios:
+            if ratio in ratios:
+                r = ratios[ratio]
+                st.markdown(f"**{ratio}:** {r['value']:.3f} (норматив: {r['norm']:.3f}) — {r['interpretation']}")
+    else:
+        st.warning("Не удалось рассчитать финансовые коэффициенты из-за недостатка данных.")
+
+# Разделы основного экрана: рисуется и считается только выбранный
+PORTFOLIO_TABS = {
+    "🏆 Рейтинг коэффициентов": render_portfolio_ranking,
+    "📊 Перцентили среди пиров": render_portfolio_percentiles,
+    "🔍 Аномалии": render_portfolio_anomalies,
+}
+COMPANY_TABS = {
+    "📈 Обзор": render_overview,
+    "📊 Горизонтальный анализ": render_horizontal,
+    "📉 Вертикальный анализ": render_vertical,
+    "🔍 Аномалии": render_anomalies,
+    "💡 Коэффициенты": render_ratios,
+}
+
+
+def main():
+    """Рисует страницу; вызывается при каждом запуске скрипта Streamlit"""
+    # Настройка страницы
+    st.set_page_config(
+        page_title="Финансовый анализатор ООО 'Агрисовгаз'",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Заголовок приложения
+    st.title("📊 Финансовый анализатор ООО 'Агрисовгаз'")
+    st.markdown("""
+        Это приложение выполняет комплексный анализ финансовой отчетности в формате Excel.
+        Загрузите файл финансовой отчетности, и приложение автоматически:
+        - Проведет горизонтальный и вертикальный анализ
+        - Рассчитает ключевые финансовые коэффициенты
+        - Выявит возможные аномалии в данных
+        - Предоставит наглядную визуализацию результатов
+    """)
+
+    # Боковая панель
+    with st.sidebar:
+        st.header("📁 Загрузка данных")
+        portfolio_mode = st.radio(
+            "Режим анализа",
+            ["Одна компания", "Портфель компаний"],
+            horizontal=True
+        ) == "Портфель компаний"
+    
+        uploaded_file = None
+        portfolio_files = []
+        if portfolio_mode:
+            portfolio_files = st.file_uploader(
+                "Выберите Excel-файлы компаний",
+                type=["xlsx", "xls"],
+                accept_multiple_files=True,
+                key="portfolio_files"
+            ) or []
+        else:
+            uploaded_file = st.file_uploader(
+                "Выберите Excel-файл с финансовой отчетностью", 
+                type=["xlsx", "xls"],
+                accept_multiple_files=False
+            )
+    
+        st.markdown("---")
+        st.header("⚙️ Настройки анализа")
+    
+        # Год для вертикального анализа
+        selected_year = None
+        pipeline = get_pipeline()
+        portfolio = None
+        if portfolio_files:
+            # Портфель пересобирается только при изменении набора файлов
+            with st.spinner('Загрузка и обработка файлов компаний...'):
+                portfolio, portfolio_messages = get_portfolio(portfolio_files)
+            if portfolio is not None:
+                selected_year = st.selectbox("Выберите год для сравнения компаний", portfolio.years, index=len(portfolio.years)-1)
+        elif uploaded_file is not None:
+            # Файл разбирается один раз на загрузку, дальше используются результаты конвейера
+            with st.spinner('Загрузка и обработка данных...'):
+                pipeline.load(uploaded_file, load_cached_statement)
+            if pipeline.loaded:
+                # Данные за следующий год досчитываются к уже готовым результатам.
+                # Ключ зависит от основного файла: при его смене загрузчик очищается
+                next_year_file = st.file_uploader(
+                    "Добавить отчетность за следующий год",
+                    type=["xlsx", "xls"],
+                    key=f"next_year_file_{source_key(uploaded_file)}"
+                )
+                # Убранный или замененный файл снимается с данных
+                try:
+                    show_warnings(pipeline.append_files(
+                        [next_year_file] if next_year_file is not None else [], load_cached_statement
+                    ))
+                except ValueError as e:
+                    st.error(str(e))
+                available_years = pipeline.cube.years
+                # Отчет, построенный по прежним данным, больше не предлагается к скачиванию
+                if st.session_state.get('pdf_data_version') != pipeline.version('frame'):
+                    st.session_state.pop('pdf_job', None)
+                selected_year = st.selectbox("Выберите год для вертикального анализа", available_years, index=len(available_years)-1)
+    
+        # Статистика дискового кэша файлов
+        with st.expander("📦 Кэш файлов"):
+            cache_stats = get_statement_cache().stats()
+            if not cache_stats['enabled']:
+                st.caption("Кэш отключен: не установлен pyarrow")
+            else:
+                st.caption(
+                    f"Записей: {cache_stats['entries']}, "
+                    f"размер: {format_bytes(cache_stats['size_bytes'])} из {format_bytes(cache_stats['max_bytes'])}"
+                )
+                st.caption(
+                    f"Попадания: {cache_stats['hits']}, промахи: {cache_stats['misses']} "
+                    f"({cache_stats['hit_rate']:.0%}), вытеснено: {cache_stats['evictions']}"
+                )
+            result_stats = get_result_cache().stats()
+            st.caption(
+                f"Результаты анализа: {result_stats['entries']} записей, "
+                f"{format_bytes(result_stats['size_bytes'])}; попадания: {result_stats['hits']}, "
+                f"промахи: {result_stats['misses']} ({result_stats['hit_rate']:.0%})"
+            )
+            if st.button("Очистить кэш"):
+                get_statement_cache().clear()
+                get_result_cache().clear()
+    
+        show_performance = st.checkbox("⏱ Панель производительности", value=False)
+    
+        st.markdown("---")
+        st.header("💡 О приложении")
+        st.markdown("""
+        **Версия:** 1.0  
+        **Источник данных:** [list-org.com](https://www.list-org.com)  
+        **Разработчик:** Финансовый аналитик
+        """)
+
+    # Основной контент
+    pdf_pending = False
+    if portfolio_mode:
+        if not portfolio_files:
+            st.info("👈 Загрузите Excel-файлы нескольких компаний в боковой панели, чтобы сравнить их между собой.")
+        else:
+            show_warnings(portfolio_messages)
+            if portfolio is None:
+                st.error("Ни один файл не удалось загрузить.")
+            else:
+                st.header("🏢 Портфель компаний")
+                st.caption(
+                    f"Компаний: {len(portfolio)}, показателей: {len(portfolio.indicators)}, "
+                    f"период: {portfolio.years[0]}–{portfolio.years[-1]}"
+                )
+            
+                # Все компании считаются одной операцией над массивом компания × показатель × год,
+                # но только для выбранного раздела
+                tab = select_tab(list(PORTFOLIO_TABS), key='portfolio_tab')
+                PORTFOLIO_TABS[tab](portfolio, selected_year)
+
+    elif uploaded_file is None:
+        st.info("👈 Пожалуйста, загрузите Excel-файл финансовой отчетности в боковой панели для начала анализа.")
+    
+        # Показываем пример данных
+        st.subheader("Пример формата данных:")
+        sample_data = {
+            'Показатель': ['Выручка', 'Себестоимость продаж', 'Чистая прибыль (убыток)'],
+            'Код': ['Ф2.2110', 'Ф2.2120', 'Ф2.2400'],
+            'Ед.изм.': ['тыс. руб.', 'тыс. руб.', 'тыс. руб.'],
+            'Год': [2022, 2022, 2022],
+            'Значение': [10883500, 9589230, 116913]
+        }
+        sample_df = pd.DataFrame(sample_data)
+        st.dataframe(sample_df, hide_index=True)
+
+    else:
+        # Данные уже загружены конвейером в боковой панели
+        if not pipeline.loaded:
+            for message in pipeline.messages('frame'):
+                st.error(message)
+        else:
+            show_warnings(pipeline.messages('frame'))
+            df = pipeline.frame
+        
+            st.success("✅ Данные успешно загружены и обработаны!")
+            st.caption(
+                f"Загружено записей: {len(df)} за период с {df['Год'].min()} по {df['Год'].max()} год "
+                f"(в памяти {format_bytes(frame_memory(df))})"
+            )
+        
+            # Этапы анализа считаются при первом показе раздела, которому они нужны,
+            # и дальше берутся из кэша конвейера
+            tab = select_tab(list(COMPANY_TABS), key='company_tab')
+            with st.spinner('Выполнение финансового анализа...'):
+                COMPANY_TABS[tab](pipeline, selected_year)
+        
+            # Экспорт результатов
+            st.markdown("---")
+            st.header("📤 Экспорт результатов")
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                # Кнопка для скачивания обработанных данных
+                csv = df.to_csv(index=False).encode('utf-8')
+                st.download_button(
+                    label="💾 Скачать данные в CSV",
+                    data=csv,
+                    file_name=f'financial_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+                    mime='text/csv'
+                )
+        
+            with col2:
+                # PDF-отчет строится в фоновом потоке: кнопка сразу возвращает управление,
+                # а ссылка на скачивание появляется, когда отчет готов
+                if st.button("📄 Сгенерировать PDF-отчет"):
+                    st.session_state['pdf_job'] = report.submit_report(
+                        df, pipeline.ratios, pipeline.horizontal,
+                        *pipeline.vertical(selected_year),
+                        pipeline.anomalies,
+                        build=get_profiler().measure('generate_pdf_report')(report.build_report)
+                    )
+                    st.session_state['pdf_time'] = datetime.now()
+                    st.session_state['pdf_data_version'] = pipeline.version('frame')
+                pdf_job = st.session_state.get('pdf_job')
+                if pdf_job is not None:
+                    if not pdf_job.done():
+                        st.info("⏳ Генерация PDF-отчета...")
+                        pdf_pending = True
+                    elif pdf_job.exception() is not None:
+                        st.error(f"Не удалось сформировать PDF-отчет: {pdf_job.exception()}")
+                    else:
+                        st.download_button(
+                            label="📥 Скачать PDF-отчет",
+                            data=pdf_job.result().getvalue(),
+                            file_name=f'financial_report_{st.session_state["pdf_time"].strftime("%Y%m%d_%H%M%S")}.pdf',
+                            mime='application/pdf'
+                        )
+
+    # Панель производительности выводится в конце, когда этапы текущего запуска уже замерены
+    if show_performance:
+        with st.sidebar:
+            st.markdown("---")
+            st.header("⏱ Производительность")
+            profiler = get_profiler()
+            profiler.set_trace_memory(st.checkbox(
+                "Замерять память (tracemalloc)", value=profiler.trace_memory,
+                help="Память замеряется для этапов, пересчитанных после включения"
+            ))
+            summary = profiler.summary()
+            if not summary:
+                st.caption("Замеров пока нет")
+            else:
+                st.dataframe(
+                    pd.DataFrame([{
+                        'Этап': item['stage'],
+                        'Вызовы': item['calls'],
+                        'Время, мс': item['wall_s_last'] * 1000,
+                        'CPU, мс': item['cpu_s_last'] * 1000,
+                        'Пик памяти': format_bytes(item['peak_bytes_max']) if item['peak_bytes_max'] is not None else '—',
+                        'Строки': item['rows_last'],
+                    } for item in summary]).style.format({'Время, мс': '{:.1f}', 'CPU, мс': '{:.1f}'}),
+                    hide_index=True,
+                    use_container_width=True
+                )
+                st.download_button(
+                    "📥 Замеры (JSON)", data=profiler.to_json(),
+                    file_name='performance.json', mime='application/json'
+                )
+                st.download_button(
+                    "📥 Метрики (OpenMetrics)", data=profiler.to_openmetrics(),
+                    file_name='performance.prom', mime='application/openmetrics-text'
+                )
+                if st.button("Сбросить замеры"):
+                    profiler.clear()
+
+    # Footer
+    st.markdown("---")
+    st.markdown("""
+    <div style="text-align: center; color: #666;">
+        <p>© 2023 Финансовый анализатор ООО 'Агрисовгаз' | Данные с сайта <a href="https://www.list-org.com" target="_blank">list-org.com</a></p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Пока PDF-отчет строится, страница перезапускается и проверяет готовность;
+    # этапы анализа и графики при этом берутся из кэша конвейера
+    if pdf_pending:
+        time.sleep(PDF_POLL_INTERVAL)
+        st.rerun()
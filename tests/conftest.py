@@ -37,4 +37,21 @@ def mock_excel_file():
     buffer = BytesIO()
     wb.save(buffer)
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
+
+@pytest.fixture
+def long_financial_data():
+    """Создает тестовые данные в длинном формате Показатель/Год/Значение"""
+    indicators = {
+        'Выручка': [5000000, 6000000, 7000000],
+        'Чистая прибыль (убыток)': [1000000, 1500000, -200000],
+        'БАЛАНС (актив)': [8000000, 9000000, 10000000],
+        'Итого по разделу II - Оборотные активы': [3000000, 3500000, 2000000],
+        'Итого по разделу V - Краткосрочные обязательства': [1500000, 1700000, 2500000],
+        'Дебиторская задолженность': [1000000, 1100000, 2000000],
+    }
+    rows = []
+    for name, values in indicators.items():
+        for year, value in zip([2020, 2021, 2022], values):
+            rows.append({'Показатель': name, 'Код': '', 'Ед.изм.': 'тыс. руб.', 'Год': year, 'Значение': value})
+    return pd.DataFrame(rows)
@@ -19,4 +19,82 @@ def test_get_recommendations():
     """Тестирует получение рекомендаций"""
     recommendations = get_recommendations('Чистая прибыль', 500000, 1000000)
     assert isinstance(recommendations, list)
-    assert len(recommendations) > 0
\ No newline at end of file
+    assert len(recommendations) > 0
+
+def test_detect_anomalies_business_rules(long_financial_data):
+    """Тестирует бизнес-правила на данных с убытком и падением ликвидности"""
+    anomalies = detect_anomalies(long_financial_data)
+    found = [(a['indicator'], a['year']) for a in anomalies]
+    assert found == [
+        ('Чистая прибыль', 2022),
+        ('Дебиторская задолженность', 2022),
+        ('Текущая ликвидность', 2022),
+    ]
+    assert anomalies[2]['value'] == 0.8
+
+
+def test_detect_anomalies_z_score():
+    """Тестирует статистическую проверку на выбросе в длинном ряду"""
+    years = list(range(2005, 2025))
+    values = [1000.0 + i for i in range(len(years))]
+    values[10] = 1000000.0
+    df = pd.DataFrame({'Показатель': 'Выручка', 'Год': years, 'Значение': values})
+    anomalies = detect_anomalies(df)
+    assert len(anomalies) == 1
+    assert anomalies[0]['type'] == 'Статистическая'
+    assert anomalies[0]['year'] == 2015
+    assert anomalies[0]['severity'] == 'high'
+
+
+def test_anomaly_masks_over_companies(long_financial_data):
+    """Маски правил считаются для нескольких компаний одним вызовом"""
+    from financial_analyzer.cube import StatementCube
+    from financial_analyzer.anomalies import anomaly_masks
+    cube = StatementCube.from_frame(long_financial_data)
+    masks = anomaly_masks(np.stack([cube.values, cube.values]), cube.indicator_index)
+    assert masks['low_current_ratio'].shape == (2, 3)
+    assert masks['low_current_ratio'][:, 2].all()
+
+
+def test_robust_detectors():
+    """Два выброса скрывают друг друга от Z-score, но не от MAD и темпа роста"""
+    from financial_analyzer.analysis import detect_anomalies as detect
+    years = list(range(2010, 2025))
+    values = [1000.0 + 10 * i for i in range(len(years))]
+    values[6] = values[11] = 3000.0
+    df = pd.DataFrame({'Показатель': 'Выручка', 'Год': years, 'Значение': values})
+
+    assert detect(df, ['z_score']) == []
+    assert [a['year'] for a in detect(df, ['mad'])] == [2016, 2021]
+    assert [a['year'] for a in detect(df, ['rolling'])] == [2016]
+    growth = detect(df, ['log_growth'])
+    assert [a['year'] for a in growth] == [2016, 2017, 2021, 2022]
+    assert growth[0]['type'] == 'Темп роста' and '+185.7%' in growth[0]['description']
+
+    # Порог задается по показателю
+    assert detect(df, {'mad': {'Выручка': 100}}) == []
+    assert len(detect(df, {'mad': {'Чистая прибыль (убыток)': 100}})) == 2
+
+
+def test_detectors_from_environment(monkeypatch):
+    """PROJECT_ALPHA_DETECTORS выбирает детекторы, которыми считаются маски"""
+    from financial_analyzer.anomalies import DETECTORS_VARIABLE, anomaly_masks, parse_detectors, resolve_detectors
+    from financial_analyzer.cube import StatementCube
+
+    assert parse_detectors("rolling, mad=3") == {'rolling': None, 'mad': 3.0}
+    with pytest.raises(ValueError, match='Неизвестный детектор'):
+        resolve_detectors(['unknown'])
+
+    monkeypatch.setenv(DETECTORS_VARIABLE, "z_score,mad=5")
+    resolved = resolve_detectors()
+    assert list(resolved) == ['z_score', 'mad']
+    assert (resolved['mad'] == 5).all()
+
+    values = [1000.0 + 10 * i for i in range(12)]
+    values[6] = 3000.0
+    cube = StatementCube(np.array([values]), ['Выручка'], range(2010, 2022))
+    masks = anomaly_masks(cube.values, cube.indicator_index)
+    assert set(masks['detectors']) == {'z_score', 'mad'}
+    _, mad_mask = masks['detectors']['mad']
+    assert mad_mask[0].nonzero()[0].tolist() == [6]
+    assert masks['statistical'][0, 6]
@@ -14,4 +14,22 @@ except ImportError as e:
 
 def test_app_loaded():
     """Простой тест: проверяет, что модуль app загружен."""
-    assert app is not None
\ No newline at end of file
+    assert app is not None
+
+def test_core_import_is_lazy():
+    """Ядро и оболочка импортируются без Streamlit, plotly и fpdf; тяжелые модули грузятся по обращению"""
+    import subprocess
+    code = (
+        "import sys, app\n"
+        "from financial_analyzer import core\n"
+        "heavy = ['streamlit', 'plotly', 'fpdf', 'pandas']\n"
+        "print(*[name in sys.modules for name in heavy])\n"
+        "app.detect_anomalies\n"
+        "print(*[name in sys.modules for name in heavy])\n"
+        "core.charts\n"
+        "print('plotly' in sys.modules, 'streamlit' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=project_root, capture_output=True, text=True, check=True
+    ).stdout.split('\n')
+    assert output[:3] == ['False False False False', 'False False False True', 'True False']
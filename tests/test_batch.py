@@ -0,0 +1,65 @@
+import pandas as pd
+from financial_analyzer.batch import analyze_frame, run_batch
+from financial_analyzer.cli import main
+
+
+def test_analyze_frame_collects_warnings(long_financial_data):
+    """Предупреждения попадают в результат, а не в интерфейс"""
+    long_financial_data.loc[0, 'Значение'] = None
+    result = analyze_frame(long_financial_data, 'test')
+    assert result.ok
+    assert any('пустые значения' in message for message in result.warnings)
+    assert any('Не хватает данных' in message for message in result.warnings)
+    assert result.anomalies
+    assert list(result.ratio_table.index) == [2020, 2021, 2022]
+
+
+def test_run_batch_writes_tables(tmp_path, long_financial_data):
+    """Пакетный режим записывает сводные таблицы по всем файлам"""
+    source = tmp_path / 'statements'
+    source.mkdir()
+    long_financial_data.to_excel(source / 'company_a.xlsx', index=False)
+    long_financial_data.to_excel(source / 'company_b.xlsx', index=False)
+    pd.DataFrame({'Другое': [1]}).to_excel(source / 'broken.xlsx', index=False)
+
+    results, paths = run_batch(source, tmp_path / 'out')
+    assert [result.company for result in results] == ['broken', 'company_a', 'company_b']
+    assert not results[0].ok
+
+    ratios = pd.read_csv(paths['ratios'])
+    anomalies = pd.read_csv(paths['anomalies'])
+    issues = pd.read_csv(paths['issues'])
+    assert len(ratios) == 6
+    assert set(anomalies['company']) == {'company_a', 'company_b'}
+    assert 'error' in set(issues['level'])
+
+
+def test_cli_batch(tmp_path, long_financial_data, capsys):
+    """Команда batch возвращает код 0 и печатает сводку"""
+    long_financial_data.to_excel(tmp_path / 'company.xlsx', index=False)
+    assert main(['batch', str(tmp_path), '-o', str(tmp_path / 'out')]) == 0
+    assert 'Обработано файлов: 1' in capsys.readouterr().out
+
+
+def test_cli_batch_without_files_writes_nothing(tmp_path, capsys):
+    """Без файлов отчетности команды возвращают 1 и не создают каталог результатов"""
+    assert main(['batch', str(tmp_path)]) == 1
+    assert main(['report', str(tmp_path)]) == 1
+    assert 'не найдено файлов Excel' in capsys.readouterr().err
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_batch_keeps_same_named_files_apart(tmp_path, long_financial_data):
+    """Одноименные файлы из разных подкаталогов остаются разными компаниями"""
+    source = tmp_path / 'statements'
+    for folder, k in (('a', 1), ('b', 2)):
+        (source / folder).mkdir(parents=True)
+        long_financial_data.assign(Значение=long_financial_data['Значение'] * k).to_excel(
+            source / folder / 'report.xlsx', index=False
+        )
+
+    for workers in (1, 2):
+        results, paths = run_batch(source, tmp_path / f'out_{workers}', workers=workers)
+        assert [result.company for result in results] == ['a/report', 'b/report']
+        ratios = pd.read_csv(paths['ratios'])
+        assert ratios.groupby('company').size().to_dict() == {'a/report': 3, 'b/report': 3}
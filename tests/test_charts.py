@@ -0,0 +1,37 @@
+import numpy as np
+from financial_analyzer import charts
+from financial_analyzer.analysis import as_cube, detect_anomalies, preprocess_data
+from financial_analyzer.synthetic import generate_statement
+
+
+def test_downsample_keeps_extremes():
+    """Прореженный ряд не длиннее лимита и сохраняет края, минимум и максимум"""
+    x = np.arange(10_000)
+    y = np.sin(x / 300) + np.random.default_rng(0).normal(0, 0.1, len(x))
+    y[1234] = np.nan
+    small_x, small_y = charts.downsample(x, y, 200)
+    assert len(small_x) <= 200
+    assert small_x[0] == 0 and small_x[-1] == len(x) - 1
+    assert np.nanmax(y) in small_y and np.nanmin(y) in small_y
+    assert np.all(np.diff(small_x) > 0)
+
+    short_x, short_y = charts.downsample([2020, 2021, 2022], [1.0, np.nan, 3.0], 200)
+    assert short_x.tolist() == [2020, 2022]
+
+
+def test_figures_stay_small():
+    """Длинные ряды прореживаются, аномалии — один след на важность"""
+    cube = as_cube(preprocess_data(generate_statement(years=3000, indicators=10, seed=2)))
+    trend = charts.key_indicators_trend(cube, max_points=400)
+    assert sum(len(trace.x) for trace in trend.data) <= 400
+
+    anomalies = [
+        {'indicator': 'Выручка', 'year': year, 'value': 1.0, 'severity': severity, 'description': 'тест'}
+        for year in cube.years[:300] for severity in ('high', 'medium')
+    ]
+    figure = charts.anomaly_visualization(cube, anomalies, max_points=400)
+    markers = [trace for trace in figure.data if trace.mode == 'markers']
+    assert [len(trace.x) for trace in markers] == [300, 300]
+    assert len(figure.data) == 3
+    assert charts.anomaly_visualization(cube, []) is None
+    assert charts.anomaly_visualization(cube, detect_anomalies(cube)) is not None
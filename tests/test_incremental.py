@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+from financial_analyzer.analysis import detect_anomalies, perform_horizontal_analysis
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.incremental import AnomalyState, extend_horizontal
+from financial_analyzer.pipeline import AnalysisPipeline
+
+
+def _split(df, year):
+    return df[df['Год'] < year], df[df['Год'] >= year]
+
+
+def test_extend_horizontal_matches_full(long_financial_data):
+    """Досчет нового года дает ту же таблицу, что и полный пересчет"""
+    old, new = _split(long_financial_data, 2022)
+    cube = StatementCube.from_frame(old).extend(StatementCube.from_frame(new))
+    extended = extend_horizontal(perform_horizontal_analysis(old), cube)
+    pd.testing.assert_frame_equal(extended, perform_horizontal_analysis(long_financial_data))
+
+
+def test_anomaly_state_matches_full(long_financial_data):
+    """Аномалии после добавления года совпадают с полным пересчетом"""
+    old, new = _split(long_financial_data, 2021)
+    cube = StatementCube.from_frame(old).extend(StatementCube.from_frame(new))
+    state = AnomalyState(StatementCube.from_frame(old)).append(cube)
+    assert state.anomalies == detect_anomalies(long_financial_data)
+
+
+def test_anomaly_state_matches_full_year_by_year():
+    """Z-score после добавления лет по одному совпадает с полным пересчетом точно"""
+    from financial_analyzer.synthetic import generate_statement
+
+    df = generate_statement(years=15, seed=5)
+    full = StatementCube.from_frame(df)
+    state = AnomalyState(StatementCube.from_frame(df[df['Год'] < full.years[4]]))
+    for year in full.years[4:]:
+        part = df[df['Год'] <= year]
+        state.append(StatementCube.from_frame(part))
+        assert state.anomalies == detect_anomalies(part)
+
+
+def test_anomaly_state_matches_full_with_all_detectors(monkeypatch):
+    """Досчет с детекторами из PROJECT_ALPHA_DETECTORS совпадает с полным пересчетом"""
+    from financial_analyzer.anomalies import DETECTORS_VARIABLE
+    from financial_analyzer.synthetic import generate_statement
+
+    monkeypatch.setenv(DETECTORS_VARIABLE, "z_score,rolling,mad,log_growth")
+    df = generate_statement(years=15, seed=5)
+    anomalies = detect_anomalies(df)
+    assert {'Статистическая', 'Скользящая статистическая', 'Робастная статистическая', 'Темп роста'} <= {
+        a['type'] for a in anomalies
+    }
+    old, _ = _split(df, 2020)
+    state = AnomalyState(StatementCube.from_frame(old)).append(StatementCube.from_frame(df))
+    assert state.anomalies == anomalies
+
+
+def test_cube_extend_rejects_past_years(long_financial_data):
+    """Дописывать можно только годы после последнего"""
+    _, new = _split(long_financial_data, 2022)
+    with pytest.raises(ValueError):
+        StatementCube.from_frame(long_financial_data).extend(StatementCube.from_frame(new))
+
+
+def test_pipeline_append_does_not_recompute(long_financial_data):
+    """Конвейер досчитывает новый год без полного пересчета этапов"""
+    old, new = _split(long_financial_data, 2022)
+    pipeline = AnalysisPipeline()
+    pipeline.load('a.xlsx', lambda source, messages: old.copy(), key='a')
+    pipeline.horizontal, pipeline.anomalies
+    pipeline.append_file('b.xlsx', lambda source, messages: new.copy(), key='b')
+    pipeline.append_file('b.xlsx', lambda source, messages: new.copy(), key='b')
+
+    assert pipeline.cube.years == [2020, 2021, 2022]
+    assert pipeline.runs['horizontal'] == pipeline.runs['anomaly_state'] == 1
+    pd.testing.assert_frame_equal(pipeline.horizontal, perform_horizontal_analysis(long_financial_data))
+    assert pipeline.anomalies == detect_anomalies(long_financial_data)
+
+
+def test_pipeline_rolls_back_removed_file(long_financial_data):
+    """Убранный или замененный файл за новый год снимается с данных"""
+    old, new = _split(long_financial_data, 2022)
+    pipeline = AnalysisPipeline()
+    pipeline.load('a.xlsx', lambda source, messages: old.copy(), key='a')
+    pipeline.horizontal, pipeline.anomalies
+    pipeline.append_files(['b.xlsx'], lambda source, messages: new.copy(), keys=['b'])
+    assert pipeline.cube.years == [2020, 2021, 2022]
+
+    pipeline.append_files([], keys=[])
+    assert pipeline.cube.years == [2020, 2021]
+    pd.testing.assert_frame_equal(pipeline.frame, old)
+    pd.testing.assert_frame_equal(pipeline.horizontal, perform_horizontal_analysis(old))
+    assert pipeline.anomalies == detect_anomalies(old)
+
+    # Тот же файл можно дописать снова, а замена дописывается вместо прежнего
+    pipeline.append_files(['b.xlsx'], lambda source, messages: new.copy(), keys=['b'])
+    assert pipeline.cube.years == [2020, 2021, 2022]
+    replaced = new.assign(Значение=new['Значение'] * 2)
+    pipeline.append_files(['c.xlsx'], lambda source, messages: replaced.copy(), keys=['c'])
+    assert pipeline.cube.years == [2020, 2021, 2022]
+    assert pipeline.anomalies == detect_anomalies(pd.concat([old, replaced]))
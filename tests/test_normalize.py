@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from financial_analyzer.analysis import load_data
+from financial_analyzer.normalize import clean_values, find_header_row, find_table_start, normalize_wide, parse_years
+from financial_analyzer.synthetic import generate_statement, generate_wide_export
+
+
+def wide_export():
+    """Сырая выгрузка: шапка, заголовок с годами, подзаголовок раздела и строки отчетности"""
+    return pd.DataFrame([
+        ['ООО «Ромашка»', None, None, None, None, None],
+        ['ИНН 7700000000, отчетность за 2020–2022', None, None, None, None, None],
+        [None, None, None, None, None, None],
+        ['Показатель', 'Код', 'Ед. изм.', '2,020', 2021, '2022 г.'],
+        ['АКТИВ', None, None, None, None, None],
+        ['Нематериальные активы', 'Ф1.1110', 'тыс. руб.', '1,146', '-', 'н/д'],
+        ['БАЛАНС (актив)', 'Ф1.1600', 'тыс. руб.', '395544', 400000, '410 000'],
+        ['Выручка ', 'Ф2.2110', 'тыс. руб.', 5000, 6000, '7000'],
+        [None, None, None, None, None, None],
+    ])
+
+
+def test_normalize_wide():
+    """Широкая выгрузка приводится к длинной таблице, значения очищаются"""
+    df = normalize_wide(wide_export())
+    assert list(df.columns) == ['Показатель', 'Код', 'Ед.изм.', 'Год', 'Значение']
+    assert df['Показатель'].unique().tolist() == ['Нематериальные активы', 'БАЛАНС (актив)', 'Выручка']
+    assert df['Год'].tolist()[:3] == [2020, 2021, 2022]
+    np.testing.assert_array_equal(
+        df['Значение'].to_numpy(),
+        [1.146, np.nan, np.nan, 395544, 400000, 410000, 5000, 6000, 7000]
+    )
+
+
+def test_header_and_start_detection():
+    """Заголовок — первая строка с годами, начало отчетности — по ключевым словам"""
+    raw = wide_export()
+    assert find_header_row(raw) == 3
+    assert find_table_start(raw) == 5
+    assert find_table_start(raw.iloc[:3]) == 26
+    assert np.isnan(clean_values(['abc', None])).all()
+
+
+def test_parse_years_matches_whole_cell():
+    """Годом считается вся ячейка заголовка, а не число внутри суммы или даты"""
+    years = parse_years(['2,020', 2021, 2022.0, ' 2023 г. ', '12,019', '01.03.2021', 'за 2021', '2021-2022'])
+    assert years.tolist()[:4] == [2020, 2021, 2022, 2023]
+    assert years.iloc[4:].isna().all()
+
+    raw = wide_export()
+    raw.iloc[1, 3:] = ['12,019', '01.03.2021', 'отчет 2021']
+    assert find_header_row(raw) == 3
+
+
+def test_load_data_reads_wide_export(tmp_path):
+    """load_data распознает широкую выгрузку"""
+    path = tmp_path / 'export.xlsx'
+    wide_export().to_excel(path, index=False, header=False)
+    df = load_data(path)
+    assert len(df) == 9
+    assert df.loc[df['Показатель'] == 'Выручка', 'Значение'].tolist() == [5000, 6000, 7000]
+
+
+def test_normalize_synthetic_export():
+    """Синтетическая выгрузка восстанавливается в исходную длинную таблицу"""
+    df = normalize_wide(generate_wide_export(years=6, indicators=40, seed=3))
+    expected = generate_statement(years=6, indicators=40, seed=3)
+    known = df['Значение'].notna().to_numpy()
+    assert known.mean() > 0.95
+    assert df['Показатель'].tolist() == expected['Показатель'].tolist()
+    np.testing.assert_array_equal(df['Значение'].to_numpy()[known], expected['Значение'].to_numpy()[known])
@@ -0,0 +1,42 @@
+import pandas as pd
+from financial_analyzer.batch import analyze_file
+from financial_analyzer.parallel import compact, default_chunksize, run_parallel
+
+
+def _write_statements(directory, df, count):
+    paths = []
+    for i in range(count):
+        path = directory / f'company_{i}.xlsx'
+        scaled = df.copy()
+        scaled['Значение'] = scaled['Значение'] * (i + 1)
+        scaled.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def test_compact_result_has_no_frames(tmp_path, long_financial_data):
+    """Компактный результат содержит массивы вместо таблиц и восстанавливает их"""
+    path = _write_statements(tmp_path, long_financial_data, 1)[0]
+    full = analyze_file(path)
+    result = compact(full)
+    assert not any(isinstance(value, pd.DataFrame) for value in vars(result).values())
+    pd.testing.assert_frame_equal(result.ratio_table, full.ratio_table)
+    pd.testing.assert_frame_equal(result.horizontal_deltas, full.horizontal_deltas, check_dtype=False)
+
+
+def test_run_parallel_keeps_input_order(tmp_path, long_financial_data):
+    """Результаты пула процессов совпадают с последовательными и идут в порядке входа"""
+    paths = _write_statements(tmp_path, long_financial_data, 4)
+    paths.reverse()
+    parallel = run_parallel(paths, workers=2, chunksize=1)
+    serial = run_parallel(paths, workers=1)
+    assert [r.company for r in parallel] == ['company_3', 'company_2', 'company_1', 'company_0']
+    for a, b in zip(parallel, serial):
+        pd.testing.assert_frame_equal(a.ratio_table, b.ratio_table)
+        assert a.anomalies == b.anomalies
+
+
+def test_default_chunksize():
+    """Размер пакета не меньше единицы"""
+    assert default_chunksize(3, 8) == 1
+    assert default_chunksize(1000, 4) == 62
@@ -0,0 +1,130 @@
+from financial_analyzer.analysis import detect_anomalies
+from financial_analyzer.pipeline import AnalysisPipeline
+
+
+def _loader(df, calls):
+    def load(source, messages):
+        calls.append(source)
+        messages.append('загружено')
+        return df.copy()
+    return load
+
+
+def test_pipeline_parses_once_per_file(long_financial_data):
+    """Файл разбирается один раз, пока не изменится ключ источника"""
+    calls = []
+    pipeline = AnalysisPipeline()
+    loader = _loader(long_financial_data, calls)
+    pipeline.load('a.xlsx', loader, key='a')
+    pipeline.load('a.xlsx', loader, key='a')
+    assert len(calls) == 1
+    assert pipeline.messages('frame') == ['загружено']
+
+    pipeline.load('b.xlsx', loader, key='b')
+    assert len(calls) == 2
+
+
+def test_pipeline_recomputes_only_changed_stage(long_financial_data):
+    """Смена года пересчитывает только вертикальный анализ"""
+    pipeline = AnalysisPipeline()
+    pipeline.load('a.xlsx', _loader(long_financial_data, []), key='a')
+    for year in [2022, 2022, 2021]:
+        pipeline.ratios, pipeline.horizontal, pipeline.anomalies
+        pipeline.vertical(year)
+    assert pipeline.runs['vertical'] == 2
+    assert pipeline.runs['ratios'] == pipeline.runs['horizontal'] == pipeline.runs['anomalies'] == 1
+    assert pipeline.runs['cube'] == 1
+    assert 'Код' in pipeline.vertical(2021)[0].columns
+
+
+def test_pipeline_invalidates_on_new_file(long_financial_data):
+    """Новый файл сбрасывает все зависимые этапы"""
+    pipeline = AnalysisPipeline()
+    pipeline.load('a.xlsx', _loader(long_financial_data, []), key='a')
+    first = pipeline.anomalies
+    changed = long_financial_data[long_financial_data['Показатель'] != 'Дебиторская задолженность']
+    pipeline.load('b.xlsx', _loader(changed, []), key='b')
+    assert len(pipeline.anomalies) == len(first) - 1
+    assert pipeline.runs['anomalies'] == 2
+
+
+def test_pipeline_memoizes_figures(long_financial_data):
+    """График строится заново только при смене куба или параметров"""
+    pipeline = AnalysisPipeline()
+    pipeline.load('a.xlsx', _loader(long_financial_data, []), key='a')
+    builds = []
+    for year in [2022, 2022, 2021]:
+        figure = pipeline.figure('plot', lambda: builds.append(year) or len(builds), year)
+    assert builds == [2022, 2021]
+    assert figure == 2
+
+    pipeline.load('b.xlsx', _loader(long_financial_data, []), key='b')
+    pipeline.figure('plot', lambda: builds.append(2021), 2021)
+    assert len(builds) == 3
+
+
+def test_pipeline_shares_results_between_sessions(tmp_path, long_financial_data):
+    """Вторая сессия с тем же файлом берет результаты этапов из дискового кэша"""
+    from financial_analyzer.result_cache import ResultCache
+
+    cache = ResultCache(tmp_path)
+    first = AnalysisPipeline(result_cache=cache)
+    first.load(b'statement', _loader(long_financial_data, []))
+    first.ratios, first.horizontal, first.anomalies, first.vertical(2021)
+
+    second = AnalysisPipeline(result_cache=ResultCache(tmp_path))
+    second.load(b'statement', _loader(long_financial_data, []), key='session')
+    assert second.anomalies == first.anomalies
+    assert second.ratios['Текущая ликвидность'] == first.ratios['Текущая ликвидность']
+    assert second.messages('ratios') == first.messages('ratios')
+    second.horizontal, second.vertical(2021)
+    assert sum(second.runs[name] for name in ('ratios', 'horizontal', 'anomalies', 'vertical')) == 0
+
+    second.vertical(2020)
+    other = AnalysisPipeline(result_cache=cache)
+    other.load(b'other statement', _loader(long_financial_data, []))
+    other.ratios
+    assert second.runs['vertical'] == other.runs['ratios'] == 1
+
+
+def test_pipeline_misses_cache_after_registry_change(tmp_path, monkeypatch, long_financial_data):
+    """Изменение реестра коэффициентов или детекторов меняет ключ: старые результаты не используются"""
+    from financial_analyzer import anomalies, ratios
+    from financial_analyzer.result_cache import ResultCache, result_key
+
+    cache = ResultCache(tmp_path)
+    first = AnalysisPipeline(result_cache=cache)
+    first.load(b'statement', _loader(long_financial_data, []))
+    assert first.ratios['Текущая ликвидность']['norm'] == 2.0
+    key = result_key('abc', 'ratios')
+
+    registry = {**ratios.RATIO_REGISTRY}
+    registry['Текущая ликвидность'] = {**registry['Текущая ликвидность'], 'norm': 1.5}
+    monkeypatch.setattr(ratios, 'RATIO_REGISTRY', registry)
+    assert result_key('abc', 'ratios') != key
+    second = AnalysisPipeline(result_cache=cache)
+    second.load(b'statement', _loader(long_financial_data, []))
+    assert second.ratios['Текущая ликвидность']['norm'] == 1.5
+    assert second.runs['ratios'] == 1
+    monkeypatch.undo()
+
+    detectors = {**anomalies.DETECTOR_REGISTRY, 'z_score': {**anomalies.DETECTOR_REGISTRY['z_score'], 'threshold': 2}}
+    monkeypatch.setattr(anomalies, 'DETECTOR_REGISTRY', detectors)
+    assert result_key('abc', 'ratios') != key
+
+
+def test_pipeline_recomputes_anomalies_after_settings_change(monkeypatch, long_financial_data):
+    """Смена детекторов во время сессии пересчитывает аномалии в памяти конвейера"""
+    from financial_analyzer.anomalies import DETECTORS_VARIABLE
+
+    pipeline = AnalysisPipeline()
+    pipeline.load(b'statement', _loader(long_financial_data, []))
+    before = pipeline.anomalies
+    assert before == detect_anomalies(long_financial_data)
+
+    monkeypatch.setenv(DETECTORS_VARIABLE, 'z_score=1')
+    after = pipeline.anomalies
+    assert after == detect_anomalies(long_financial_data) and len(after) > len(before)
+    assert pipeline.runs['anomaly_state'] == pipeline.runs['anomalies'] == 2
+    pipeline.anomalies
+    assert pipeline.runs['anomalies'] == 2
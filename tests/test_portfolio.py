@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from financial_analyzer.analysis import as_cube, preprocess_data
+from financial_analyzer.anomalies import detect_anomalies
+from financial_analyzer.portfolio import COMPANY_COLUMN, PortfolioCube
+from financial_analyzer.ratios import evaluate_ratios
+from financial_analyzer.synthetic import generate_portfolio
+
+
+def build_cubes():
+    frames = generate_portfolio(12, years=6, seed=5)
+    # Компании с разным набором лет
+    frames['company_0003'] = frames['company_0003'][frames['company_0003']['Год'] > 2020]
+    return frames, {name: as_cube(preprocess_data(df.copy())) for name, df in frames.items()}
+
+
+def test_from_cubes_matches_from_frame():
+    """Портфель из кубов и из длинной таблицы совпадают, компания восстанавливается"""
+    frames, cubes = build_cubes()
+    portfolio = PortfolioCube.from_cubes(cubes)
+    stacked = pd.concat([df.assign(**{COMPANY_COLUMN: name}) for name, df in frames.items()])
+    np.testing.assert_array_equal(portfolio.values, PortfolioCube.from_frame(stacked).values)
+
+    company = portfolio.company('company_0003')
+    assert company.get('Выручка', 2019) != company.get('Выручка', 2019)
+    assert company.get('Выручка', 2024) == cubes['company_0003'].get('Выручка', 2024)
+
+
+def test_ratios_rankings_and_percentiles():
+    """Коэффициенты совпадают с расчетом по компании, места и перцентили согласованы"""
+    _, cubes = build_cubes()
+    portfolio = PortfolioCube.from_cubes(cubes)
+    ratios = portfolio.ratios(2024)
+    expected = evaluate_ratios(cubes['company_0007']).loc[2024]
+    np.testing.assert_allclose(ratios.loc['company_0007'].to_numpy(), expected.to_numpy())
+
+    ranks = portfolio.rankings(2024)['ROA']
+    best = ratios['ROA'].idxmax()
+    assert ranks[best] == 1
+    percentiles = portfolio.percentiles(2024)
+    assert percentiles.loc[best, 'ROA'] == 100
+    assert percentiles.loc[ratios['ROA'].idxmin(), 'ROA'] == 0
+    assert PortfolioCube.from_cubes({'single': cubes['company_0007']}).percentiles(2024).loc['single', 'ROA'] == 100
+
+
+def test_anomaly_counts_match_per_company_detection():
+    """Счетчики аномалий по массиву совпадают с поиском по каждой компании"""
+    frames, cubes = build_cubes()
+    del frames['company_0003'], cubes['company_0003']
+    counts = PortfolioCube.from_cubes(cubes).anomaly_counts()
+    for name, cube in cubes.items():
+        assert counts.loc[name, 'Всего'] == len(detect_anomalies(cube))
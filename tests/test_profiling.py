@@ -0,0 +1,58 @@
+import json
+import numpy as np
+import pytest
+from financial_analyzer.pipeline import AnalysisPipeline
+from financial_analyzer.profiling import Profiler
+
+
+def test_stage_records_time_memory_and_rows():
+    """Замер содержит время, память, число строк и учитывает вложенные этапы"""
+    profiler = Profiler(trace_memory=True)
+    try:
+        with profiler.stage('outer'):
+            with profiler.stage('inner') as record:
+                data = np.ones(1_000_000)
+                record.rows = len(data)
+            del data
+    finally:
+        profiler.set_trace_memory(False)
+
+    inner, outer = profiler.records
+    assert inner.stage == 'inner' and inner.rows == 1_000_000
+    assert inner.peak_bytes >= 8_000_000
+    assert outer.peak_bytes >= inner.peak_bytes
+    assert outer.wall_s >= inner.wall_s > 0
+
+
+def test_measure_decorator_and_errors():
+    """Декоратор берет число строк из результата и отмечает ошибки"""
+    profiler = Profiler()
+
+    @profiler.measure()
+    def load(count):
+        if count < 0:
+            raise ValueError('bad')
+        return list(range(count))
+
+    load(5)
+    with pytest.raises(ValueError):
+        load(-1)
+    summary, = profiler.summary()
+    assert summary['calls'] == 2 and summary['errors'] == 1
+    assert profiler.records[0].rows == 5 and profiler.records[0].peak_bytes is None
+
+
+def test_exports(long_financial_data):
+    """Конвейер замеряет пересчитанные этапы; выгрузка в JSON и OpenMetrics"""
+    profiler = Profiler()
+    pipeline = AnalysisPipeline(profiler=profiler)
+    pipeline.load('a.xlsx', lambda source, messages: long_financial_data.copy(), key='a')
+    pipeline.horizontal, pipeline.horizontal
+
+    stages = [item['stage'] for item in json.loads(profiler.to_json())['summary']]
+    assert stages == ['frame', 'cube', 'horizontal']
+    metrics = profiler.to_openmetrics()
+    assert '# TYPE project_alpha_stage_calls counter' in metrics
+    assert 'project_alpha_stage_calls_total{stage="horizontal"} 1' in metrics
+    assert 'project_alpha_stage_rows{stage="frame"} 18' in metrics
+    assert metrics.endswith('# EOF\n')
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.ratios import RATIO_REGISTRY, evaluate_ratio_array, evaluate_ratios, get_norm_value
+from financial_analyzer.core import calculate_financial_ratios
+
+
+def test_evaluate_ratios_all_years(long_financial_data):
+    """Коэффициенты рассчитываются сразу за все годы"""
+    table = evaluate_ratios(StatementCube.from_frame(long_financial_data))
+    assert list(table.index) == [2020, 2021, 2022]
+    assert list(table.columns) == list(RATIO_REGISTRY)
+    assert table.loc[2020, 'Текущая ликвидность'] == 2.0
+    assert table.loc[2022, 'ROA'] == -0.02
+    # Запасов в отчетности нет — слагаемое числителя считается нулем
+    assert table.loc[2021, 'Быстрая ликвидность'] == table.loc[2021, 'Текущая ликвидность']
+    # Нет капитала — ROE не определен
+    assert table['ROE'].isna().all()
+
+
+def test_evaluate_ratios_division_by_zero():
+    """Деление на ноль дает NaN"""
+    df = pd.DataFrame({
+        'Показатель': ['Итого по разделу II - Оборотные активы', 'Итого по разделу V - Краткосрочные обязательства'] * 2,
+        'Год': [2021, 2021, 2022, 2022],
+        'Значение': [100.0, 0.0, 100.0, 50.0],
+    })
+    table = evaluate_ratios(StatementCube.from_frame(df))
+    assert np.isnan(table.loc[2021, 'Текущая ликвидность'])
+    assert table.loc[2022, 'Текущая ликвидность'] == 2.0
+
+
+def test_evaluate_ratio_array_over_companies(long_financial_data):
+    """Движок работает с дополнительной осью компаний"""
+    cube = StatementCube.from_frame(long_financial_data)
+    stacked = np.stack([cube.values, cube.values * 2])
+    result = evaluate_ratio_array(stacked, cube.indicator_index)
+    assert result.shape == (2, len(RATIO_REGISTRY), 3)
+    np.testing.assert_allclose(result[0], result[1])
+
+
+def test_calculate_financial_ratios_latest_year(long_financial_data):
+    """Словарь коэффициентов строится по последнему году"""
+    ratios = calculate_financial_ratios(long_financial_data)
+    assert ratios['Текущая ликвидность']['value'] == 0.8
+    assert ratios['Текущая ликвидность']['norm'] == get_norm_value('Текущая ликвидность')
+    assert 'Низкое' in ratios['Текущая ликвидность']['interpretation']
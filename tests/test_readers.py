@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from financial_analyzer import readers
+from financial_analyzer.analysis import STATEMENT_COLUMNS, load_data
+
+ENGINES = [engine for engine in readers.ENGINES if readers.engine_available(engine)]
+
+
+@pytest.fixture
+def statement_with_preamble(tmp_path, long_financial_data):
+    """Файл с шапкой над таблицей и лишним столбцом"""
+    path = tmp_path / 'statement.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame([['ООО «Ромашка»'], ['ИНН 7700000000']]).to_excel(writer, index=False, header=False)
+        long_financial_data.assign(Комментарий='-').to_excel(writer, index=False, startrow=3)
+    return path
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_read_table_matches_read_excel(tmp_path, long_financial_data, engine):
+    """Таблица совпадает с pd.read_excel, включая типы столбцов"""
+    long_financial_data.loc[3, 'Значение'] = None
+    path = tmp_path / 'statement.xlsx'
+    long_financial_data.to_excel(path, index=False)
+    pd.testing.assert_frame_equal(readers.read_table(path, engine=engine), pd.read_excel(path))
+
+
+@pytest.mark.parametrize('engine', ENGINES + [None])
+def test_read_table_skips_preamble(tmp_path, statement_with_preamble, long_financial_data, engine, monkeypatch):
+    """Шапка пропускается, читаются только нужные столбцы; без движков — через pandas"""
+    plain = tmp_path / 'plain.xlsx'
+    long_financial_data.to_excel(plain, index=False)
+    expected = pd.read_excel(plain)
+    if engine is None:
+        monkeypatch.setattr(readers, 'available_engines', lambda: [])
+    df = readers.read_table(statement_with_preamble, engine=engine, usecols=STATEMENT_COLUMNS,
+                            start=readers.header_start(['Показатель']))
+    assert list(df.columns) == STATEMENT_COLUMNS
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_load_data_and_engine_choice(statement_with_preamble, monkeypatch):
+    """load_data читает таблицу под шапкой; неизвестный движок — ошибка"""
+    assert list(load_data(statement_with_preamble).columns) == STATEMENT_COLUMNS
+    assert readers.pick_engine('report.xlsx') == ENGINES[0]
+    monkeypatch.setenv(readers.ENGINE_VARIABLE, 'xlrd')
+    with pytest.raises(ValueError):
+        readers.pick_engine('report.xlsx')
+    messages = []
+    assert load_data(statement_with_preamble, messages) is None
+    assert 'xlrd' in messages[0]
@@ -0,0 +1,152 @@
+import pytest
+import pandas as pd
+from financial_analyzer import analysis, report
+from financial_analyzer.synthetic import generate_statement
+
+
+@pytest.fixture
+def font_dir(tmp_path, monkeypatch):
+    """Каталог с минимальным TTF-шрифтом (латиница, кириллица, знаки отчета)"""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    chars = [chr(code) for code in range(32, 127)] + [chr(code) for code in range(0x410, 0x450)] + list('ЁёΔ…№')
+    names = ['.notdef'] + [f'uni{ord(char):04X}' for char in chars]
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 0)), pen.lineTo((50, 500)), pen.lineTo((450, 500)), pen.closePath()
+    glyph = pen.glyph()
+
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(char): name for char, name in zip(chars, names[1:])})
+    builder.setupGlyf({name: glyph for name in names})
+    builder.setupHorizontalMetrics({name: (500, 50) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Test', 'styleName': 'Regular'})
+    builder.setupOS2(sTypoAscender=800, usWinAscent=800, usWinDescent=200)
+    builder.setupPost()
+    builder.save(str(tmp_path / 'DejaVuSans.ttf'))
+
+    monkeypatch.setenv(report.FONT_VARIABLE, str(tmp_path))
+    report.clear_font_cache()
+    yield tmp_path
+    report.clear_font_cache()
+
+
+@pytest.fixture
+def report_args():
+    df = analysis.preprocess_data(generate_statement(years=8, seed=4))
+    assets, liabilities = analysis.perform_vertical_analysis(df)
+    return (df, analysis.calculate_financial_ratios(df), analysis.perform_horizontal_analysis(df),
+            assets, liabilities, analysis.detect_anomalies(df))
+
+
+def test_report_builds_each_document_afresh(font_dir, report_args):
+    """Каждый отчет строится в новом документе; повторный и фоновый отчеты совпадают по размеру"""
+    first = report.build_report(*report_args).getvalue()
+    assert first.startswith(b'%PDF')
+    assert len(report.build_report(*report_args).getvalue()) == len(first)
+
+    future = report.submit_report(*report_args)
+    assert len(future.result(timeout=60).getvalue()) == len(first)
+
+
+def _render(pdf, text):
+    """Документ с одной страницей текста и фиксированной датой создания"""
+    from datetime import datetime, timezone
+
+    pdf.set_creation_date(datetime(2024, 1, 1, tzinfo=timezone.utc))
+    pdf.add_page()
+    pdf.chapter_body(text)
+    return report.save_pdf(pdf).getvalue()
+
+
+def test_documents_are_independent(font_dir):
+    """Два документа не делят шрифты: вывод одного не меняет другой"""
+    first, second = report.new_document('Первый'), report.new_document('Второй')
+    assert first.fonts['dejavu'] is not second.fonts['dejavu']
+
+    first_pdf = _render(first, 'Выручка и прибыль ' * 50)
+    second_pdf = _render(second, 'Ликвидность: 0,8 ✅')
+    alone = _render(report.new_document('Второй'), 'Ликвидность: 0,8 ✅')
+    for data in (first_pdf, second_pdf):
+        assert data.startswith(b'%PDF-') and data.rstrip().endswith(b'%%EOF')
+    assert second_pdf == alone and first_pdf != second_pdf
+
+
+def test_long_report_does_not_block_others(monkeypatch):
+    """Пока строится долгий отчет, другой отчет не ждет его в очереди"""
+    import threading
+
+    monkeypatch.setattr(report, '_executor', None)
+    monkeypatch.setenv(report.WORKERS_VARIABLE, '2')
+    release = threading.Event()
+    slow = report.submit_report(build=lambda: release.wait(10))
+    try:
+        assert report.submit_report(build=lambda: 'готово').result(timeout=5) == 'готово'
+        assert not slow.done()
+    finally:
+        release.set()
+        report._executor.shutdown()
+
+    monkeypatch.setenv(report.WORKERS_VARIABLE, '0')
+    with pytest.raises(ValueError):
+        report.report_workers()
+    monkeypatch.delenv(report.WORKERS_VARIABLE)
+    assert report.report_workers() is None
+
+
+def test_table_layout_fits_page(font_dir):
+    """Таблица укладывается в ширину страницы, длинный текст обрезается"""
+    pdf = report.new_document()
+    pdf.add_page()
+    rows = [['Показатель ✅', 'x' * 300, 2021]] * 80
+    titles, texts, widths = pdf.table_layout(['Показатель', 'Описание', 'Год'], rows)
+    assert sum(widths) <= pdf.epw + 1e-6
+    assert texts[0][0] == 'Показатель'
+    assert texts[0][1].endswith('…') and len(texts[0][1]) < 300
+
+    pdf.add_table(['Показатель', 'Описание', 'Год'], rows)
+    assert pdf.page_no() > 1
+
+
+def test_missing_fonts(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        report.find_fonts(str(tmp_path))
+
+
+def test_run_reports_writes_index(tmp_path, font_dir, long_financial_data):
+    """Пакетный режим пишет PDF по каждой компании и сводку со ссылками"""
+    from financial_analyzer.report_batch import run_reports
+
+    source = tmp_path / 'statements'
+    (source / 'q2').mkdir(parents=True)
+    long_financial_data.to_excel(source / 'company_a.xlsx', index=False)
+    long_financial_data.to_excel(source / 'q2' / 'company_a.xlsx', index=False)
+    pd.DataFrame({'Другое': [1]}).to_excel(source / 'broken.xlsx', index=False)
+
+    entries, paths = run_reports(source, tmp_path / 'out', workers=2, chunksize=1)
+    assert [entry.report for entry in entries] == [None, 'company_a.pdf', 'company_a_2.pdf']
+    assert not entries[0].ok and entries[1].first_year == 2020
+    for entry in entries[1:]:
+        assert (tmp_path / 'out' / entry.report).read_bytes().startswith(b'%PDF')
+
+    index = pd.read_csv(paths['index_csv'])
+    assert index['report'].tolist()[1:] == ['company_a.pdf', 'company_a_2.pdf']
+    assert b'/URI (company_a_2.pdf)' in paths['index_pdf'].read_bytes()
+
+
+def test_report_names_are_unique():
+    from financial_analyzer.report_batch import report_names
+
+    assert report_names(['a/x.xlsx', 'b/x.xlsx', 'x_2.xlsx']) == ['x.pdf', 'x_2.pdf', 'x_2_2.pdf']
+    assert report_names(['x_2.xlsx', 'a/x.xlsx', 'b/x.xlsx']) == ['x_2.pdf', 'x.pdf', 'x_3.pdf']
+
+
+def test_cli_report(tmp_path, font_dir, long_financial_data, capsys):
+    from financial_analyzer.cli import main
+
+    long_financial_data.to_excel(tmp_path / 'company.xlsx', index=False)
+    assert main(['report', str(tmp_path), '-o', str(tmp_path / 'out')]) == 0
+    assert 'Отчетов: 1, с ошибками: 0' in capsys.readouterr().out
+    assert (tmp_path / 'out' / 'company.pdf').exists()
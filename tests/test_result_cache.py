@@ -0,0 +1,42 @@
+import os
+import time
+
+import pytest
+from financial_analyzer.result_cache import TTL_VARIABLE, ResultCache, default_ttl, result_key
+
+
+def test_result_key_depends_on_stage_and_params():
+    """Ключ различается для этапов и параметров одного файла"""
+    keys = {result_key('abc', 'vertical', (2021,)), result_key('abc', 'vertical', (2022,)),
+            result_key('abc', 'ratios'), result_key('abd', 'ratios')}
+    assert len(keys) == 4
+    assert result_key('abc', 'ratios') == result_key('abc', 'ratios', ())
+
+
+def test_result_cache_expires_entries(tmp_path, monkeypatch):
+    """Записи старше срока хранения не возвращаются и удаляются при вытеснении"""
+    cache = ResultCache(tmp_path, ttl=60)
+    cache.put('fresh', {'value': 1})
+    cache.put('stale', [1, 2])
+    assert cache.get('fresh') == {'value': 1}
+
+    past = time.time() - 120
+    os.utime(tmp_path / 'stale.pickle', (past, past))
+    cache.evict()
+    assert cache.get('stale') is None
+    assert cache.stats()['entries'] == 1 and cache.stats()['evictions'] == 1
+
+    monkeypatch.setattr(time, 'time', lambda: past + 240)
+    assert cache.get('fresh') is None and cache.stats()['entries'] == 0
+
+    monkeypatch.setenv(TTL_VARIABLE, 'день')
+    with pytest.raises(ValueError):
+        default_ttl()
+
+
+def test_result_cache_ignores_broken_entries(tmp_path):
+    """Поврежденная запись считается промахом и удаляется"""
+    cache = ResultCache(tmp_path)
+    (tmp_path / 'broken.pickle').write_bytes(b'not a pickle')
+    assert cache.get('broken') is None
+    assert not (tmp_path / 'broken.pickle').exists()
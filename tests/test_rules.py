@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+from financial_analyzer.anomalies import detect_anomalies
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.incremental import AnomalyState
+from financial_analyzer.rules import RULE_REGISTRY, RULES_VARIABLE, RuleSet, parse_expression
+
+
+def test_parse_expression():
+    """Выражения разбираются в дерево; change и цепочки сравнений раскрываются"""
+    assert parse_expression("change(revenue) > 0") == (
+        'gt', ('sub', ('row', 'Выручка'), ('prev', ('row', 'Выручка'))), ('const', 0.0)
+    )
+    assert parse_expression("0 < indicator('Запасы') <= 5")[0] == 'and'
+    for text in ("revenue ** 2", "unknown > 0", "__import__('os')", "growth(revenue, profit)"):
+        with pytest.raises(ValueError):
+            parse_expression(text)
+
+
+def test_rule_set_shares_subexpressions():
+    """Одинаковые подвыражения разных правил вычисляются одним шагом"""
+    rules = RuleSet()
+    growth_steps = [step for step in rules.program if step[0] == 'growth']
+    assert len(growth_steps) == 2
+    assert rules.indicators[:2] == ['Чистая прибыль (убыток)', 'Выручка']
+
+    with pytest.raises(ValueError, match='нет ключа'):
+        RuleSet({'broken': {'when': 'revenue < 0'}})
+
+
+def test_custom_rules(long_financial_data):
+    """Дополнительное правило из словаря находит аномалии вместе со встроенными"""
+    registry = dict(RULE_REGISTRY)
+    registry['payables_jump'] = {
+        'when': "growth(indicator('Дебиторская задолженность')) >= 0.8 and revenue > 0",
+        'indicator': 'Дебиторская задолженность',
+        'value': "change(receivables)",
+        'severity': 'medium',
+        'description': "Дебиторская задолженность выросла на {value:.0f} за {year} год",
+    }
+    cube = StatementCube.from_frame(long_financial_data)
+    anomalies = detect_anomalies(cube, RuleSet(registry))
+    assert anomalies[-1]['description'] == "Дебиторская задолженность выросла на 900000 за 2022 год"
+    assert len(anomalies) == len(detect_anomalies(cube)) + 1
+
+    state = AnomalyState(StatementCube.from_frame(long_financial_data[long_financial_data['Год'] < 2022]),
+                         RuleSet(registry))
+    assert state.append(cube).anomalies == anomalies
+
+
+def test_rules_from_file(tmp_path, monkeypatch, long_financial_data):
+    """Файл из PROJECT_ALPHA_RULES дополняет встроенные правила; null отключает правило"""
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({
+        'low_current_ratio': None,
+        'negative_profit': {
+            'when': "profit < 0", 'indicator': 'Чистая прибыль', 'value': "profit",
+            'severity': 'high', 'description': "Убыток в {year} году",
+        },
+    }), encoding='utf-8')
+    monkeypatch.setenv(RULES_VARIABLE, str(path))
+
+    anomalies = detect_anomalies(StatementCube.from_frame(long_financial_data))
+    assert [a['description'] for a in anomalies][-1] == "Убыток в 2022 году"
+    assert not any(a['indicator'] == 'Текущая ликвидность' for a in anomalies)
+
+    from financial_analyzer.portfolio import PortfolioCube
+    counts = PortfolioCube.from_frame(long_financial_data.assign(Компания='А')).anomaly_counts()
+    assert counts.loc['А', 'negative_profit'] == 1
+    assert np.array_equal(counts.columns[-1:], ['Всего'])
+
+
+def test_incremental_rules_with_deeper_lag():
+    """Правило с лагом в два года дописывается так же, как при полном пересчете"""
+    registry = {'two_year_drop': {
+        'when': "revenue < prev(prev(revenue))", 'indicator': 'Выручка', 'value': "revenue",
+        'severity': 'medium', 'description': "Выручка ниже, чем два года назад",
+    }}
+    rules = RuleSet(registry)
+    assert rules.max_lag == 2 and RuleSet().max_lag == 1
+    assert RuleSet({'nested': dict(registry['two_year_drop'], when="change(growth(revenue)) > 0")}).max_lag == 2
+
+    cube = StatementCube(np.array([[100.0, 200.0, 90.0, 95.0]]), ['Выручка'], [2019, 2020, 2021, 2022])
+    first_two = StatementCube(cube.values[:, :2], cube.indicators, cube.years[:2])
+    full = AnomalyState(cube, rules, []).anomalies
+    assert [a['year'] for a in full] == [2021, 2022]
+    assert AnomalyState(first_two, rules, []).append(cube).anomalies == full
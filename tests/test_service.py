@@ -0,0 +1,181 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import quote
+
+from financial_analyzer import service
+from financial_analyzer.service import AnalysisService
+
+
+ANALYZE_BYTES = service.analyze_bytes
+
+
+def _crash_or_analyze(data, company=service.DEFAULT_COMPANY):
+    """Обработчик, который аварийно завершается на файле crash"""
+    if data == b'crash':
+        os._exit(1)
+    return ANALYZE_BYTES(data, company)
+
+
+def _workbook(df):
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+async def _request(port, method, target, body=b''):
+    """Отправляет запрос и возвращает код ответа, заголовки и JSON"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(payload)
+
+
+def test_service_analyzes_and_caches(long_financial_data):
+    """Файл анализируется в пуле процессов, повторная отправка берется из кэша"""
+    data = _workbook(long_financial_data)
+
+    async def scenario():
+        analysis_service = AnalysisService(workers=1)
+        server = await analysis_service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            first = await _request(port, 'POST', f"/analyze?company={quote('Агро')}", data)
+            second = await _request(port, 'POST', '/analyze', data)
+            broken = await _request(port, 'POST', '/analyze', b'not an excel file')
+            missing = await _request(port, 'GET', '/unknown')
+            wrong_method = await _request(port, 'GET', '/analyze')
+            health = await _request(port, 'GET', '/health')
+        finally:
+            server.close()
+            analysis_service.close()
+        return first, second, broken, missing, wrong_method, health
+
+    first, second, broken, missing, wrong_method, health = asyncio.run(scenario())
+    status, headers, payload = first
+    assert status == 200 and headers['X-Cache'] == 'miss'
+    assert payload['company'] == 'Агро' and payload['years'] == [2020, 2021, 2022]
+    assert payload['ratios']['Текущая ликвидность']['value'] == 0.8
+    assert payload['ratio_table']['2020']['Текущая ликвидность'] == 2.0
+    assert payload['ratio_table']['2020']['ROE'] is None
+    assert [a['year'] for a in payload['anomalies']] == [2022, 2022, 2022]
+
+    assert second[0] == 200 and second[1]['X-Cache'] == 'hit'
+    assert second[2]['anomalies'] == payload['anomalies'] and second[2]['company'] == 'statement'
+    assert broken[0] == 422 and not broken[2]['ok']
+    assert missing[0] == 404 and wrong_method[0] == 405
+    assert health[2]['computed'] == 2 and health[2]['cache_hits'] == 1
+
+
+def test_service_backpressure(monkeypatch, long_financial_data):
+    """Сверх пула и очереди запросы отклоняются с 503; одинаковые файлы считаются один раз"""
+    release = threading.Event()
+    analyze_bytes = service.analyze_bytes
+
+    def slow(data, company=service.DEFAULT_COMPANY):
+        release.wait(10)
+        return analyze_bytes(data, company)
+
+    monkeypatch.setattr(service, 'analyze_bytes', slow)
+    files = [_workbook(long_financial_data.assign(Значение=long_financial_data['Значение'] * k)) for k in (1, 2)]
+
+    async def scenario():
+        executor = ThreadPoolExecutor(max_workers=1)
+        analysis_service = AnalysisService(workers=1, queue_size=1, executor=executor)
+        server = await analysis_service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            first = asyncio.ensure_future(_request(port, 'POST', '/analyze', files[0]))
+            same = asyncio.ensure_future(_request(port, 'POST', '/analyze', files[0]))
+            while analysis_service.stats['shared'] < 1:
+                await asyncio.sleep(0.01)
+            rejected = await _request(port, 'POST', '/analyze', files[1])
+            release.set()
+            return await first, await same, rejected, analysis_service.stats
+        finally:
+            release.set()
+            server.close()
+            executor.shutdown()
+
+    first, same, rejected, stats = asyncio.run(scenario())
+    assert first[0] == same[0] == 200
+    assert sorted([first[1]['X-Cache'], same[1]['X-Cache']]) == ['miss', 'shared']
+    assert rejected[0] == 503 and rejected[1]['Retry-After'] == str(service.RETRY_AFTER)
+    assert stats['computed'] == 1 and stats['rejected'] == 1
+
+
+def test_service_counts_requests_while_reading_body(long_financial_data):
+    """Запрос занимает место, пока передает тело: остальные получают 503, не дожидаясь расчета"""
+    data = _workbook(long_financial_data)
+
+    async def scenario():
+        executor = ThreadPoolExecutor(max_workers=1)
+        analysis_service = AnalysisService(workers=1, queue_size=0, executor=executor)
+        server = await analysis_service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f"POST /analyze HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data[:10])
+            await writer.drain()
+            while analysis_service.health()['active'] < 1:
+                await asyncio.sleep(0.01)
+            rejected = await _request(port, 'POST', '/analyze', data)
+            writer.close()
+            while analysis_service.health()['active']:
+                await asyncio.sleep(0.01)
+            accepted = await _request(port, 'POST', '/analyze', data)
+            return rejected, accepted, analysis_service.health()
+        finally:
+            server.close()
+            executor.shutdown()
+
+    rejected, accepted, health = asyncio.run(scenario())
+    assert rejected[0] == 503
+    assert accepted[0] == 200 and accepted[1]['X-Cache'] == 'miss'
+    assert health['active'] == 0 and health['rejected'] == 1 and health['computed'] == 1
+
+
+def test_service_restarts_broken_pool(monkeypatch, long_financial_data):
+    """После аварии процесса-обработчика пул пересоздается и следующие запросы обслуживаются"""
+    monkeypatch.setattr(service, 'analyze_bytes', _crash_or_analyze)
+    monkeypatch.setattr(service, 'worker_context', lambda: multiprocessing.get_context('spawn'))
+    data = _workbook(long_financial_data)
+
+    async def scenario():
+        analysis_service = AnalysisService(workers=1)
+        server = await analysis_service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            crashed = await _request(port, 'POST', '/analyze', b'crash')
+            recovered = await _request(port, 'POST', '/analyze', data)
+            return crashed, recovered, analysis_service.health()
+        finally:
+            server.close()
+            analysis_service.close()
+
+    crashed, recovered, health = asyncio.run(scenario())
+    assert crashed[0] == 503 and crashed[1]['Retry-After'] == str(service.RETRY_AFTER)
+    assert recovered[0] == 200 and recovered[2]['ratios']['Текущая ликвидность']['value'] == 0.8
+    assert health['restarts'] == 1 and health['computed'] == 1
+
+
+def test_analyze_bytes_computes_only_response_stages(monkeypatch, long_financial_data):
+    """Обработчик не строит горизонтальный и вертикальный анализ, которых нет в ответе"""
+    from financial_analyzer import analysis
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError('этап не нужен сервису')
+
+    monkeypatch.setattr(analysis, 'perform_horizontal_analysis', unexpected)
+    monkeypatch.setattr(analysis, 'perform_vertical_analysis', unexpected)
+    payload = service.analyze_bytes(_workbook(long_financial_data))
+    assert payload['ok'] and payload['ratios'] and payload['anomalies']
@@ -0,0 +1,88 @@
+import os
+import time
+import pandas as pd
+import pytest
+from io import BytesIO
+from financial_analyzer.analysis import load_statement
+from financial_analyzer.statement_cache import StatementCache, content_key
+
+# Кэш пишет таблицы в формате Arrow; без pyarrow он отключается
+pytest.importorskip('pyarrow')
+
+
+def _excel_bytes(df):
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_cache_roundtrip(tmp_path, long_financial_data):
+    """Таблица сохраняется и читается из кэша без изменений"""
+    cache = StatementCache(tmp_path)
+    cache.put('key', long_financial_data)
+    pd.testing.assert_frame_equal(cache.get('key'), long_financial_data)
+    assert cache.get('missing') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_load_statement_parses_once(tmp_path, long_financial_data):
+    """Повторная загрузка того же файла не вызывает разбор Excel"""
+    cache = StatementCache(tmp_path)
+    data = _excel_bytes(long_financial_data)
+    calls = []
+
+    def loader(content, messages):
+        calls.append(content_key(content))
+        return long_financial_data
+
+    cache.load(data, loader)
+    cache.load(BytesIO(data), loader)
+    assert len(calls) == 1
+
+    df = load_statement(data, cache)
+    assert len(df) == len(long_financial_data)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, long_financial_data):
+    """При превышении лимита удаляется запись, к которой дольше не обращались"""
+    cache = StatementCache(tmp_path)
+    cache.put('old', long_financial_data)
+    cache.put('new', long_financial_data)
+    entry_size = cache.stats()['size_bytes'] // 2
+
+    past = time.time() - 100
+    os.utime(tmp_path / 'new.arrow', (past, past))
+    os.utime(tmp_path / 'old.arrow', (past - 100, past - 100))
+    cache.get('old')
+
+    cache.max_bytes = entry_size * 2
+    cache.put('third', long_financial_data)
+    assert cache.get('new') is None
+    assert cache.get('old') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_keeps_preprocess_warnings(tmp_path, long_financial_data):
+    """Предупреждения разбора сохраняются с таблицей и возвращаются при попадании в кэш"""
+    cache = StatementCache(tmp_path)
+    data = _excel_bytes(long_financial_data.assign(Значение=long_financial_data['Значение'].where(lambda v: v.index != 0)))
+    cold, warm = [], []
+    load_statement(data, cache, cold)
+    load_statement(data, cache, warm)
+    assert cache.stats()['hits'] == 1
+    assert cold and warm == cold
+
+
+def test_cache_drops_corrupt_entries(tmp_path, long_financial_data):
+    """Недописанная запись считается промахом и удаляется, файл разбирается заново"""
+    cache = StatementCache(tmp_path)
+    data = _excel_bytes(long_financial_data)
+    load_statement(data, cache)
+    path = tmp_path / f'{content_key(data)}.arrow'
+    path.write_bytes(path.read_bytes()[:200])
+
+    assert cache.get(content_key(data)) is None
+    assert not path.exists()
+    df = load_statement(data, cache)
+    assert len(df) == len(long_financial_data) and path.exists()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.core import detect_anomalies, perform_vertical_analysis
+from financial_analyzer.analysis import frame_memory, indicator_mask, preprocess_data, select_indicators
+
+
+def test_cube_from_long_frame(long_financial_data):
+    """Проверяет построение куба из длинной таблицы"""
+    cube = StatementCube.from_frame(long_financial_data)
+    assert cube.shape == (6, 3)
+    assert cube.years == [2020, 2021, 2022]
+    assert cube.get('Выручка', 2021) == 6000000
+    assert np.isnan(cube.get('Запасы', 2021))
+    assert cube.get('Выручка', 2030, 0) == 0
+
+
+def test_cube_from_wide_frame(sample_financial_data):
+    """Проверяет построение куба из широкой таблицы с годами в столбцах"""
+    cube = StatementCube.from_frame(sample_financial_data)
+    assert cube.years == [2020, 2021, 2022]
+    assert cube.get('Себестоимость продаж', '2022') == 5000000
+
+
+def test_cube_slices_are_views(long_financial_data):
+    """Строки и столбцы куба не копируют данные"""
+    cube = StatementCube.from_frame(long_financial_data)
+    assert np.shares_memory(cube.row('Выручка'), cube.values)
+    assert np.shares_memory(cube.column(2022), cube.values)
+
+
+def test_cube_keeps_first_duplicate():
+    """При повторе пары (показатель, год) используется первое вхождение"""
+    df = pd.DataFrame({
+        'Показатель': ['Прочие обязательства', 'Прочие обязательства'],
+        'Год': [2022, 2022],
+        'Значение': [10.0, 20.0],
+    })
+    assert StatementCube.from_frame(df).get('Прочие обязательства', 2022) == 10.0
+
+
+def test_analysis_accepts_cube(long_financial_data):
+    """Функции анализа дают одинаковый результат для таблицы и куба"""
+    cube = StatementCube.from_frame(long_financial_data)
+    assert detect_anomalies(cube) == detect_anomalies(long_financial_data)
+    asset_df, _ = perform_vertical_analysis(cube, 2022)
+    assert list(asset_df['Показатель']) == ['Дебиторская задолженность']
+    assert asset_df['Доля, %'].iloc[0] == 20.0
+
+
+def test_vertical_analysis_keeps_frame_columns_and_order():
+    """Для таблицы сохраняются все ее столбцы и порядок строк файла"""
+    df = pd.DataFrame({
+        'Показатель': ['БАЛАНС (актив)', 'Запасы', 'Основные средства', 'Запасы'],
+        'Код': ['1600', '1210', '1150', '1210'],
+        'Ед.изм.': 'тыс. руб.',
+        'Год': [2022, 2022, 2022, 2021],
+        'Значение': [200.0, 50.0, np.nan, 40.0],
+    })
+    asset_df, liability_df = perform_vertical_analysis(df)
+    assert list(asset_df.columns) == ['Показатель', 'Код', 'Ед.изм.', 'Год', 'Значение', 'Доля, %']
+    assert list(asset_df['Показатель']) == ['Запасы', 'Основные средства']
+    assert asset_df['Доля, %'].iloc[0] == 25.0
+    assert liability_df.empty
+
+
+def test_vertical_analysis_of_empty_data(long_financial_data):
+    """Пустая таблица и пустой куб дают пустые результаты, а не ошибку"""
+    for data in (long_financial_data.iloc[:0], StatementCube.from_frame(long_financial_data.iloc[:0])):
+        asset_df, liability_df = perform_vertical_analysis(data)
+        assert asset_df.empty and liability_df.empty
+        assert 'Доля, %' in asset_df.columns
+
+
+def test_preprocess_produces_compact_frame(long_financial_data):
+    """Предобработка хранит текст категориями, год — int16; куб не меняется"""
+    expected = StatementCube.from_frame(long_financial_data)
+    before = frame_memory(long_financial_data)
+    df = preprocess_data(long_financial_data.copy())
+    assert isinstance(df['Показатель'].dtype, pd.CategoricalDtype)
+    assert df['Год'].dtype == np.int16
+    assert df['Значение'].dtype == np.float64
+    assert frame_memory(df) < before
+
+    cube = StatementCube.from_frame(df)
+    assert cube.years == expected.years and all(type(year) is int for year in cube.years)
+    np.testing.assert_array_equal(cube.values, expected.values)
+
+    names = ['Выручка', 'Нет такого показателя']
+    np.testing.assert_array_equal(indicator_mask(df, names), long_financial_data['Показатель'].isin(names))
+    assert list(select_indicators(df, names)['Показатель'].cat.categories) == ['Выручка']
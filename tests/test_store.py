@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+from financial_analyzer.analysis import as_cube, preprocess_data
+from financial_analyzer.anomalies import detect_anomalies
+from financial_analyzer.portfolio import COMPANY_COLUMN, PortfolioCube
+from financial_analyzer.ratios import evaluate_ratios
+from financial_analyzer.store import StatementStore
+from financial_analyzer.synthetic import generate_portfolio
+
+
+def build_frames(companies=9, seed=3):
+    return {name: preprocess_data(df) for name, df in generate_portfolio(companies, years=6, seed=seed).items()}
+
+
+def test_store_matches_portfolio(tmp_path):
+    """Расчеты по хранилищу порциями совпадают с портфелем в памяти"""
+    frames = build_frames()
+    store = StatementStore.create(tmp_path, range(2019, 2025))
+    messages = []
+    store.write(frames, messages)
+    assert messages and 'вне словаря' in messages[0]
+
+    stored = StatementStore(tmp_path)
+    stacked = pd.concat([df.assign(**{COMPANY_COLUMN: name}) for name, df in frames.items()])
+    portfolio = PortfolioCube.from_frame(stacked)
+    pd.testing.assert_frame_equal(stored.ratios(2024, size=4), portfolio.ratios(2024))
+    pd.testing.assert_frame_equal(stored.anomaly_counts(size=4), portfolio.anomaly_counts(), check_dtype=False)
+    assert stored.rankings(2024)['ROA'].max() == len(frames)
+
+    cube = stored.company('company_0005')
+    assert np.shares_memory(cube.values, stored.values)
+    assert np.shares_memory(stored.portfolio(2, 5).values, stored.values)
+    expected = as_cube(frames['company_0005'])
+    pd.testing.assert_frame_equal(evaluate_ratios(cube), evaluate_ratios(expected))
+    assert detect_anomalies(cube) == detect_anomalies(expected)
+
+    with pytest.raises(ValueError, match='только для чтения'):
+        stored.write(frames)
+
+
+def test_store_appends_and_replaces(tmp_path):
+    """Новые компании дописываются, повторная запись заменяет отчетность компании"""
+    frames = build_frames(3)
+    store = StatementStore.create(tmp_path, [2021, 2024])
+    store.write({'company_0000': frames['company_0000'][frames['company_0000']['Год'] >= 2021]})
+    messages = []
+    store.write(frames, messages)
+    assert 'Добавлены годы хранилища: 2019, 2020' in messages
+
+    short = frames['company_0001'][frames['company_0001']['Год'] == 2024]
+    store.write({'company_0001': short, 'new': frames['company_0000']})
+    reopened = StatementStore(tmp_path)
+    assert reopened.companies == ['company_0000', 'company_0001', 'company_0002', 'new']
+    assert reopened.years == list(range(2019, 2025))
+    assert reopened.shape == (4, len(reopened.indicators), 6)
+    assert reopened.company('company_0002').get('Выручка', 2019) == as_cube(frames['company_0002']).get('Выручка', 2019)
+    assert np.isnan(reopened.company('company_0001').get('Выручка', 2023))
+    np.testing.assert_array_equal(reopened.company('new').values, reopened.company('company_0000').values)
+
+
+def test_store_extends_years_for_later_filings(tmp_path):
+    """Отчетность за следующий год расширяет ось лет, прежние значения не сдвигаются"""
+    frames = build_frames(2)
+    early = {name: df[df['Год'] <= 2023] for name, df in frames.items()}
+    store = StatementStore.create(tmp_path, [2019, 2023])
+    store.write(early)
+    store.write({'company_0001': frames['company_0001']})
+
+    reopened = StatementStore(tmp_path)
+    assert reopened.years == list(range(2019, 2025))
+    for name, df in frames.items():
+        expected = as_cube(df)
+        for year in (2019, 2023, 2024):
+            value = reopened.company(name).get('Выручка', year)
+            if name == 'company_0000' and year == 2024:
+                assert np.isnan(value)
+            else:
+                assert value == expected.get('Выручка', year)
+
+def test_store_releases_map_before_resizing(tmp_path, monkeypatch):
+    """Файл массива меняет размер только после закрытия прежнего отображения"""
+    from financial_analyzer import store as store_module
+
+    frames = build_frames(2)
+    store = StatementStore.create(tmp_path, [2019, 2024])
+    store.write({'company_0000': frames['company_0000']})
+    opened = []
+
+    def checked_open(path, mode='r', *args, **kwargs):
+        if mode == 'r+b':
+            opened.append(store.values)
+        return open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(store_module, 'open', checked_open, raising=False)
+    store.write({'company_0001': frames['company_0001']})
+    assert opened == [None]
+    assert isinstance(store.values, np.memmap) and store.shape[0] == 2
+    expected = as_cube(frames['company_0000'])
+    assert StatementStore(tmp_path).company('company_0000').get('Выручка', 2024) == expected.get('Выручка', 2024)
+
+
+def test_cli_store(tmp_path, long_financial_data, capsys):
+    """Команда store создает хранилище из каталога и дописывает в него"""
+    from financial_analyzer.cli import main
+
+    long_financial_data.to_excel(tmp_path / 'agro.xlsx', index=False)
+    assert main(['store', str(tmp_path), '-o', str(tmp_path / 'store')]) == 0
+    assert main(['store', str(tmp_path), '-o', str(tmp_path / 'store')]) == 0
+    assert 'Записано компаний: 1' in capsys.readouterr().out
+    store = StatementStore(tmp_path / 'store')
+    assert store.companies == ['agro'] and store.years == [2020, 2021, 2022]
+    assert store.ratios(2022).loc['agro', 'Текущая ликвидность'] == pytest.approx(0.8)
+
+
+def test_cli_store_company_ids_are_stable(tmp_path, long_financial_data):
+    """Компании с одинаковыми именами файлов различаются путем, новые файлы не сдвигают прежние"""
+    from financial_analyzer.batch import company_ids
+    from financial_analyzer.cli import main
+
+    data = tmp_path / 'data'
+    for name in ('b/x.xlsx', 'c/x.xlsx', 'x_2.xlsx'):
+        (data / name).parent.mkdir(parents=True, exist_ok=True)
+        long_financial_data.to_excel(data / name, index=False)
+    assert main(['store', str(data), '-o', str(tmp_path / 'store')]) == 0
+    first = StatementStore(tmp_path / 'store').companies
+    assert sorted(first) == ['b/x', 'c/x', 'x_2']
+
+    (data / 'a').mkdir()
+    long_financial_data.to_excel(data / 'a' / 'x.xlsx', index=False)
+    assert main(['store', str(data), '-o', str(tmp_path / 'store')]) == 0
+    assert StatementStore(tmp_path / 'store').companies == first + ['a/x']
+
+    assert company_ids([data / 'x.xls', data / 'x.xlsx', data / 'y.xls'], data) == ['x.xls', 'x.xlsx', 'y']
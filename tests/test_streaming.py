@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from financial_analyzer.core import clean_value
+from financial_analyzer.analysis import as_cube, preprocess_data
+from financial_analyzer.batch import analyze_file
+from financial_analyzer.cube import StatementCube
+from financial_analyzer.streaming import StatementCubeBuilder, clean_values, iter_chunks, stream_cube
+
+
+def test_clean_values_matches_clean_value():
+    """Векторная очистка совпадает с clean_value"""
+    raw = ["1,146", "395,544", "0", "", "-", "н/д", "123.45", "1 234,5 руб.", 7, 2.5, None, "abc"]
+    expected = [np.nan if clean_value(value) is None else clean_value(value) for value in raw]
+    np.testing.assert_array_equal(clean_values(raw).to_numpy(), np.array(expected, dtype=float))
+
+
+def test_stream_cube_matches_full_load(tmp_path, long_financial_data):
+    """Порционное чтение дает тот же куб, что и загрузка всего листа"""
+    long_financial_data.loc[3, 'Значение'] = None
+    path = tmp_path / 'statement.xlsx'
+    long_financial_data.to_excel(path, index=False)
+
+    chunks = list(iter_chunks(path, chunk_size=4))
+    assert len(chunks) == 5
+    messages = []
+    cube = stream_cube(path, chunk_size=4, messages=messages)
+    expected = as_cube(preprocess_data(pd.read_excel(path)))
+    assert cube.indicators == expected.indicators
+    assert cube.years == expected.years
+    np.testing.assert_array_equal(cube.values, expected.values)
+    assert any('пустые значения' in message for message in messages)
+
+
+def test_builder_first_and_sum(long_financial_data):
+    """Повторы пары (показатель, год): первое значение или сумма"""
+    doubled = pd.concat([long_financial_data, long_financial_data], ignore_index=True)
+    first = StatementCubeBuilder().add(doubled.iloc[:10]).add(doubled.iloc[10:]).build()
+    np.testing.assert_array_equal(first.values, StatementCube.from_frame(long_financial_data).values)
+
+    total = StatementCubeBuilder('sum').add(doubled.iloc[:25]).add(doubled.iloc[25:]).build()
+    assert total.get('Выручка', 2021) == 12000000
+
+
+def test_analyze_file_streaming(tmp_path, long_financial_data):
+    """Потоковый анализ файла совпадает с обычным"""
+    path = tmp_path / 'company.xlsx'
+    long_financial_data.to_excel(path, index=False)
+    regular = analyze_file(path)
+    streamed = analyze_file(path, streaming=True)
+    assert streamed.ok
+    pd.testing.assert_frame_equal(streamed.ratio_table, regular.ratio_table)
+    assert streamed.anomalies == regular.anomalies